@@ -3,34 +3,54 @@ Python Classroom Application
 Main Flask application for the Python learning platform.
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import (Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort, g,
+                   make_response, send_from_directory, get_template_attribute, Response)
+from markupsafe import Markup
 from werkzeug.utils import secure_filename
 import os
 import json
-import sys
-import importlib
+import uuid
 from datetime import datetime
 
-# Add testers directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'testers'))
-
 # Import module loader
-from module_loader import get_all_modules, get_module, get_module_count
+from module_loader import (get_module_index, get_module, get_module_content, get_module_version,
+                           get_module_count, start_watching, check_for_updates)
+from content_compiler import COMPILER_VERSION
+from http_cache import (cached_page, page_etag, asset_hash, hashed_asset_name, split_asset_name,
+                        ASSET_CACHE_CONTROL, PAGE_CACHE_CONTROL)
 
 # Import database manager (replaces JSON-based progress storage)
-from db_manager import get_student_progress, update_student_progress
+from db_manager import (get_student_progress, update_student_progress, record_attempt_event,
+                        record_project_result)
 from migrate_to_sqlite import auto_migrate
 
+# Background grading (testers run outside the request/response cycle)
+from grading_queue import get_grading_queue, submission_hash
+
 app = Flask(__name__)
 app.secret_key = 'python_classroom_secret_key_2024'  # Change in production
 app.config['UPLOAD_FOLDER'] = 'data/submissions'
 app.config['MAX_CONTENT_LENGTH'] = 1 * 1024 * 1024  # 1MB max file size
 app.config['ALLOWED_EXTENSIONS'] = {'py'}
+app.config['GRADING_WORKERS'] = int(os.environ.get('GRADING_WORKERS', 4))
+app.config['GRADING_CACHE_SIZE'] = int(os.environ.get('GRADING_CACHE_SIZE', 5000))  # 0 disables
+# Longest a results page's event stream stays open before the browser reconnects (0: poll instead)
+app.config['GRADING_STREAM_SECONDS'] = float(os.environ.get('GRADING_STREAM_SECONDS', 20))
+app.config['MODULE_WATCH'] = os.environ.get('MODULE_WATCH', '1') != '0'  # reload edited module JSON
+
+# Modules are stored in modules/module_XXX.json files. Pages look up the one
+# they need with get_module(); get_module_index() has titles etc. of all of them
+# (old hardcoded MODULES dictionary has been replaced with dynamic loading)
+if app.config['MODULE_WATCH']:
+    start_watching()
+
+
+@app.before_request
+def pick_up_module_changes():
+    """Switch to edited module content another process has loaded."""
+    if app.config['MODULE_WATCH']:
+        check_for_updates()
 
-# Load modules dynamically from JSON files
-# Old hardcoded MODULES dictionary has been replaced with dynamic loading
-# Modules are now stored in modules/module_XXX.json files
-MODULES = get_all_modules()
 
 # Auto-migrate from JSON to SQLite on first run
 auto_migrate()
@@ -496,10 +516,76 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
 
+def apply_submission_result(job, test_result):
+    """
+    Record a finished grading job in the student's progress.
+    Called from a grading worker, so it returns the flash message to show
+    on the results page instead of flashing it directly.
+    """
+    student_name = job['student_name']
+    module_id = job['module_id']
+    student_id = get_student_progress(student_name).student_id
+
+    # Only the project columns are written: the student may be using the
+    # site (and re-uploading) while this job was graded
+    completed = record_project_result(student_id, module_id, test_result['passed'], test_result)
+
+    if completed:
+        # Both quiz and project are now passed
+        if module_id < get_module_count():
+            outcome = ('success', f'Congratulations! Day {module_id} completed. Day {module_id + 1} unlocked!')
+        else:
+            outcome = ('success', 'Congratulations! You have completed all 100 days of Python!')
+    elif test_result['passed']:
+        outcome = ('success', f'Project passed! Great work on the {get_module_index()[module_id]["project_name"]}!')
+    else:
+        outcome = ('warning', f'Tests failed. Score: {test_result["score"]}. Please review and try again.')
+
+    record_project_attempt(student_id, job, test_result)
+    return {'category': outcome[0], 'message': outcome[1]}
+
+
+def record_project_attempt(student_id, job, test_result):
+    """Add a graded submission to the attempt history."""
+    tests = test_result.get('tests') or []
+    score = 100 * sum(1 for test in tests if test['passed']) / len(tests) if tests else 0
+
+    duration = None
+    if job.get('started_at'):
+        duration = (datetime.now() - datetime.fromisoformat(job['started_at'])).total_seconds()
+
+    try:
+        content_hash = submission_hash(job['filepath'])
+    except OSError:
+        content_hash = None
+
+    record_attempt_event(student_id, job['module_id'], 'project', score=score,
+                         passed=test_result['passed'], duration=duration,
+                         content_hash=content_hash)
+
+
+# Start background grading workers
+grading_queue = get_grading_queue(on_complete=apply_submission_result,
+                                  num_workers=app.config['GRADING_WORKERS'],
+                                  cache_size=app.config['GRADING_CACHE_SIZE'])
+grading_queue.start()
+
+
 # Progress management functions are now imported from db_manager.py
 # get_student_progress() and update_student_progress() are available
 
 
+def get_request_progress(student_name):
+    """
+    Student progress, loaded from the database at most once per request.
+    Changes saved with update_student_progress() are made to this same object.
+    """
+    cache = g.setdefault('student_progress', {})
+    if student_name not in cache:
+        cache[student_name] = get_student_progress(student_name)
+    return cache[student_name]
+
+
 @app.route('/')
 def index():
     """Home page."""
@@ -508,11 +594,11 @@ def index():
     student_name = session.get('student_name')
 
     if student_name:
-        progress = get_student_progress(student_name)
+        progress = get_request_progress(student_name)
         current_module_id = progress['current_module']
 
     # Get the current module data to display
-    current_module = MODULES[current_module_id]
+    current_module = get_module(current_module_id)
 
     return render_template('home.html',
                          current_module=current_module,
@@ -527,61 +613,161 @@ def start():
         student_name = request.form.get('student_name', '').strip()
         if student_name:
             session['student_name'] = student_name
-            progress = get_student_progress(student_name)
+            progress = get_request_progress(student_name)
             return redirect(url_for('module', module_id=progress['current_module']))
         flash('Please enter your name', 'error')
     return render_template('home.html')
 
 
+@app.context_processor
+def asset_urls():
+    """asset_url('css/style.css') -> /assets/css/style.<hash>.css in templates."""
+    return {'asset_url': lambda filename: url_for('assets', filename=hashed_asset_name(filename))}
+
+
+@app.route('/assets/<path:filename>')
+def assets(filename):
+    """Static files under content-hashed names, cached by browsers for a year."""
+    name, digest = split_asset_name(filename)
+    if digest is None or digest != asset_hash(name):
+        # Unhashed or outdated URL: serve the current file, but don't let it stick
+        return send_from_directory(app.static_folder, name, max_age=0)
+    response = send_from_directory(app.static_folder, name, max_age=31536000)
+    response.headers['Cache-Control'] = ASSET_CACHE_CONTROL
+    return response
+
+
+def module_page_etag(page, module_id, version):
+    """ETag of a module/quiz page for the logged-in student."""
+    return page_etag(page, module_id, version, COMPILER_VERSION, session['student_name'])
+
+
+def page_not_modified(etag):
+    """
+    Whether the browser already has this page. Checked before any database
+    access. Pages with flash messages are never revalidated (the message
+    would be lost), and are not cached either (see page_response()).
+    """
+    return '_flashes' not in session and etag in request.if_none_match
+
+
+def not_modified_response(etag):
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = PAGE_CACHE_CONTROL
+    return response
+
+
+def page_response(template, etag, **context):
+    """Render a page with its ETag, or uncached if it shows flash messages."""
+    cacheable = '_flashes' not in session
+    response = make_response(render_template(template, **context))
+    if cacheable:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = PAGE_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def module_progress_html(module_id, module_progress):
+    """The student's progress badges and next-step buttons for a module page."""
+    badges = get_template_attribute('module_progress.html', 'badges')
+    actions = get_template_attribute('module_progress.html', 'actions')
+    return {
+        'badges': str(badges(module_progress, module_id, uuid.uuid4().hex)),
+        'actions': str(actions(module_progress, module_id))
+    }
+
+
+def get_module_progress_entry(progress, module_id):
+    """A module's progress entry, or the default if the student hasn't started it."""
+    return progress['modules'].get(module_id, {
+        'quiz_passed': False,
+        'project_passed': False,
+        'quiz_score': 0,
+        'attempts': 0
+    })
+
+
 @app.route('/module/<int:module_id>')
 def module(module_id):
-    """Display module content."""
+    """
+    Display module content. The module part of the page is rendered once
+    per module version; the student's progress is filled in per request
+    (and refreshed by app.js from /module/<id>/progress when the browser
+    shows its cached copy after a 304).
+    """
     if 'student_name' not in session:
         return redirect(url_for('index'))
 
-    if module_id not in MODULES:
+    version = get_module_version(module_id)
+    if version is None:
         flash('Invalid module', 'error')
         return redirect(url_for('progress_page'))
 
+    etag = module_page_etag('module', module_id, version)
+    if page_not_modified(etag):
+        return not_modified_response(etag)
+
+    module_data = get_module(module_id)
     student_name = session['student_name']
-    progress = get_student_progress(student_name)
+    progress = get_request_progress(student_name)
 
     # Check if student can access this module
     if module_id > progress['current_module']:
         flash(f'Complete Module {progress["current_module"]} first', 'warning')
         return redirect(url_for('module', module_id=progress['current_module']))
 
-    module_data = MODULES[module_id]
-    # Get module progress, or use default if module entry doesn't exist yet
-    module_progress = progress['modules'].get(module_id, {
-        'quiz_passed': False,
-        'project_passed': False,
-        'quiz_score': 0,
-        'attempts': 0
-    })
+    body = cached_page(('module', module_id, version), lambda: render_template(
+        'module_body.html',
+        module_id=module_id,
+        module=module_data,
+        content=get_module_content(module_id)))
+    parts = module_progress_html(module_id, get_module_progress_entry(progress, module_id))
+    body = (body.replace('<!--student-progress:badges-->', parts['badges'])
+                .replace('<!--student-progress:actions-->', parts['actions']))
+
+    return page_response('module.html', etag, title=module_data['title'], body=Markup(body))
 
-    return render_template('module.html',
-                         module_id=module_id,
-                         module=module_data,
-                         progress=module_progress)
+
+@app.route('/module/<int:module_id>/progress')
+def module_progress(module_id):
+    """The per-student parts of a module page, as HTML fragments (never cached)."""
+    if 'student_name' not in session:
+        abort(401)
+    if get_module_version(module_id) is None:
+        abort(404)
+
+    progress = get_request_progress(session['student_name'])
+    response = jsonify(module_progress_html(module_id, get_module_progress_entry(progress, module_id)))
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
 
 @app.route('/quiz/<int:module_id>', methods=['GET', 'POST'])
 def quiz(module_id):
-    """Quiz page."""
+    """Quiz page (the same for every student, so cached per module version)."""
     if 'student_name' not in session:
         return redirect(url_for('index'))
 
-    if module_id not in MODULES:
+    version = get_module_version(module_id)
+    if version is None:
         return redirect(url_for('progress_page'))
 
-    student_name = session['student_name']
-    progress = get_student_progress(student_name)
+    etag = module_page_etag('quiz', module_id, version)
+    if request.method == 'GET' and page_not_modified(etag):
+        return not_modified_response(etag)
+
+    module_data = get_module(module_id)
 
     if request.method == 'POST':
+        student_name = session['student_name']
+        progress = get_request_progress(student_name)
+
         # Grade quiz
         answers = request.form
-        module_quiz = MODULES[module_id]['quiz']
+        module_quiz = module_data['quiz']
         correct_count = 0
 
         for i, question in enumerate(module_quiz):
@@ -596,6 +782,8 @@ def quiz(module_id):
         progress['modules'][module_id]['quiz_score'] = percentage
         progress['modules'][module_id]['quiz_passed'] = passed
         update_student_progress(student_name, progress)
+        record_attempt_event(progress.student_id, module_id, 'quiz',
+                             score=percentage, passed=passed)
 
         if passed:
             flash(f'Quiz passed with {percentage}%! You can now submit your project.', 'success')
@@ -603,8 +791,12 @@ def quiz(module_id):
         else:
             flash(f'Quiz score: {percentage}%. You need 75% to pass. Try again!', 'warning')
 
-    module_data = MODULES[module_id]
-    return render_template('quiz.html', module_id=module_id, module=module_data)
+    body = cached_page(('quiz', module_id, version), lambda: render_template(
+        'quiz_body.html',
+        module_id=module_id,
+        module=module_data,
+        content=get_module_content(module_id)))
+    return page_response('quiz.html', etag, title=module_data['title'], body=Markup(body))
 
 
 @app.route('/submission/<int:module_id>', methods=['GET', 'POST'])
@@ -614,7 +806,7 @@ def submission(module_id):
         return redirect(url_for('index'))
 
     student_name = session['student_name']
-    progress = get_student_progress(student_name)
+    progress = get_request_progress(student_name)
 
     # Check if quiz is passed
     if not progress['modules'][module_id]['quiz_passed']:
@@ -639,71 +831,125 @@ def submission(module_id):
             filepath = os.path.join(module_dir, filename)
             file.save(filepath)
 
-            # Test submission - dynamically import the correct tester
+            # Count the attempt now; grading happens in the background
             progress['modules'][module_id]['attempts'] += 1
-
-            try:
-                # Import tester module dynamically (e.g., module001_tester, module002_tester, etc.)
-                tester_module_name = f'module{module_id:03d}_tester'
-                tester_module = importlib.import_module(tester_module_name)
-                test_result = tester_module.test_submission(filepath)
-            except ModuleNotFoundError:
-                test_result = {
-                    'passed': False,
-                    'score': '0/0 (0%)',
-                    'tests': [],
-                    'message': f'Tester for module {module_id} not found. Please contact administrator.'
-                }
-            except Exception as e:
-                test_result = {
-                    'passed': False,
-                    'score': '0/0 (0%)',
-                    'tests': [],
-                    'message': f'Error running tests: {str(e)}'
-                }
-
-            # Update progress
-            progress['modules'][module_id]['project_passed'] = test_result['passed']
-            progress['modules'][module_id]['last_submission'] = datetime.now().isoformat()
-            progress['modules'][module_id]['test_results'] = test_result
-
-            if test_result['passed']:
-                # Check if BOTH quiz and project are now passed
-                quiz_passed = progress['modules'][module_id]['quiz_passed']
-                project_passed = progress['modules'][module_id]['project_passed']
-
-                if quiz_passed and project_passed:
-                    # Unlock next module only when both requirements are met
-                    total_modules = get_module_count()
-                    if module_id < total_modules:
-                        progress['current_module'] = module_id + 1
-                        flash(f'Congratulations! Day {module_id} completed. Day {module_id + 1} unlocked!', 'success')
-                    else:
-                        progress['completed'] = True
-                        progress['completed_at'] = datetime.now().isoformat()
-                        flash('Congratulations! You have completed all 100 days of Python!', 'success')
-                else:
-                    flash(f'Project passed! Great work on the {MODULES[module_id]["project"]["name"]}!', 'success')
-            else:
-                flash(f'Tests failed. Score: {test_result["score"]}. Please review and try again.', 'warning')
-
             update_student_progress(student_name, progress)
 
-            return render_template('results.html',
-                                 module_id=module_id,
-                                 module=MODULES[module_id],
-                                 results=test_result)
+            job_id = grading_queue.submit(student_name, module_id, filepath)
+            return redirect(url_for('submission_results', module_id=module_id, job_id=job_id))
 
         flash('Invalid file type. Please upload a .py file', 'error')
 
-    module_data = MODULES[module_id]
+    module_data = get_module(module_id)
     module_progress = progress['modules'][module_id]
     return render_template('submission.html',
                          module_id=module_id,
                          module=module_data,
+                         content=get_module_content(module_id),
                          progress=module_progress)
 
 
+@app.route('/submission/<int:module_id>/results/<job_id>')
+def submission_results(module_id, job_id):
+    """Results page for a graded (or still grading) submission."""
+    if 'student_name' not in session:
+        return redirect(url_for('index'))
+
+    job = grading_queue.get_job(job_id)
+    if not job or job['student_name'] != session['student_name'] or job['module_id'] != module_id:
+        abort(404)
+
+    if job['status'] in ('queued', 'running'):
+        return render_template('results.html',
+                             module_id=module_id,
+                             module=get_module(module_id),
+                             job=job,
+                             results=None)
+
+    # The outcome (job['outcome']) is shown by the page itself: a flash
+    # would be added again on every reload
+    return render_template('results.html',
+                         module_id=module_id,
+                         module=get_module(module_id),
+                         job=job,
+                         results=job['result'])
+
+
+@app.route('/api/grading-jobs/<job_id>')
+def grading_job_status(job_id):
+    """Poll the status of a grading job."""
+    if 'student_name' not in session:
+        abort(401)
+
+    job = grading_queue.get_job(job_id)
+    if not job or job['student_name'] != session['student_name']:
+        abort(404)
+
+    return jsonify({
+        'id': job['id'],
+        'status': job['status'],
+        'queue_position': job['queue_position'],
+        'passed': job['result']['passed'] if job['result'] else None
+    })
+
+
+@app.route('/api/grading-jobs/<job_id>/events')
+def grading_job_events(job_id):
+    """
+    Server-Sent Events stream of a grading job: 'status' while it waits,
+    one 'test' event per test as soon as its check finishes, and a final
+    'result' event with the score. Reconnecting browsers resume after the
+    last test they saw (Last-Event-ID).
+
+    A stream holds a request worker, so it is closed after
+    GRADING_STREAM_SECONDS and the browser reconnects; a job stuck on
+    timeouts doesn't keep a worker for its whole run.
+    """
+    if 'student_name' not in session:
+        abort(401)
+    if not app.config['GRADING_STREAM_SECONDS']:
+        abort(404)
+
+    job = grading_queue.get_job(job_id)
+    if not job or job['student_name'] != session['student_name']:
+        abort(404)
+
+    try:
+        after_seq = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        after_seq = 0
+
+    def sse(event, data, event_id=None):
+        lines = [f'event: {event}']
+        if event_id is not None:
+            lines.append(f'id: {event_id}')
+        lines.append(f'data: {json.dumps(data)}')
+        return '\n'.join(lines) + '\n\n'
+
+    def stream():
+        # Tell the browser how long to wait before reconnecting
+        yield 'retry: 2000\n\n'
+        for item in grading_queue.follow(job_id, after_seq, max_duration=app.config['GRADING_STREAM_SECONDS']):
+            if item is None:
+                yield ': keepalive\n\n'
+                continue
+            kind, data = item
+            if kind == 'status':
+                yield sse('status', {'status': data['status'],
+                                     'queue_position': data['queue_position']})
+            elif kind == 'test':
+                yield sse('test', {'order': data['order'], 'test': data['test']}, data['seq'])
+            else:
+                result = data['result'] or {}
+                yield sse('result', {'status': data['status'],
+                                     'passed': result.get('passed'),
+                                     'score': result.get('score'),
+                                     'message': result.get('message')})
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/progress')
 def progress_page():
     """Student progress dashboard."""
@@ -711,12 +957,12 @@ def progress_page():
         return redirect(url_for('index'))
 
     student_name = session['student_name']
-    progress = get_student_progress(student_name)
+    progress = get_request_progress(student_name)
 
     return render_template('progress.html',
                          student_name=student_name,
                          progress=progress,
-                         modules=MODULES)
+                         modules=get_module_index())
 
 
 @app.route('/logout')
@@ -729,7 +975,7 @@ def logout():
 
 if __name__ == '__main__':
     # Create necessary directories for all modules dynamically
-    for module_id in MODULES.keys():
+    for module_id in get_module_index():
         module_dir = os.path.join('data/submissions', f'module{module_id:03d}')
         os.makedirs(module_dir, exist_ok=True)
 
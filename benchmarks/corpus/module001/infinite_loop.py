@@ -0,0 +1,11 @@
+# My first Python program
+# It introduces me and says hello
+
+# Waits forever before the program starts
+while True:
+    pass
+
+name = "Ada"
+print("Hello, World!")
+print("My name is", name)
+print("I am learning Python.")
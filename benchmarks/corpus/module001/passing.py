@@ -0,0 +1,7 @@
+# My first Python program
+# It introduces me and says hello
+
+name = "Ada"
+print("Hello, World!")
+print("My name is", name)
+print("I am learning Python.")
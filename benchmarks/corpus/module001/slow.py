@@ -0,0 +1,10 @@
+# My first Python program
+# It introduces me and says hello
+
+# Warm-up that burns some CPU before the program starts
+warmup = sum(n * n for n in range(1500000))
+
+name = "Ada"
+print("Hello, World!")
+print("My name is", name)
+print("I am learning Python.")
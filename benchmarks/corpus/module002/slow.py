@@ -0,0 +1,18 @@
+# Personal greeting program
+# Asks for a name and a city, then plays with the strings
+
+# Warm-up that burns some CPU before the program starts
+warmup = sum(n * n for n in range(1500000))
+
+# Read the user's details
+name = input("What is your name? ")
+city = input("Which city do you live in? ")
+
+# Build a greeting with concatenation
+greeting = "Hello, " + name + " from " + city + "!"
+print(greeting)
+print("Your name has", len(name), "letters.")
+print("The first letter of your name is", name[0])
+print("The first three letters of your city are", city[:3])
+print("Your name in capitals is", name.upper())
+print("Goodbye, " + name + "!")
@@ -0,0 +1,3 @@
+# profile
+name = input("Name? ")
+print(name)
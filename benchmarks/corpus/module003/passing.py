@@ -0,0 +1,23 @@
+# Personal information profile
+# Collects details and shows their types
+# Demonstrates type conversion
+# Performs a few calculations
+# Prints a summary
+
+user_name = input("What is your name? ")
+user_age = int(input("How old are you? "))
+user_height = float(input("How tall are you in meters? "))
+likes_python = input("Do you like Python? ")
+
+age_in_five = user_age + 5
+height_cm = user_height * 100
+
+print("Name:", user_name)
+print("Age:", user_age)
+print("Height:", user_height)
+print("Likes Python:", likes_python)
+print("Age in five years:", age_in_five)
+print("Height in cm:", str(height_cm))
+print("Type of age:", type(user_age))
+print("Type of height:", type(user_height))
+print("Profile complete for " + user_name)
@@ -0,0 +1,29 @@
+# Arithmetic calculator
+# Reads two numbers and shows every operation
+# Uses comparison operators to describe them
+# Uses compound assignment for a running total
+# Prints each result on its own line
+
+# Warm-up that burns some CPU before the program starts
+warmup = sum(n * n for n in range(1500000))
+
+first_number = int(input("First number: "))
+second_number = int(input("Second number: "))
+
+print(f"{first_number} + {second_number} = {first_number + second_number}")
+print(f"{first_number} - {second_number} = {first_number - second_number}")
+print(f"{first_number} * {second_number} = {first_number * second_number}")
+print(f"{first_number} / {second_number} = {first_number / second_number}")
+print(f"{first_number} // {second_number} = {first_number // second_number}")
+print(f"{first_number} % {second_number} = {first_number % second_number}")
+print(f"{first_number} ** 2 = {first_number ** 2}")
+
+running_total = 0
+running_total += first_number
+running_total += second_number
+print(f"Running total: {running_total}")
+running_total -= 1
+print(f"Running total minus one: {running_total}")
+
+print(f"First is larger: {first_number > second_number}")
+print(f"Numbers are equal: {first_number == second_number}")
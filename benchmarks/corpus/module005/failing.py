@@ -0,0 +1,3 @@
+# Tip calculator
+bill = input("Bill amount: ")
+print("Thanks, the bill was", bill)
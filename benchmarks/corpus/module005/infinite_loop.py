@@ -0,0 +1,22 @@
+# Tip calculator
+# Works out the tip, the total and each person's share of a bill
+
+# Waits forever before the program starts
+while True:
+    pass
+
+# Ask for the bill, the tip percentage and the number of people
+bill = float(input("Bill amount: $"))
+tip_percent = int(input("Tip percentage: "))
+people = int(input("Number of people: "))
+
+# Do the math
+tip = bill * tip_percent / 100
+total = bill + tip
+per_person = total / people
+
+# Show the results with two decimal places
+print(f"Bill: ${bill:.2f}")
+print(f"Tip ({str(tip_percent)}%): ${tip:.2f}")
+print(f"Total: ${total:.2f}")
+print(f"Each person pays: ${per_person:.2f}")
@@ -0,0 +1,3 @@
+# Adventure
+name = input("Name? ")
+print("Hello " + name)
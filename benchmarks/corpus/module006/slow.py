@@ -0,0 +1,43 @@
+# Choose your own adventure
+# The player picks a path and then makes a second choice on that path
+
+# Warm-up that burns some CPU before the program starts
+warmup = sum(n * n for n in range(1500000))
+
+# Ask for the hero's name
+name = input("What is your name, adventurer? ")
+gold = 10
+
+# First choice: which way to go
+direction = input("You reach a fork. Go left or right? ").strip().lower()
+
+if direction == "left":
+    # The left path leads to a chest
+    print(f"{name} walks into a dark cave and finds an old chest.")
+    choice = input("Do you open it or leave it? ").strip().lower()
+    # Second-level decision inside the cave
+    if choice == "open" or choice == "o":
+        gold = gold + 50
+        print(f"The chest is full of coins! {name} now has {gold} gold.")
+    else:
+        print("You leave the chest alone and head home safely.")
+elif direction == "right":
+    # The right path leads to a river
+    print(f"{name} follows the river to a rickety bridge.")
+    choice = input("Cross the bridge? (yes/no) ").strip().lower()
+    # Second-level decision at the bridge
+    if choice == "yes" and gold >= 10:
+        print("You pay the troll ten coins and cross into a sunny meadow full of flowers.")
+    else:
+        print("You turn back; maybe tomorrow.")
+else:
+    print("You stand still until nightfall.")
+    # A third path: waiting costs gold
+    if gold > 0:
+        gold = gold - 5
+
+# Ending depends on how much gold the hero has
+if gold > 50:
+    print("Rich ending: you retire to a castle.")
+else:
+    print("Humble ending: another day, another quest.")
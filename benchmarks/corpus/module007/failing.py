@@ -0,0 +1,4 @@
+# Guessing game
+import random
+secret = random.randint(1, 10)
+print("The number was", secret)
@@ -0,0 +1,49 @@
+# Number guessing game with rounds and a score
+# The player keeps playing rounds until they answer "no"
+import random
+
+# Warm-up that burns some CPU before the program starts
+warmup = sum(n * n for n in range(1500000))
+
+rounds_played = 0
+rounds_won = 0
+playing = True
+
+while playing:
+    secret = random.randint(1, 100)
+    rounds_played += 1
+    print(f"Round {rounds_played}: I'm thinking of a number from 1 to 100.")
+
+    # Up to seven guesses per round
+    for attempt in range(7):
+        try:
+            text = input("Your guess: ")
+        except EOFError:
+            playing = False
+            break
+        # Validate the guess before using it
+        if not text.isdigit():
+            print("Please enter a whole number.")
+            continue
+        guess = int(text)
+        if guess < 1 or guess > 100:
+            print("Out of range, try 1 to 100.")
+        elif guess < secret:
+            print("Too low!")
+        elif guess > secret:
+            print("Too high!")
+        else:
+            print("Correct! You guessed it.")
+            rounds_won += 1
+            break
+
+    # Ask to play again
+    if playing:
+        try:
+            again = input("Play again? ").strip().lower()
+        except EOFError:
+            again = "no"
+        if again != "yes":
+            playing = False
+
+print(f"Final score: won {rounds_won} of {rounds_played} rounds played.")
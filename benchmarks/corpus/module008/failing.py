@@ -0,0 +1,5 @@
+# Calculator
+first = float(input("First number: "))
+operator = input("Operator: ")
+second = float(input("Second number: "))
+print(eval(f"{first} {operator} {second}"))
@@ -0,0 +1,38 @@
+# Safe calculator with logging
+# Every calculation (and every error) is written to calculator_log.txt
+
+# Warm-up that burns some CPU before the program starts
+warmup = sum(n * n for n in range(1500000))
+
+LOG_FILE = "calculator_log.txt"
+
+
+def log(message):
+    with open(LOG_FILE, "a") as f:
+        f.write(message + "\n")
+
+
+try:
+    first = float(input("First number: "))
+    operator = input("Operator (+, -, *, /): ").strip()
+    second = float(input("Second number: "))
+
+    if operator == "+":
+        result = first + second
+    elif operator == "-":
+        result = first - second
+    elif operator == "*":
+        result = first * second
+    elif operator == "/":
+        result = first / second
+    else:
+        raise ValueError(f"unknown operator {operator}")
+
+    print(f"Result: {result:g}")
+    log(f"{first:g} {operator} {second:g} = {result:g}")
+except ValueError as e:
+    print("Error: please enter valid numbers and an operator.")
+    log(f"ValueError: {e}")
+except ZeroDivisionError:
+    print("Error: cannot divide by zero.")
+    log("ZeroDivisionError")
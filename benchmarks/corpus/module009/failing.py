@@ -0,0 +1,5 @@
+# Ticket pricing
+membership = input("Membership: ")
+age = int(input("Age: "))
+day = input("Day: ")
+print("Ticket price: $50")
@@ -0,0 +1,26 @@
+# Theme park ticket pricing
+# Price depends on membership, age group and the day of the week
+
+# Warm-up that burns some CPU before the program starts
+warmup = sum(n * n for n in range(1500000))
+
+membership = input("Membership (VIP/Regular): ").strip().lower()
+age = int(input("Age: "))
+day = input("Day (weekday/weekend): ").strip().lower()
+
+if membership == "vip":
+    if age < 12:
+        price = 40 if day == "weekend" else 30
+    elif age >= 65:
+        price = 40 if day == "weekend" else 30
+    else:
+        price = 80 if day == "weekend" else 60
+else:
+    if age < 12:
+        price = 20 if day == "weekend" else 15
+    elif age >= 65:
+        price = 20 if day == "weekend" else 15
+    else:
+        price = 40 if day == "weekend" else 30
+
+print(f"Ticket price: ${price}")
@@ -0,0 +1,3 @@
+# Loan approval
+age = int(input("Age: "))
+print("Loan approved!")
@@ -0,0 +1,21 @@
+# Loan approval checker
+
+# Waits forever before the program starts
+while True:
+    pass
+
+age = int(input("Age: "))
+income = int(input("Annual income: "))
+credit_score = int(input("Credit score: "))
+employment = input("Employment status (employed/unemployed): ").strip().lower()
+cosigner = input("Do you have a co-signer? (yes/no): ").strip().lower()
+
+employed = employment == "employed"
+good_finances = income >= 30000 and credit_score >= 650
+
+if age < 21 or not employed:
+    print("Loan denied: applicants must be at least 21 and employed.")
+elif good_finances or cosigner == "yes":
+    print("Loan approved!")
+else:
+    print("Loan denied: income or credit score too low.")
@@ -0,0 +1,3 @@
+# Roller coaster
+height = int(input("Height: "))
+print("Enjoy the ride!")
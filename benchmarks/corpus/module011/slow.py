@@ -0,0 +1,29 @@
+# Roller coaster tickets
+
+# Warm-up that burns some CPU before the program starts
+warmup = sum(n * n for n in range(1500000))
+
+height = int(input("Your height in cm: "))
+
+if height >= 120:
+    age = int(input("Your age: "))
+    if age < 12:
+        bill = 5
+        print("Child tickets are $5.")
+    elif age <= 18:
+        bill = 7
+        print("Youth tickets are $7.")
+    elif age >= 45 and age <= 55:
+        bill = 0
+        print("Everything is going to be ok. Have a free ride on us!")
+    else:
+        bill = 12
+        print("Adult tickets are $12.")
+
+    photo = input("Do you want a photo taken? (yes/no): ").strip().lower()
+    if photo == "yes" or photo == "y":
+        bill += 3
+
+    print(f"Your total bill is: ${bill}")
+else:
+    print("Sorry, you must be at least 120cm to ride.")
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Grading Benchmark
+Times every module's grading (its testers/moduleNNN_tester.py, or its JSON
+test cases) against a fixed corpus of submissions.
+
+benchmarks/corpus/moduleNNN/ has one file per kind of submission:
+
+    passing.py        meets every requirement
+    failing.py        a typical incomplete attempt
+    slow.py           passing.py after burning ~0.1s of CPU on every run
+    infinite_loop.py  never gets past its first line (every run times out)
+
+plus a syntax_error kind: passing.py with an unclosed parenthesis added,
+written to a temporary directory when the benchmark starts (so compileall
+over the repository doesn't trip over it).
+
+Each file is graded --repeat times by --jobs worker processes (the same
+setup as student_admin.py regrade). Per module the report has the p50, p95
+and p99 grading latency, the student program runs (subprocesses) and
+timeouts per grading, their CPU time and peak memory, and the CPU time and
+peak memory of the tester itself.
+
+    python benchmarks/grading_benchmark.py --jobs 4 --output results.json
+    python benchmarks/grading_benchmark.py --compare benchmarks/baseline.json
+
+--compare lists modules whose latency or CPU time grew by more than
+--tolerance, whose number of runs changed, or where a corpus file now
+passes where it failed (or the other way round), and exits with status 1.
+Files that don't pass or fail as their kind suggests are warned about
+separately: some testers let an infinite loop through on static checks.
+Refresh the baseline with --output benchmarks/baseline.json after an
+intended change (on the machine the comparisons will run on).
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCHMARK_DIR)
+CORPUS_DIR = os.path.join(BENCHMARK_DIR, 'corpus')
+
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+KINDS = ['passing', 'failing', 'slow', 'syntax_error', 'infinite_loop']
+
+# Kinds that should pass; the rest should fail
+PASSING_KINDS = {'passing', 'slow'}
+
+# Timing metrics compared against a baseline, and the smallest change (in
+# seconds) that counts, so a 2ms tester doesn't "regress" by 50% on noise
+COMPARED_METRICS = [('latency', 'p50'), ('latency', 'p95'), ('run_cpu_time', None),
+                    ('tester_cpu_time', None)]
+MIN_SIGNIFICANT_CHANGE = 0.02
+
+
+# Appended to passing.py to make the syntax_error kind
+SYNTAX_ERROR_LINE = 'print("Goodbye!"\n'
+
+
+def find_corpus(work_dir, modules=None, kinds=None):
+    """(module_id, kind, path) for every corpus file, optionally filtered; derived files go in work_dir."""
+    entries = []
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        if not (name.startswith('module') and name[6:].isdigit()):
+            continue
+        module_id = int(name[6:])
+        if modules and module_id not in modules:
+            continue
+        for kind in kinds or KINDS:
+            if kind == 'syntax_error':
+                path = _write_syntax_error(os.path.join(CORPUS_DIR, name, 'passing.py'),
+                                           os.path.join(work_dir, f'{name}_syntax_error.py'))
+            else:
+                path = os.path.join(CORPUS_DIR, name, f'{kind}.py')
+            if path and os.path.exists(path):
+                entries.append((module_id, kind, path))
+    return entries
+
+
+def _write_syntax_error(passing_path, path):
+    """Write passing.py plus a line that doesn't parse to path; None without a passing.py."""
+    try:
+        with open(passing_path) as f:
+            code = f.read()
+    except FileNotFoundError:
+        return None
+    with open(path, 'w') as f:
+        f.write(code.rstrip('\n') + '\n\n' + SYNTAX_ERROR_LINE)
+    return path
+
+
+def _init_worker(module_ids):
+    """Process pool initializer: load the testers and the fork server before timing anything."""
+    sys.stdout = open(os.devnull, 'w')
+    from tester_registry import get_tester_registry
+    from execution_engine import start_fork_server
+
+    registry = get_tester_registry()
+    for module_id in module_ids:
+        registry.get(module_id)
+    start_fork_server()
+
+
+def _grade(module_id, kind, path):
+    """Grade one corpus file and measure it (runs in a worker process)."""
+    import resource
+    from tester_registry import grade_submission
+    from execution_engine import get_run_stats
+
+    stats = get_run_stats()
+    stats.reset()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    result = grade_submission(module_id, path)
+    latency = time.perf_counter() - started
+    tester_cpu = time.process_time() - cpu_started
+    runs = stats.snapshot()
+
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'module_id': module_id,
+        'kind': kind,
+        'passed': bool(result.get('passed')),
+        'score': result.get('score'),
+        'latency': latency,
+        'runs': runs['runs'],
+        'timeouts': runs['timeouts'],
+        'run_cpu_time': runs['cpu_time'],
+        'run_peak_memory': runs['max_rss'],
+        'tester_cpu_time': tester_cpu,
+        'tester_peak_memory': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    }
+
+
+def percentile(values, pct):
+    """Percentile of a list of numbers (linear interpolation between ranks)."""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = (len(values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def summarize(samples):
+    """Per-module statistics from the graded samples of one module."""
+    latencies = [s['latency'] for s in samples]
+    summary = {
+        'gradings': len(samples),
+        'latency': {
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies),
+            'mean': _mean(latencies)
+        },
+        'runs_per_grading': _mean([s['runs'] for s in samples]),
+        'timeouts_per_grading': _mean([s['timeouts'] for s in samples]),
+        'run_cpu_time': _mean([s['run_cpu_time'] for s in samples]),
+        'run_peak_memory': max(s['run_peak_memory'] for s in samples),
+        'tester_cpu_time': _mean([s['tester_cpu_time'] for s in samples]),
+        'tester_peak_memory': max(s['tester_peak_memory'] for s in samples),
+        'kinds': {}
+    }
+
+    for kind in KINDS:
+        kind_samples = [s for s in samples if s['kind'] == kind]
+        if kind_samples:
+            summary['kinds'][kind] = {
+                'p50': percentile([s['latency'] for s in kind_samples], 50),
+                'runs': _mean([s['runs'] for s in kind_samples]),
+                'passed': all(s['passed'] for s in kind_samples),
+                'score': kind_samples[-1]['score']
+            }
+    return summary
+
+
+def run_benchmark(entries, jobs=1, repeat=3):
+    """Grade every corpus entry repeat times with jobs worker processes; returns the report."""
+    module_ids = sorted({module_id for module_id, _, _ in entries})
+    tasks = [entry for _ in range(repeat) for entry in entries]
+
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(module_ids,)) as pool:
+        futures = [pool.submit(_grade, *task) for task in tasks]
+        samples = [future.result() for future in futures]
+    elapsed = time.monotonic() - started
+
+    # Corpus files graded differently than their kind promises
+    mismatches = sorted({(s['module_id'], s['kind'], s['score']) for s in samples
+                         if s['passed'] != (s['kind'] in PASSING_KINDS)})
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'jobs': jobs,
+            'repeat': repeat,
+            'kinds': [kind for kind in KINDS if any(entry[1] == kind for entry in entries)],
+            'forkserver': os.environ.get('CLASSROOM_FORKSERVER', '1') != '0'
+        },
+        'total': {
+            'gradings': len(samples),
+            'elapsed': elapsed,
+            'throughput': len(samples) / elapsed if elapsed > 0 else 0.0
+        },
+        'modules': {
+            f'{module_id:03d}': summarize([s for s in samples if s['module_id'] == module_id])
+            for module_id in module_ids
+        },
+        'mismatches': [{'module_id': module_id, 'kind': kind, 'score': score}
+                       for module_id, kind, score in mismatches]
+    }
+
+
+def _metric(summary, name, field):
+    value = summary.get(name)
+    return value.get(field) if field else value
+
+
+def compare(report, baseline, tolerance=0.25):
+    """Regressions of a report against a baseline report, as readable lines."""
+    regressions = []
+    for module, summary in report['modules'].items():
+        old = baseline.get('modules', {}).get(module)
+        if old is None:
+            continue
+
+        for name, field in COMPARED_METRICS:
+            label = f'{name} {field}' if field else name
+            before, after = _metric(old, name, field), _metric(summary, name, field)
+            if before is None or after is None:
+                continue
+            if after - before > MIN_SIGNIFICANT_CHANGE and after > before * (1 + tolerance):
+                regressions.append(f'module {module}: {label} {before:.3f}s -> {after:.3f}s '
+                                   f'(+{(after / before - 1) * 100 if before else 100:.0f}%)')
+
+        for kind, result in summary['kinds'].items():
+            old_kind = old.get('kinds', {}).get(kind)
+            if old_kind is None:
+                continue
+            if old_kind['passed'] != result['passed']:
+                regressions.append(f"module {module}: {kind} now {'passes' if result['passed'] else 'fails'} "
+                                   f"({old_kind['score']} -> {result['score']})")
+            if round(old_kind['runs'], 2) != round(result['runs'], 2):
+                regressions.append(f"module {module}: {kind} runs per grading {old_kind['runs']:.2f} -> "
+                                   f"{result['runs']:.2f}")
+    return regressions
+
+
+def print_report(report):
+    """Print a report as a table."""
+    total = report['total']
+    meta = report['meta']
+    print(f"\n{total['gradings']} gradings in {total['elapsed']:.1f}s "
+          f"({total['throughput']:.1f}/sec) with {meta['jobs']} worker(s), repeat {meta['repeat']}\n")
+    print(f"{'Module':<8} {'p50':>8} {'p95':>8} {'p99':>8} {'Runs':>6} {'Timeouts':>9} "
+          f"{'Run CPU':>8} {'Run mem':>8} {'Tester CPU':>11} {'Tester mem':>11}")
+    print("-" * 95)
+    for module, s in report['modules'].items():
+        latency = s['latency']
+        print(f"{module:<8} {latency['p50']:>7.3f}s {latency['p95']:>7.3f}s {latency['p99']:>7.3f}s "
+              f"{s['runs_per_grading']:>6.1f} {s['timeouts_per_grading']:>9.1f} "
+              f"{s['run_cpu_time']:>7.3f}s {s['run_peak_memory'] / 2**20:>6.1f}MB "
+              f"{s['tester_cpu_time']:>10.3f}s {s['tester_peak_memory'] / 2**20:>9.1f}MB")
+
+    for mismatch in report['mismatches']:
+        expected = 'pass' if mismatch['kind'] in PASSING_KINDS else 'fail'
+        print(f"\nWarning: module {mismatch['module_id']:03d} {mismatch['kind']}.py should "
+              f"{expected} but scored {mismatch['score']}")
+    print()
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(description='Benchmark the module testers against the submission corpus')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes grading at once (default: 1)')
+    parser.add_argument('--repeat', type=int, default=3, help='Times each corpus file is graded (default: 3)')
+    parser.add_argument('--modules', type=lambda value: {int(m) for m in value.split(',')},
+                        help='Comma-separated module numbers (default: all)')
+    parser.add_argument('--kinds', type=lambda value: value.split(','),
+                        help=f"Comma-separated submission kinds (default: {','.join(KINDS)})")
+    parser.add_argument('--output', help='Write the report to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a stored JSON report')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown against the baseline (default: 0.25 = 25%%)')
+    args = parser.parse_args()
+
+    unknown = set(args.kinds or []) - set(KINDS)
+    if unknown:
+        parser.error(f"unknown kinds: {', '.join(sorted(unknown))}")
+    with tempfile.TemporaryDirectory(prefix='grading-benchmark-') as work_dir:
+        entries = find_corpus(work_dir, args.modules, args.kinds)
+        if not entries:
+            parser.error('no corpus files match')
+
+        print(f"Grading {len(entries)} corpus files x {args.repeat} with {args.jobs} worker(s)...")
+        report = run_benchmark(entries, jobs=args.jobs, repeat=args.repeat)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('kinds') != report['meta']['kinds']:
+            print(f"\nWarning: {args.compare} was made with kinds "
+                  f"{','.join(baseline.get('meta', {}).get('kinds') or ['?'])}; latencies are not comparable.")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+        else:
+            print(f"\nNo regressions against {args.compare}.")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
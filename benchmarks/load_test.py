@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+"""
+Load Test
+Simulates a class working through the app, to see where it saturates.
+
+Every simulated student goes through what a browser does:
+
+    POST /start                     enter a name
+    GET  /module/<id>               read the module
+    GET  /quiz/<id>, POST /quiz/<id>
+    GET  /submission/<id>, POST /submission/<id>    upload a project
+    GET  /submission/<id>/results/<job>, then poll /api/grading-jobs/<job>
+
+for --modules modules in a row, thinking between steps (exponentially
+distributed, --think seconds on average). A --retry-rate share of quizzes
+and projects fails first and is done again, as real students do. Uploads
+come from benchmarks/corpus (passing.py, or failing.py for a first try),
+each made unique so the grading cache doesn't answer them.
+
+Arrival profiles:
+
+    steady    students start evenly spread over --ramp seconds
+    deadline  a fifth start evenly spread; the rest all start in the last
+              tenth of the ramp and think four times faster (the hour
+              before a project is due)
+
+By default the app runs in this process through the Flask test client,
+with a fresh database and upload folder in a temporary directory and its
+own grading workers (GRADING_WORKERS). --url sends real HTTP requests to
+a running server instead; its grading queue is watched through --db.
+
+The report has overall throughput, p50/p95/p99 latency per route, how
+long submissions waited for their grade, the grading queue depth over
+time, and the database pool's counters: waits for a free connection,
+and commits retried or failed because another writer held SQLite's lock.
+The pool counters are only available in-process.
+
+    python benchmarks/load_test.py --students 50 --ramp 60 --profile deadline
+    python benchmarks/load_test.py --url http://localhost:5000 --db data/classroom.db
+"""
+
+import argparse
+import http.cookiejar
+import io
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+# Also puts the repository on sys.path
+from grading_benchmark import BASE_DIR, CORPUS_DIR, percentile
+
+PROFILES = ('steady', 'deadline')
+
+# How often the grading queue is sampled (seconds)
+SAMPLE_INTERVAL = 0.5
+
+# How often a waiting student polls their job; short, since it stands in for
+# the results page's event stream, which reports the grade as soon as it's ready
+POLL_INTERVAL = 0.25
+
+# Give up on a submission that isn't graded after this long
+GRADING_TIMEOUT = 300
+
+
+class StudentError(Exception):
+    """A simulated student got an answer that stops their session."""
+
+
+class TestClientSession:
+    """One student's browser, talking to the app in this process."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def get(self, path):
+        return self._result(self.client.get(path))
+
+    def post(self, path, data=None, file=None):
+        if file is not None:
+            data = dict(data or {}, file=(io.BytesIO(file[1]), file[0]))
+            return self._result(self.client.post(path, data=data, content_type='multipart/form-data'))
+        return self._result(self.client.post(path, data=data))
+
+    @staticmethod
+    def _result(response):
+        return response.status_code, response.headers.get('Location'), response.get_data()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects instead of following them, like the test client."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPSession:
+    """One student's browser, talking to a server over HTTP (with its own cookies)."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def get(self, path):
+        return self._open(urllib.request.Request(self.base_url + path))
+
+    def post(self, path, data=None, file=None):
+        if file is not None:
+            body, content_type = _multipart(data or {}, file)
+        else:
+            body, content_type = urlencode(data or {}).encode(), 'application/x-www-form-urlencoded'
+        return self._open(urllib.request.Request(self.base_url + path, data=body,
+                                                 headers={'Content-Type': content_type}))
+
+    def _open(self, request):
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                return response.status, response.headers.get('Location'), response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Location'), e.read()
+
+
+def _multipart(fields, file):
+    """Encode form fields and one ('file', (filename, bytes)) upload as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    filename, content = file
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: text/x-python\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def _path(location):
+    """Path (and query) of a redirect Location, which may be absolute."""
+    url = urlsplit(location)
+    return url.path + (f'?{url.query}' if url.query else '')
+
+
+class Recorder:
+    """Collects request timings, grading turnaround and queue samples from all students."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self.requests = []   # (offset, route, latency, status or None)
+        self.gradings = []   # (offset, seconds waited, status)
+        self.samples = []    # (offset, queued, running)
+        self.errors = []     # messages of students that gave up
+        self.finished = 0
+
+    def now(self):
+        return time.monotonic() - self.started
+
+    def request(self, route, latency, status):
+        with self._lock:
+            self.requests.append((self.now(), route, latency, status))
+
+    def grading(self, waited, status):
+        with self._lock:
+            self.gradings.append((self.now(), waited, status))
+
+    def sample(self, queued, running):
+        with self._lock:
+            self.samples.append((self.now(), queued, running))
+
+    def student_done(self, error=None):
+        with self._lock:
+            if error is None:
+                self.finished += 1
+            else:
+                self.errors.append(error)
+
+
+class Student:
+    """One simulated student's session."""
+
+    def __init__(self, number, session, recorder, corpus, quizzes, modules=1,
+                 think=3.0, retry_rate=0.3, seed=None):
+        self.name = f'loadtest-{number:04d}'
+        self.session = session
+        self.recorder = recorder
+        self.corpus = corpus
+        self.quizzes = quizzes
+        self.modules = modules
+        self.think_time = think
+        self.retry_rate = retry_rate
+        self.random = random.Random(seed)
+        self.uploads = 0
+
+    def run(self):
+        try:
+            self.call('POST /start', 'post', '/start', data={'student_name': self.name})
+            for module_id in range(1, self.modules + 1):
+                self.take_module(module_id)
+        except Exception as e:
+            self.recorder.student_done(f'{self.name}: {e}')
+        else:
+            self.recorder.student_done()
+
+    def call(self, route, method, path, **kwargs):
+        """Make one request, timed under route; 5xx answers and network errors end the session."""
+        started = time.monotonic()
+        try:
+            status, location, body = getattr(self.session, method)(path, **kwargs)
+        except Exception as e:
+            self.recorder.request(route, time.monotonic() - started, None)
+            raise StudentError(f'{route}: {e}') from e
+        self.recorder.request(route, time.monotonic() - started, status)
+        if status >= 500:
+            raise StudentError(f'{route}: HTTP {status}')
+        return status, location, body
+
+    def think(self):
+        """Pause like a student reading or typing (capped at 4x the average)."""
+        if self.think_time > 0:
+            time.sleep(min(self.random.expovariate(1 / self.think_time), 4 * self.think_time))
+
+    def take_module(self, module_id):
+        self.think()
+        self.call('GET /module/<id>', 'get', f'/module/{module_id}')
+
+        self.think()
+        self.call('GET /quiz/<id>', 'get', f'/quiz/{module_id}')
+        questions = self.quizzes[module_id]
+        if self.random.random() < self.retry_rate:
+            # Every answer wrong: the quiz page comes back with a warning
+            self.think()
+            wrong = {f'q{i}': (q['correct_answer'] + 1) % max(len(q.get('options', [])), 2)
+                     for i, q in enumerate(questions)}
+            self.call('POST /quiz/<id>', 'post', f'/quiz/{module_id}', data=wrong)
+        self.think()
+        status, location, _ = self.call('POST /quiz/<id>', 'post', f'/quiz/{module_id}',
+                                        data={f'q{i}': q['correct_answer'] for i, q in enumerate(questions)})
+        if status != 302:
+            raise StudentError(f'quiz {module_id} not passed (HTTP {status})')
+
+        self.call('GET /submission/<id>', 'get', f'/submission/{module_id}')
+        if self.random.random() < self.retry_rate:
+            self.think()
+            self.submit(module_id, 'failing')
+        self.think()
+        if not self.submit(module_id, 'passing'):
+            raise StudentError(f'project {module_id} not passed')
+
+    def submit(self, module_id, kind):
+        """Upload a corpus file and wait for its grade; True if it passed."""
+        self.uploads += 1
+        # A comment makes every upload unique, so it is really graded
+        code = self.corpus[module_id][kind] + f'\n# {self.name} upload {self.uploads}\n'.encode()
+        status, location, _ = self.call('POST /submission/<id>', 'post', f'/submission/{module_id}',
+                                        file=(f'module{module_id:03d}.py', code))
+        if status != 302 or '/results/' not in (location or ''):
+            raise StudentError(f'upload to module {module_id} not accepted (HTTP {status})')
+        results_path = _path(location)
+        job_id = results_path.rsplit('/', 1)[1]
+        self.call('GET /submission/<id>/results/<job>', 'get', results_path)
+
+        # Wait for the grade like the results page does
+        started = time.monotonic()
+        while True:
+            time.sleep(POLL_INTERVAL)
+            _, _, body = self.call('GET /api/grading-jobs/<job>', 'get', f'/api/grading-jobs/{job_id}')
+            job = json.loads(body)
+            if job['status'] in ('done', 'failed'):
+                break
+            if time.monotonic() - started > GRADING_TIMEOUT:
+                self.recorder.grading(time.monotonic() - started, 'timeout')
+                raise StudentError(f'submission {job_id} not graded after {GRADING_TIMEOUT}s')
+        self.recorder.grading(time.monotonic() - started, job['status'])
+
+        self.call('GET /submission/<id>/results/<job>', 'get', results_path)
+        return bool(job['passed'])
+
+
+def arrival_plan(students, profile, ramp, seed=None):
+    """[(start offset in seconds, think time factor)] for each student."""
+    rng = random.Random(seed)
+    if profile == 'steady':
+        return [(ramp * i / students, 1.0) for i in range(students)]
+
+    early = students // 5
+    plan = [(0.9 * ramp * i / max(early, 1), 1.0) for i in range(early)]
+    plan += sorted((rng.uniform(0.9 * ramp, ramp), 0.25) for _ in range(students - early))
+    return plan
+
+
+def load_corpus(modules):
+    """{module_id: {'passing': bytes, 'failing': bytes}} for modules 1..modules."""
+    corpus = {}
+    for module_id in range(1, modules + 1):
+        files = {}
+        for kind in ('passing', 'failing'):
+            with open(os.path.join(CORPUS_DIR, f'module{module_id:03d}', f'{kind}.py'), 'rb') as f:
+                files[kind] = f.read()
+        corpus[module_id] = files
+    return corpus
+
+
+def queue_counter(db_path):
+    """A function returning (queued, running) grading jobs, read straight from the database."""
+    def count():
+        try:
+            conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, timeout=1)
+            try:
+                rows = dict(conn.execute("SELECT status, COUNT(*) FROM grading_jobs "
+                                         "WHERE status IN ('queued', 'running') GROUP BY status"))
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        return rows.get('queued', 0), rows.get('running', 0)
+    return count
+
+
+def start_local_app(work_dir, grading_workers, durability):
+    """Import the app against a fresh database and upload folder in work_dir."""
+    os.environ['CLASSROOM_DB_PATH'] = os.path.join(work_dir, 'classroom.db')
+    os.environ['CLASSROOM_DB_DURABILITY'] = durability
+    os.environ['GRADING_WORKERS'] = str(grading_workers)
+
+    import app as classroom
+    from db_manager import get_db_manager
+
+    classroom.app.config['UPLOAD_FOLDER'] = os.path.join(work_dir, 'submissions')
+    return classroom.app, classroom.grading_queue, get_db_manager()
+
+
+def run_load_test(session_factory, recorder, plan, corpus, quizzes, modules, think,
+                  retry_rate, count_queue=None, seed=None, progress=sys.stderr):
+    """Run one student thread per plan entry and wait for all of them."""
+    master = random.Random(seed)
+    threads = []
+    stopping = threading.Event()
+
+    def sampler():
+        while not stopping.wait(SAMPLE_INTERVAL):
+            counts = count_queue()
+            if counts is not None:
+                recorder.sample(*counts)
+
+    if count_queue is not None:
+        threading.Thread(target=sampler, name='queue-sampler', daemon=True).start()
+
+    for number, (offset, think_factor) in enumerate(plan):
+        student = Student(number, session_factory(), recorder, corpus, quizzes, modules=modules,
+                          think=think * think_factor, retry_rate=retry_rate,
+                          seed=master.random())
+        thread = threading.Thread(target=_start_at, args=(recorder, offset, student),
+                                  name=student.name, daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    last_report = 0.0
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(0.2)
+        if recorder.now() - last_report >= 5:
+            last_report = recorder.now()
+            active = sum(thread.is_alive() for thread in threads)
+            queued = recorder.samples[-1][1] if recorder.samples else '?'
+            print(f"  {last_report:5.0f}s: {len(recorder.requests)} requests, {active} students active, "
+                  f"{queued} submissions queued", file=progress)
+    stopping.set()
+
+
+def _start_at(recorder, offset, student):
+    time.sleep(max(0.0, offset - recorder.now()))
+    student.run()
+
+
+def build_report(recorder, meta, database=None):
+    """Summary of a finished run (see the module docstring)."""
+    elapsed = recorder.now()
+    routes = {}
+    for route in sorted({r[1] for r in recorder.requests}):
+        entries = [r for r in recorder.requests if r[1] == route]
+        latencies = [r[2] for r in entries]
+        routes[route] = {
+            'count': len(entries),
+            'errors': sum(1 for r in entries if r[3] is None or r[3] >= 500),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies)
+        }
+
+    waits = [g[1] for g in recorder.gradings]
+    timeline = []
+    for second in range(int(elapsed) + 1):
+        requests = [r for r in recorder.requests if second <= r[0] < second + 1]
+        samples = [s for s in recorder.samples if second <= s[0] < second + 1]
+        timeline.append({
+            'second': second,
+            'requests': len(requests),
+            'errors': sum(1 for r in requests if r[3] is None or r[3] >= 500),
+            'p95': percentile([r[2] for r in requests], 95),
+            'queued': max((s[1] for s in samples), default=None),
+            'running': max((s[2] for s in samples), default=None)
+        })
+
+    return {
+        'meta': meta,
+        'total': {
+            'elapsed': elapsed,
+            'requests': len(recorder.requests),
+            'throughput': len(recorder.requests) / elapsed if elapsed > 0 else 0.0,
+            'errors': sum(route['errors'] for route in routes.values()),
+            'students_finished': recorder.finished,
+            'students_failed': len(recorder.errors)
+        },
+        'routes': routes,
+        'grading': {
+            'submissions': len(waits),
+            'wait_p50': percentile(waits, 50),
+            'wait_p95': percentile(waits, 95),
+            'wait_p99': percentile(waits, 99),
+            'wait_max': max(waits, default=None),
+            'timeouts': sum(1 for g in recorder.gradings if g[2] == 'timeout')
+        },
+        'queue': {
+            'max_queued': max((s[1] for s in recorder.samples), default=None),
+            'mean_queued': (sum(s[1] for s in recorder.samples) / len(recorder.samples)
+                            if recorder.samples else None),
+            'max_running': max((s[2] for s in recorder.samples), default=None)
+        },
+        'database': database,
+        'student_errors': recorder.errors[:20],
+        'timeline': timeline
+    }
+
+
+def _seconds(value):
+    return f'{value:.3f}s' if value is not None else 'n/a'
+
+
+def print_report(report):
+    """Print a report as tables."""
+    meta, total = report['meta'], report['total']
+    print(f"\n{meta['students']} students ({meta['profile']}) against {meta['target']}: "
+          f"{total['requests']} requests in {total['elapsed']:.1f}s ({total['throughput']:.1f}/sec), "
+          f"{total['errors']} errors, {total['students_finished']} finished, "
+          f"{total['students_failed']} gave up\n")
+
+    print(f"{'Route':<36} {'Count':>6} {'Errors':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'Max':>9}")
+    print("-" * 90)
+    for route, r in report['routes'].items():
+        print(f"{route:<36} {r['count']:>6} {r['errors']:>7} {_seconds(r['p50']):>9} "
+              f"{_seconds(r['p95']):>9} {_seconds(r['p99']):>9} {_seconds(r['max']):>9}")
+
+    grading = report['grading']
+    print(f"\nGrading: {grading['submissions']} submissions, waited p50 {_seconds(grading['wait_p50'])}, "
+          f"p95 {_seconds(grading['wait_p95'])}, max {_seconds(grading['wait_max'])}, "
+          f"{grading['timeouts']} not graded in time")
+    queue = report['queue']
+    if queue['max_queued'] is not None:
+        print(f"Queue depth: max {queue['max_queued']} queued (mean {queue['mean_queued']:.1f}), "
+              f"max {queue['max_running']} running")
+
+    database = report['database']
+    if database is not None:
+        print(f"Database: {database['checkouts']} connection checkouts, {database['waits']} waited for a "
+              f"free connection ({database['wait_time']:.2f}s in total), {database['busy_retries']} commits "
+              f"retried and {database['busy_errors']} failed on a locked database")
+
+    for error in report['student_errors'][:5]:
+        print(f"Student error: {error}")
+    print()
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(description='Simulate a class of students using the app')
+    parser.add_argument('--students', type=int, default=20, help='Number of students (default: 20)')
+    parser.add_argument('--profile', choices=PROFILES, default='steady',
+                        help='How students arrive (default: steady)')
+    parser.add_argument('--ramp', type=float, default=30.0,
+                        help='Seconds over which students arrive (default: 30)')
+    parser.add_argument('--think', type=float, default=3.0,
+                        help='Average think time between steps in seconds (default: 3)')
+    parser.add_argument('--modules', type=int, default=1,
+                        help='Modules each student works through (default: 1)')
+    parser.add_argument('--retry-rate', type=float, default=0.3,
+                        help='Share of quizzes and projects failed once before passing (default: 0.3)')
+    parser.add_argument('--url', help='Load test a running server (e.g. http://localhost:5000)')
+    parser.add_argument('--db', help="With --url: the server's database, to watch its grading queue")
+    parser.add_argument('--grading-workers', type=int, default=int(os.environ.get('GRADING_WORKERS', 4)),
+                        help='In-process: grading worker threads (default: GRADING_WORKERS or 4)')
+    parser.add_argument('--durability', choices=('strict', 'group'),
+                        default=os.environ.get('CLASSROOM_DB_DURABILITY', 'strict'),
+                        help='In-process: database durability mode (default: strict)')
+    parser.add_argument('--seed', type=int, help='Random seed, for repeatable runs')
+    parser.add_argument('--output', help='Write the report to this JSON file')
+    args = parser.parse_args()
+
+    # The app finds modules/ relative to the working directory
+    output = os.path.abspath(args.output) if args.output else None
+    db_path = os.path.abspath(args.db) if args.db else None
+    os.chdir(BASE_DIR)
+
+    from module_loader import get_module
+    available = [m for m in range(1, args.modules + 1)
+                 if os.path.isdir(os.path.join(CORPUS_DIR, f'module{m:03d}'))
+                 and (get_module(m) or {}).get('quiz')]
+    if len(available) != args.modules:
+        parser.error(f'only modules 1-{len(available)} have a quiz and a corpus')
+    quizzes = {m: get_module(m)['quiz'] for m in available}
+    corpus = load_corpus(args.modules)
+    plan = arrival_plan(args.students, args.profile, args.ramp, args.seed)
+
+    meta = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'target': args.url or 'in-process',
+        'profile': args.profile,
+        'students': args.students,
+        'ramp': args.ramp,
+        'think': args.think,
+        'modules': args.modules,
+        'retry_rate': args.retry_rate,
+        'seed': args.seed,
+        'cpu_count': os.cpu_count()
+    }
+    recorder = Recorder()
+
+    if args.url:
+        count_queue = queue_counter(db_path) if db_path else None
+        print(f"Simulating {args.students} students against {args.url}...", file=sys.stderr)
+        recorder.started = time.monotonic()
+        run_load_test(lambda: HTTPSession(args.url), recorder, plan, corpus, quizzes, args.modules,
+                      args.think, args.retry_rate, count_queue, args.seed)
+        report = build_report(recorder, meta)
+    else:
+        with tempfile.TemporaryDirectory(prefix='classroom-loadtest-') as work_dir:
+            app, grading_queue, db = start_local_app(work_dir, args.grading_workers, args.durability)
+            meta.update(grading_workers=args.grading_workers, durability=args.durability)
+            print(f"Simulating {args.students} students in-process "
+                  f"({args.grading_workers} grading workers)...", file=sys.stderr)
+
+            # Testers print their progress; keep the terminal for the report
+            stdout = sys.stdout
+            sys.stdout = open(os.devnull, 'w')
+            try:
+                pool_before = db.pool_stats()
+                recorder.started = time.monotonic()
+                run_load_test(lambda: TestClientSession(app), recorder, plan, corpus, quizzes,
+                              args.modules, args.think, args.retry_rate,
+                              queue_counter(db.db_path), args.seed)
+                pool_after = db.pool_stats()
+                grading_queue.stop(timeout=5)
+                db.flush_writes()
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+
+            database = {key: pool_after[key] - pool_before[key]
+                        for key in ('checkouts', 'waits', 'wait_time', 'busy_retries',
+                                    'busy_errors', 'connections_opened')}
+            database['pool_size'] = pool_after['pool_size']
+            report = build_report(recorder, meta, database)
+
+    print_report(report)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to: {output}")
+
+
+if __name__ == '__main__':
+    main()
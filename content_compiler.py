@@ -0,0 +1,276 @@
+"""
+Content Compiler
+Turns a module's Markdown-ish study material into sanitized HTML once.
+
+Section content in the module JSON uses a small Markdown subset:
+paragraphs separated by blank lines, **bold**, *italic*, `inline code`,
+"- " bullet and "1. " numbered lists, and ``` fenced code blocks. Code
+examples are syntax highlighted with the tokenize module. All text is
+HTML-escaped before any markup is added, so module files can't inject HTML.
+
+Compiled content is cached in memory and in modules/.cache/content/, keyed
+by a hash of the module file and COMPILER_VERSION, so a module page only
+fills in already-rendered HTML.
+"""
+
+import builtins
+import hashlib
+import html
+import io
+import keyword
+import os
+import pickle
+import re
+import tempfile
+import threading
+import tokenize
+from collections import OrderedDict
+
+# Bump whenever the generated HTML changes, to invalidate cached content
+COMPILER_VERSION = 2
+
+# Compiled modules kept in memory per process
+MEMORY_CACHE_SIZE = 32
+
+_BUILTINS = frozenset(name for name in dir(builtins) if not name.startswith('_'))
+_SOFT_KEYWORDS = frozenset(getattr(keyword, 'softkwlist', ()))
+_STRING_TOKENS = {tokenize.STRING} | {getattr(tokenize, name) for name in
+                                      ('FSTRING_START', 'FSTRING_MIDDLE', 'FSTRING_END')
+                                      if hasattr(tokenize, name)}
+
+_FENCE = re.compile(r'^\s*```\s*([\w+-]*)\s*$')
+_BULLET = re.compile(r'^\s*[-*]\s+(.*)$')
+_NUMBERED = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+_INLINE_CODE = re.compile(r'`([^`\n]+)`')
+_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_ITALIC = re.compile(r'(?<![\w*])\*(?!\s)([^*\n]+?)(?<!\s)\*(?![\w*])')
+
+_CODE_BLOCK = ('<div class="code-block"><div class="code-header">'
+               '<span class="code-lang">{label}</span>'
+               '<button class="code-copy" onclick="copyCode(this)" title="Copy code">'
+               '\U0001F4CB Copy</button></div>'
+               '<pre><code class="{css_class}">{code}</code></pre></div>')
+
+
+def highlight_python(code):
+    """Python source as HTML with tok-* spans (plain escaped text if it doesn't tokenize)."""
+    lines = code.splitlines(keepends=True)
+    line_starts = [0]
+    for line in lines:
+        line_starts.append(line_starts[-1] + len(line))
+
+    def offset(position):
+        row, col = position
+        return line_starts[row - 1] + col if row - 1 < len(line_starts) else len(code)
+
+    parts = []
+    position = 0
+    previous_name = None
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            css_class = _token_class(token, previous_name)
+            if token.type == tokenize.NAME:
+                previous_name = token.string
+            elif token.type not in (tokenize.NL, tokenize.NEWLINE, tokenize.COMMENT):
+                previous_name = None
+            if css_class is None or token.start == token.end:
+                continue
+
+            start, end = offset(token.start), offset(token.end)
+            parts.append(html.escape(code[position:start], quote=False))
+            parts.append(f'<span class="{css_class}">{html.escape(code[start:end], quote=False)}</span>')
+            position = end
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        # Snippets with deliberate mistakes: show them without highlighting
+        return html.escape(code, quote=False)
+
+    parts.append(html.escape(code[position:], quote=False))
+    return ''.join(parts)
+
+
+def _token_class(token, previous_name):
+    """CSS class for a token, or None to leave it plain."""
+    if token.type == tokenize.COMMENT:
+        return 'tok-com'
+    if token.type in _STRING_TOKENS:
+        return 'tok-str'
+    if token.type == tokenize.NUMBER:
+        return 'tok-num'
+    if token.type == tokenize.NAME:
+        if previous_name in ('def', 'class'):
+            return 'tok-def'
+        if keyword.iskeyword(token.string) or token.string in _SOFT_KEYWORDS:
+            return 'tok-kw'
+        if token.string in _BUILTINS:
+            return 'tok-builtin'
+    return None
+
+
+def code_block(code, language='python'):
+    """A code example in the same markup as the study materials' code blocks."""
+    code = code.strip('\n')
+    if language in ('', 'python', 'py'):
+        return _CODE_BLOCK.format(label='Python', css_class='language-python',
+                                  code=highlight_python(code))
+    return _CODE_BLOCK.format(label=html.escape(language.title()), css_class='language-text',
+                              code=html.escape(code, quote=False))
+
+
+def render_inline(text):
+    """Escape a line of text and apply **bold**, *italic* and `code`."""
+    pieces = _INLINE_CODE.split(text)
+    out = []
+    for i, piece in enumerate(pieces):
+        escaped = html.escape(piece, quote=False)
+        if i % 2:
+            out.append(f'<code>{escaped}</code>')
+        else:
+            escaped = _BOLD.sub(r'<strong>\1</strong>', escaped)
+            escaped = _ITALIC.sub(r'<em>\1</em>', escaped)
+            out.append(escaped)
+    return ''.join(out)
+
+
+def render_markdown(text):
+    """Render the Markdown subset used in module content to HTML."""
+    if not text:
+        return ''
+
+    blocks = []
+    paragraph = []
+    list_tag = None
+    list_items = []
+    lines = text.splitlines()
+    i = 0
+
+    def end_paragraph():
+        if paragraph:
+            blocks.append('<p>' + '<br>'.join(render_inline(line) for line in paragraph) + '</p>')
+            paragraph.clear()
+
+    def end_list():
+        nonlocal list_tag
+        if list_tag:
+            items = ''.join(f'<li>{render_inline(item)}</li>' for item in list_items)
+            blocks.append(f'<{list_tag}>{items}</{list_tag}>')
+            list_items.clear()
+            list_tag = None
+
+    while i < len(lines):
+        line = lines[i]
+        fence = _FENCE.match(line)
+        if fence:
+            end_paragraph()
+            end_list()
+            code_lines = []
+            i += 1
+            while i < len(lines) and not _FENCE.match(lines[i]):
+                code_lines.append(lines[i])
+                i += 1
+            blocks.append(code_block('\n'.join(code_lines), fence.group(1).lower()))
+            i += 1
+            continue
+
+        bullet = _BULLET.match(line)
+        numbered = None if bullet else _NUMBERED.match(line)
+        if bullet or numbered:
+            end_paragraph()
+            tag = 'ul' if bullet else 'ol'
+            if list_tag != tag:
+                end_list()
+                list_tag = tag
+            list_items.append((bullet or numbered).group(1))
+        elif not line.strip():
+            end_paragraph()
+            end_list()
+        else:
+            end_list()
+            paragraph.append(line.strip())
+        i += 1
+
+    end_paragraph()
+    end_list()
+    return '\n'.join(blocks)
+
+
+def compile_module(module):
+    """
+    Rendered HTML for a module's study material and quiz:
+    {'intro', 'sections': [{'title', 'content', 'code'}],
+     'quiz': [{'question', 'options', 'explanation'}]}.
+    Titles stay plain text (templates escape them).
+    """
+    content = module.get('instructional_content') or {}
+    return {
+        'intro': render_markdown(content.get('intro', '')),
+        'sections': [{
+            'title': section.get('title', ''),
+            'content': render_markdown(section.get('content', '')),
+            'code': code_block(section['code']) if section.get('code') else ''
+        } for section in content.get('sections', [])],
+        'quiz': [{
+            'question': render_inline(question.get('question', '')),
+            'options': [render_inline(option) for option in question.get('options', [])],
+            'explanation': render_markdown(question.get('explanation', ''))
+        } for question in module.get('quiz', [])]
+    }
+
+
+class CompiledContentCache:
+    """Compiled module content by key, in memory (LRU) and as pickles on disk (unless cache_dir is None)."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(source_hash):
+        """Cache key for a module file's SHA-256."""
+        return hashlib.sha256(f'{COMPILER_VERSION}:{source_hash}'.encode()).hexdigest()
+
+    def get(self, key, module):
+        """Compiled content for a module (compiled and stored if not cached yet)."""
+        with self._lock:
+            compiled = self._memory.get(key)
+            if compiled is not None:
+                self._memory.move_to_end(key)
+                return compiled
+
+        path = os.path.join(self.cache_dir, f'{key}.pickle') if self.cache_dir else None
+        compiled = self._read(path) if path else None
+        if compiled is None:
+            compiled = compile_module(module)
+            if path:
+                self._write(path, compiled)
+
+        with self._lock:
+            self._memory[key] = compiled
+            while len(self._memory) > MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+        return compiled
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable compiled content {path}: {e}")
+            return None
+
+    def _write(self, path, compiled):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.content-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(compiled, f, pickle.HIGHEST_PROTOCOL)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Could not write compiled content {path}: {e}")
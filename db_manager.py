@@ -3,34 +3,709 @@ Database Manager for Python Classroom
 Handles SQLite database operations for student progress tracking.
 """
 
+import atexit
 import sqlite3
 import json
 import os
+import queue
+import threading
+import time
+import zlib
 from datetime import datetime
 from contextlib import contextmanager
 from typing import Optional, Dict, List, Any
 
 
+# Columns of module_progress returned as a module's progress dict
+MODULE_PROGRESS_FIELDS = ('quiz_passed', 'project_passed', 'quiz_score', 'attempts',
+                          'last_submission', 'test_results')
+
+
+# Stored test_results start with this, followed by zlib-compressed compact JSON.
+# Anything else in the column is the old plain JSON text.
+TEST_RESULTS_MAGIC = b'TRZ1'
+
+
+def encode_test_results(results) -> Optional[bytes]:
+    """Compact form of a test result for module_progress.test_results."""
+    if results is None:
+        return None
+    return TEST_RESULTS_MAGIC + zlib.compress(
+        json.dumps(results, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_test_results(raw):
+    """Test result from module_progress.test_results (compact or old JSON text), or None."""
+    if not raw:
+        return None
+    try:
+        if isinstance(raw, bytes) and raw.startswith(TEST_RESULTS_MAGIC):
+            return json.loads(zlib.decompress(raw[len(TEST_RESULTS_MAGIC):]))
+        return json.loads(raw)
+    except (ValueError, zlib.error):
+        return None
+
+
+class StoredTestResults:
+    """test_results exactly as read from the database, decoded on first use."""
+
+    __slots__ = ('raw',)
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def decode(self):
+        return decode_test_results(self.raw)
+
+
+def progress_json_default(value):
+    """json.dump() default= hook for progress that still holds undecoded test results."""
+    if isinstance(value, StoredTestResults):
+        return value.decode()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class ModuleProgress(dict):
+    """
+    One module's progress, remembering which fields changed since it was
+    loaded so only those columns are written back (a grading job storing
+    project results meanwhile keeps them). Assign fields
+    (progress['modules'][3]['attempts'] += 1) rather than mutating
+    nested values in place, or the change won't be noticed.
+
+    test_results is loaded undecoded and only decompressed when looked up
+    (progress['test_results'] or .get()), so pages that never show it
+    don't pay for it.
+    """
+
+    def __init__(self, data: Dict = ()):
+        super().__init__(data)
+        self.changed = set()
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.changed)
+
+    def changed_fields(self) -> Dict:
+        """The changed fields and their values (test_results left as stored)."""
+        return {key: dict.get(self, key) for key in self.changed if key in self}
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, StoredTestResults):
+            value = value.decode()
+            super().__setitem__(key, value)  # decoding isn't a change
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, key, value):
+        if key not in self or self[key] != value:
+            self.changed.add(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.changed.add(key)
+        super().__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            self.changed.add(key)
+        return super().pop(key, *default)
+
+
+class StudentProgress(dict):
+    """
+    A student's progress in the old JSON format
+    ({'current_module', 'modules', 'completed', 'started_at'}),
+    remembering the student's row ID so saving it needs no lookup,
+    and which student-level fields were changed.
+    """
+
+    def __init__(self, student_id: int, data: Dict):
+        super().__init__(data)
+        self.student_id = student_id
+        self.changed = set()
+
+    def __setitem__(self, key, value):
+        if key not in self or self[key] != value:
+            self.changed.add(key)
+        super().__setitem__(key, value)
+
+    def dirty_modules(self) -> Dict[int, Dict]:
+        """
+        The fields to write for each module changed since loading
+        (plain dicts put in by callers are written whole).
+        """
+        return {module_id: data.changed_fields() if isinstance(data, ModuleProgress) else data
+                for module_id, data in self['modules'].items()
+                if getattr(data, 'dirty', True)}
+
+    def mark_saved(self):
+        """Forget changes once they are written."""
+        self.changed.clear()
+        for module_id, data in list(self['modules'].items()):
+            if isinstance(data, ModuleProgress):
+                data.changed.clear()
+            else:
+                self['modules'][module_id] = ModuleProgress(data)
+
+
+def _new_module_progress() -> 'ModuleProgress':
+    """Progress of a module nobody has started (same values as the table defaults)."""
+    return ModuleProgress({'quiz_passed': 0, 'project_passed': 0, 'quiz_score': 0, 'attempts': 0,
+                           'last_submission': None, 'test_results': None})
+
+
+def _module_progress_from_row(row) -> ModuleProgress:
+    """A module's progress from a query row, with test_results left undecoded."""
+    data = {field: row[field] for field in MODULE_PROGRESS_FIELDS}
+    if data['test_results']:
+        data['test_results'] = StoredTestResults(data['test_results'])
+    return ModuleProgress(data)
+
+
+def _module_progress_upsert(columns: tuple) -> str:
+    """
+    Upsert of some module_progress columns. Columns left out keep their
+    stored values (or the table defaults for a new row).
+    """
+    names = ''.join(f', {column}' for column in columns)
+    placeholders = ', ?' * len(columns)
+    if columns:
+        action = 'UPDATE SET ' + ', '.join(f'{column} = excluded.{column}' for column in columns)
+    else:
+        action = 'NOTHING'
+    return f'''
+        INSERT INTO module_progress (student_id, module_id{names})
+        VALUES (?, ?{placeholders})
+        ON CONFLICT(student_id, module_id) DO {action}
+    '''
+
+
+def _upsert_module_progress(cursor, rows):
+    """
+    Write (student_id, module_id, progress_data) rows, each setting only the
+    fields its progress_data contains. Rows with the same fields share one
+    executemany().
+    """
+    by_columns = {}
+    for student_id, module_id, progress_data in rows:
+        columns = tuple(field for field in MODULE_PROGRESS_FIELDS if field in progress_data)
+        values = [student_id, module_id]
+        for column in columns:
+            value = dict.get(progress_data, column)
+            if column == 'test_results':
+                if isinstance(value, StoredTestResults):
+                    # Unchanged since it was loaded: write back the stored bytes as they are
+                    value = value.raw
+                elif value and isinstance(value, dict):
+                    value = encode_test_results(value)
+            values.append(value)
+        by_columns.setdefault(columns, []).append(values)
+
+    for columns, values in by_columns.items():
+        cursor.executemany(_module_progress_upsert(columns), values)
+
+
+# Recompute student_summary rows from students + module_progress.
+# {where} selects the students, e.g. 's.id = ?'.
+STUDENT_SUMMARY_REFRESH = '''
+    INSERT INTO student_summary
+    (student_id, current_module, completed, modules_completed,
+     best_quiz_score, total_attempts, last_submission)
+    SELECT s.id, s.current_module, s.completed,
+           COALESCE(SUM(mp.quiz_passed AND mp.project_passed), 0),
+           COALESCE(MAX(mp.quiz_score), 0),
+           COALESCE(SUM(mp.attempts), 0),
+           MAX(mp.last_submission)
+    FROM students s
+    LEFT JOIN module_progress mp ON mp.student_id = s.id
+    WHERE {where}
+    GROUP BY s.id
+    ON CONFLICT(student_id) DO UPDATE SET
+        current_module = excluded.current_module,
+        completed = excluded.completed,
+        modules_completed = excluded.modules_completed,
+        best_quiz_score = excluded.best_quiz_score,
+        total_attempts = excluded.total_attempts,
+        last_submission = excluded.last_submission
+'''
+
+# Columns of an attempt_events row, in the order AttemptEventLog.record() takes them
+ATTEMPT_EVENT_COLUMNS = ('student_id', 'module_id', 'kind', 'score', 'passed',
+                         'duration', 'content_hash', 'ts')
+
+
+class BatchWriter:
+    """
+    Base for writes that are queued in memory and committed in batches.
+
+    A background thread flushes every flush_interval seconds, or as soon as
+    max_pending items are waiting; close() (registered with atexit) writes
+    whatever is left. Subclasses keep their own queue and implement
+    _take() / _write() / _done() / _restore() / _reset().
+    """
+
+    name = 'writes'
+
+    def __init__(self, db: 'DatabaseManager', flush_interval: float, max_pending: int):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # one flush at a time
+        self._pid = os.getpid()
+        self._thread = None
+        self._closed = False
+        self.stats = {'writes': 0, 'flushes': 0, 'rows_flushed': 0, 'flush_errors': 0}
+
+    def _queued(self, waiting: int) -> bool:
+        """
+        Call with the lock held after queueing something. Returns True if the
+        caller must flush itself (after releasing the lock) because we are
+        shutting down and no flush is coming.
+        """
+        self.stats['writes'] += 1
+        if self._closed:
+            return True
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f'{self.name}-flush',
+                                            daemon=True)
+            self._thread.start()
+        if waiting >= self.max_pending:
+            self._cond.notify()
+        return False
+
+    def flush(self) -> int:
+        """Write everything queued in one transaction. Returns the rows written."""
+        with self._cond:
+            self._check_pid()
+        with self._flush_lock:
+            with self._cond:
+                batch = self._take()
+            if batch is None:
+                return 0
+
+            try:
+                with self.db.get_connection() as conn:
+                    rows = self._write(conn.cursor(), batch)
+            except Exception as e:
+                print(f"Error flushing {self.name}: {e}")
+                with self._cond:
+                    self._restore(batch)
+                    self.stats['flush_errors'] += 1
+                return 0
+
+            with self._cond:
+                self._done(batch)
+                self.stats['flushes'] += 1
+                self.stats['rows_flushed'] += rows
+            return rows
+
+    def close(self):
+        """Stop the flush thread and write whatever is left (called at exit)."""
+        with self._cond:
+            self._closed = True
+            thread = self._thread
+            self._cond.notify()
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        """Flush on a timer, or early when woken because the queue is full."""
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                self._cond.wait(self.flush_interval)
+            self.flush()
+
+    def _check_pid(self):
+        """Forked child: the parent's queue and flush thread aren't ours (caller holds the lock)."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = None
+            self._flush_lock = threading.Lock()
+            self._reset()
+
+    def _take(self):
+        """Remove and return everything queued, or None (lock held)."""
+        raise NotImplementedError
+
+    def _write(self, cursor, batch) -> int:
+        """Write a batch inside a transaction; returns the number of rows."""
+        raise NotImplementedError
+
+    def _done(self, batch):
+        """A batch was committed (lock held)."""
+
+    def _restore(self, batch):
+        """A batch failed to write: queue it again for the next flush (lock held)."""
+        raise NotImplementedError
+
+    def _reset(self):
+        """Drop everything queued (lock held)."""
+        raise NotImplementedError
+
+
+class WriteBehindBuffer(BatchWriter):
+    """
+    Progress writes waiting to be committed together (durability='group').
+
+    Writes are merged per student: student fields by name, and each module's
+    changed fields by name, so ten saves of the same module before a flush
+    are one row write. Everything pending is committed in a single
+    transaction every flush_interval seconds, or as soon as max_pending
+    module rows are waiting. Reads lay pending writes over what they get
+    from the database (see DatabaseManager._read_through_buffer).
+    """
+
+    name = 'progress writes'
+
+    def __init__(self, db: 'DatabaseManager', flush_interval: float = 0.05,
+                 max_pending: int = 200):
+        super().__init__(db, flush_interval, max_pending)
+        self._pending = {}   # student_id -> {'fields': {...}, 'modules': {module_id: {...}}}
+        self._inflight = {}  # what the running flush is writing (still visible to reads)
+        self._pending_rows = 0
+        self.generation = 0  # flushes finished; reads retry if it moves under them
+
+    def add(self, student_id: int, fields: Dict, modules: Dict[int, Dict]):
+        """Queue a student's field and module writes."""
+        with self._cond:
+            self._check_pid()
+            entry = self._pending.setdefault(student_id, {'fields': {}, 'modules': {}})
+            entry['fields'].update(fields)
+            for module_id, data in modules.items():
+                if module_id not in entry['modules']:
+                    self._pending_rows += 1
+                entry['modules'].setdefault(module_id, {}).update(data)
+            flush_now = self._queued(self._pending_rows)
+        if flush_now:
+            self.flush()
+
+    def overlay(self, student_id: int, fields: Optional[Dict], modules: Dict,
+                generation: int) -> bool:
+        """
+        Apply a student's buffered writes to rows just read from the database.
+        Returns False (nothing applied) if a flush finished since generation
+        was taken, in which case the caller must read again.
+        """
+        with self._cond:
+            if self.generation != generation:
+                return False
+            for source in (self._inflight, self._pending):
+                entry = source.get(student_id)
+                if entry is None:
+                    continue
+                if fields is not None:
+                    fields.update(entry['fields'])
+                for module_id, data in entry['modules'].items():
+                    merged = dict(modules.get(module_id) or {})
+                    merged.update(data)
+                    modules[module_id] = ModuleProgress(merged)
+            return True
+
+    def has_pending(self) -> bool:
+        """Whether anything is waiting to be written."""
+        return bool(self._pending or self._inflight)
+
+    def _take(self):
+        if not self._pending:
+            return None
+        self._inflight, self._pending = self._pending, {}
+        self._pending_rows = 0
+        return self._inflight
+
+    def _write(self, cursor, batch) -> int:
+        module_rows = []
+        for student_id, entry in batch.items():
+            self.db._write_student_fields(cursor, student_id, entry['fields'])
+            module_rows.extend((student_id, module_id, data)
+                               for module_id, data in entry['modules'].items())
+        _upsert_module_progress(cursor, module_rows)
+        self.db._refresh_summaries(cursor, batch)
+        return len(module_rows)
+
+    def _done(self, batch):
+        self._inflight = {}
+        self.generation += 1
+
+    def _restore(self, batch):
+        # Anything queued since the batch was taken is newer
+        for student_id, newer in self._pending.items():
+            entry = batch.setdefault(student_id, {'fields': {}, 'modules': {}})
+            entry['fields'].update(newer['fields'])
+            for module_id, data in newer['modules'].items():
+                entry['modules'].setdefault(module_id, {}).update(data)
+        self._pending, self._inflight = batch, {}
+        self._pending_rows = sum(len(entry['modules']) for entry in batch.values())
+
+    def _reset(self):
+        self._pending, self._inflight = {}, {}
+        self._pending_rows = 0
+
+
+class AttemptEventLog(BatchWriter):
+    """
+    Appends rows to attempt_events in batches. record() only queues the
+    event; queries on attempt_events flush the queue first, so they always
+    see every event recorded before them.
+    """
+
+    name = 'attempt events'
+
+    def __init__(self, db: 'DatabaseManager', flush_interval: float = 0.5,
+                 max_pending: int = 100):
+        super().__init__(db, flush_interval, max_pending)
+        self._events = []
+
+    def record(self, event: tuple):
+        """Queue one row (in ATTEMPT_EVENT_COLUMNS order)."""
+        with self._cond:
+            self._check_pid()
+            self._events.append(event)
+            flush_now = self._queued(len(self._events))
+        if flush_now:
+            self.flush()
+
+    def has_pending(self) -> bool:
+        """Whether any events are waiting to be written."""
+        return bool(self._events)
+
+    def _take(self):
+        if not self._events:
+            return None
+        events, self._events = self._events, []
+        return events
+
+    def _write(self, cursor, batch) -> int:
+        cursor.executemany(f'''
+            INSERT INTO attempt_events ({', '.join(ATTEMPT_EVENT_COLUMNS)})
+            VALUES ({', '.join('?' * len(ATTEMPT_EVENT_COLUMNS))})
+        ''', batch)
+        return len(batch)
+
+    def _restore(self, batch):
+        self._events[:0] = batch
+
+    def _reset(self):
+        self._events = []
+
+
 class DatabaseManager:
     """Manages SQLite database for student progress."""
 
-    def __init__(self, db_path='data/classroom.db'):
+    # Connection settings: WAL lets readers and a writer work at the same time,
+    # synchronous=NORMAL is safe with WAL and skips an fsync per commit
+    PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,       # KiB (16 MB page cache per connection)
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+    # 'strict': every save commits before returning.
+    # 'group': progress saves are buffered and committed together (WriteBehindBuffer),
+    # so a crash can lose the last flush_interval of progress.
+    DURABILITY_MODES = ('strict', 'group')
+
+    def __init__(self, db_path='data/classroom.db', pool_size=8,
+                 busy_timeout=5.0, pool_timeout=30.0, durability='strict',
+                 flush_interval=0.05, flush_max_pending=200):
+        if durability not in self.DURABILITY_MODES:
+            raise ValueError(f"Unknown durability '{durability}' (expected one of {', '.join(self.DURABILITY_MODES)})")
         self.db_path = db_path
+        self.durability = durability
+        self.pool_size = pool_size
+        self.busy_timeout = busy_timeout  # seconds SQLite waits for a lock
+        self.pool_timeout = pool_timeout  # seconds to wait for a free connection
+        self._pool = queue.LifoQueue()
+        self._pool_pid = os.getpid()
+        self._pool_lock = threading.Lock()
+        self._open_connections = 0
+        self._stats = {'checkouts': 0, 'waits': 0, 'wait_time': 0.0,
+                       'busy_retries': 0, 'busy_errors': 0, 'connections_opened': 0}
         self.ensure_database_exists()
 
+        self.write_buffer = None
+        if durability == 'group':
+            self.write_buffer = WriteBehindBuffer(self, flush_interval, flush_max_pending)
+            atexit.register(self.write_buffer.close)
+
+        # Attempt events are always batched: they are history, not state
+        self.event_log = AttemptEventLog(self)
+        atexit.register(self.event_log.close)
+
+    def _connect(self):
+        """Open a pooled connection and apply the PRAGMAs."""
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}')
+        for name, value in self.PRAGMAS.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _checkout(self):
+        """Take an idle connection, open a new one, or wait for one to be returned."""
+        with self._pool_lock:
+            if self._pool_pid != os.getpid():
+                # Forked child: the parent's connections must not be used here
+                self._pool = queue.LifoQueue()
+                self._pool_pid = os.getpid()
+                self._open_connections = 0
+            self._stats['checkouts'] += 1
+            try:
+                return self._pool.get_nowait()
+            except queue.Empty:
+                pass
+            if self._open_connections < self.pool_size:
+                self._open_connections += 1
+                self._stats['connections_opened'] += 1
+                opening = True
+            else:
+                opening = False
+
+        if opening:
+            try:
+                return self._connect()
+            except Exception:
+                with self._pool_lock:
+                    self._open_connections -= 1
+                raise
+
+        started = time.monotonic()
+        try:
+            conn = self._pool.get(timeout=self.pool_timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError('Timed out waiting for a database connection')
+        with self._pool_lock:
+            self._stats['waits'] += 1
+            self._stats['wait_time'] += time.monotonic() - started
+        return conn
+
+    def _checkin(self, conn):
+        """Return a connection to the pool (dropped if it came from before a fork)."""
+        if self._pool_pid == os.getpid():
+            self._pool.put(conn)
+
+    def _commit(self, conn, attempts=5):
+        """Commit, retrying a few times if another process holds the write lock."""
+        for attempt in range(attempts):
+            try:
+                conn.commit()
+                return
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt == attempts - 1:
+                    raise
+                with self._pool_lock:
+                    self._stats['busy_retries'] += 1
+                time.sleep(0.01 * (2 ** attempt))
+
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
+        """Context manager for database connections (borrowed from the pool)."""
+        conn = self._checkout()
         try:
             yield conn
-            conn.commit()
+            self._commit(conn)
         except Exception as e:
             conn.rollback()
+            if isinstance(e, sqlite3.OperationalError) and _is_busy(e):
+                with self._pool_lock:
+                    self._stats['busy_errors'] += 1
             raise e
         finally:
+            self._checkin(conn)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool counters (checkouts, waits, busy retries, ...)."""
+        with self._pool_lock:
+            stats = dict(self._stats)
+            stats['open_connections'] = self._open_connections
+            stats['idle_connections'] = self._pool.qsize()
+            stats['pool_size'] = self.pool_size
+        return stats
+
+    def close_all(self):
+        """Close every idle pooled connection (e.g. before replacing the database file)."""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
             conn.close()
+            with self._pool_lock:
+                self._open_connections -= 1
+
+    def flush_writes(self) -> int:
+        """Commit buffered progress writes and attempt events now."""
+        rows = 0
+        if self.write_buffer is not None and self.write_buffer.has_pending():
+            rows += self.write_buffer.flush()
+        if self.event_log.has_pending():
+            rows += self.event_log.flush()
+        return rows
+
+    def _read_through_buffer(self, read):
+        """
+        Run read(), which returns (student_id, fields, modules) or None, and lay
+        that student's buffered writes over the result. Reads again if a flush
+        finished meanwhile: the rows read may predate writes the buffer has
+        since handed to the database and forgotten.
+        """
+        buffer = self.write_buffer
+        while True:
+            generation = buffer.generation if buffer is not None else None
+            result = read()
+            if result is None or buffer is None:
+                return result
+            student_id, fields, modules = result
+            if buffer.overlay(student_id, fields, modules, generation):
+                return result
+
+    def _write_student_fields(self, cursor, student_id: int, fields: Dict):
+        """Update current_module / completed for a student."""
+        if fields:
+            assignments = ', '.join(f"{key} = ?" for key in fields)
+            cursor.execute(f"UPDATE students SET {assignments} WHERE id = ?",
+                           list(fields.values()) + [student_id])
+
+    def backup_to(self, backup_file: str):
+        """Copy the database to a file, including changes still in the WAL."""
+        self.flush_writes()
+        target = sqlite3.connect(backup_file)
+        try:
+            with self.get_connection() as conn:
+                conn.backup(target)
+        finally:
+            target.close()
+
+    def restore_from(self, backup_file: str):
+        """Replace the database contents with those of a backup file."""
+        self.flush_writes()
+        source = sqlite3.connect(backup_file)
+        try:
+            with self.get_connection() as conn:
+                source.backup(conn)
+        finally:
+            source.close()
+        # Backups from older versions lack newer tables (e.g. student_summary)
+        self.ensure_database_exists()
 
     def ensure_database_exists(self):
         """Create database and tables if they don't exist."""
@@ -78,6 +753,108 @@ class DatabaseManager:
                 ON module_progress(student_id, module_id)
             ''')
 
+            # Create grading_jobs table (background grading queue)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS grading_jobs (
+                    id TEXT PRIMARY KEY,
+                    student_name TEXT NOT NULL,
+                    module_id INTEGER NOT NULL,
+                    filepath TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    worker TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    result TEXT,
+                    outcome TEXT
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_grading_jobs_status
+                ON grading_jobs(status, created_at)
+            ''')
+
+            # Create grading_job_tests table (results of a running job so far)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS grading_job_tests (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    check_order INTEGER NOT NULL,
+                    test TEXT NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                )
+            ''')
+
+            # Create grading_cache table (results for files already graded)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS grading_cache (
+                    module_id INTEGER NOT NULL,
+                    tester_version TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_used_at TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (module_id, tester_version, content_hash)
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_grading_cache_last_used
+                ON grading_cache(last_used_at)
+            ''')
+
+            # Create student_summary table (one row per student for class overviews,
+            # kept up to date by every write to students / module_progress)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS student_summary (
+                    student_id INTEGER PRIMARY KEY,
+                    current_module INTEGER NOT NULL DEFAULT 1,
+                    completed BOOLEAN NOT NULL DEFAULT 0,
+                    modules_completed INTEGER NOT NULL DEFAULT 0,
+                    best_quiz_score INTEGER NOT NULL DEFAULT 0,
+                    total_attempts INTEGER NOT NULL DEFAULT 0,
+                    last_submission TEXT,
+                    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+                )
+            ''')
+
+            # Create attempt_events table (append-only history of quiz and project attempts)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS attempt_events (
+                    id INTEGER PRIMARY KEY,
+                    student_id INTEGER NOT NULL,
+                    module_id INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    score REAL,
+                    passed BOOLEAN,
+                    duration REAL,
+                    content_hash TEXT,
+                    ts TEXT NOT NULL,
+                    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_attempt_events_module
+                ON attempt_events(module_id, ts)
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_attempt_events_student
+                ON attempt_events(student_id, ts)
+            ''')
+
+            # Summaries for students created before the table existed
+            cursor.execute(STUDENT_SUMMARY_REFRESH.format(
+                where='s.id NOT IN (SELECT student_id FROM student_summary)'))
+
+    def _refresh_summaries(self, cursor, student_ids):
+        """Recompute the student_summary rows of some students (inside the caller's transaction)."""
+        cursor.executemany(STUDENT_SUMMARY_REFRESH.format(where='s.id = ?'),
+                           [(student_id,) for student_id in student_ids])
+
     def create_student(self, name: str, current_module: int = 1,
                       started_at: str = None) -> int:
         """
@@ -93,10 +870,13 @@ class DatabaseManager:
                 INSERT INTO students (name, current_module, completed, started_at)
                 VALUES (?, ?, 0, ?)
             ''', (name, current_module, started_at))
-            return cursor.lastrowid
+            student_id = cursor.lastrowid
+            self._refresh_summaries(cursor, [student_id])
+            return student_id
 
     def get_student_by_name(self, name: str) -> Optional[Dict]:
         """Get student record by name."""
+        self.flush_writes()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -109,6 +889,7 @@ class DatabaseManager:
 
     def get_student_by_id(self, student_id: int) -> Optional[Dict]:
         """Get student record by ID."""
+        self.flush_writes()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -121,6 +902,7 @@ class DatabaseManager:
 
     def get_all_students(self) -> List[Dict]:
         """Get all student records."""
+        self.flush_writes()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -128,6 +910,61 @@ class DatabaseManager:
             ''')
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_student_summaries(self) -> List[Dict]:
+        """
+        Every student with their progress summary (modules_completed,
+        best_quiz_score, total_attempts, ...), read from student_summary
+        in one query. For class overviews.
+        """
+        self.flush_writes()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT s.id, s.name, s.started_at, s.current_module, s.completed,
+                       COALESCE(ss.modules_completed, 0) AS modules_completed,
+                       COALESCE(ss.best_quiz_score, 0) AS best_quiz_score,
+                       COALESCE(ss.total_attempts, 0) AS total_attempts,
+                       ss.last_submission
+                FROM students s
+                LEFT JOIN student_summary ss ON ss.student_id = s.id
+                ORDER BY s.name
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
+
+    def load_all_progress(self) -> Dict[str, Dict]:
+        """
+        Every student's progress in the get_student_progress() format,
+        read in one query instead of one per student.
+        """
+        self.flush_writes()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT s.name, s.current_module, s.completed, s.started_at,
+                       mp.module_id, mp.quiz_passed, mp.project_passed, mp.quiz_score,
+                       mp.attempts, mp.last_submission, mp.test_results
+                FROM students s
+                LEFT JOIN module_progress mp ON mp.student_id = s.id
+                ORDER BY s.name, mp.module_id
+            ''')
+
+            all_progress = {}
+            for row in cursor:
+                progress = all_progress.get(row['name'])
+                if progress is None:
+                    progress = all_progress[row['name']] = {
+                        'current_module': row['current_module'],
+                        'modules': {},
+                        'completed': bool(row['completed']),
+                        'started_at': row['started_at']
+                    }
+                if row['module_id'] is None:
+                    continue
+
+                progress['modules'][row['module_id']] = _module_progress_from_row(row)
+
+            return all_progress
+
     def update_student(self, name: str, **updates):
         """Update student record."""
         if not updates:
@@ -147,96 +984,210 @@ class DatabaseManager:
         values.append(name)
         query = f"UPDATE students SET {', '.join(fields)} WHERE name = ?"
 
+        self.flush_writes()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, values)
+            cursor.execute(STUDENT_SUMMARY_REFRESH.format(where='s.name = ?'), (name,))
 
     def delete_student(self, name: str) -> bool:
         """Delete student and all associated progress. Returns True if deleted."""
+        self.flush_writes()
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute('''
+                DELETE FROM student_summary
+                WHERE student_id = (SELECT id FROM students WHERE name = ?)
+            ''', (name,))
+            cursor.execute('''
+                DELETE FROM attempt_events
+                WHERE student_id = (SELECT id FROM students WHERE name = ?)
+            ''', (name,))
             cursor.execute('DELETE FROM students WHERE name = ?', (name,))
             return cursor.rowcount > 0
 
     def get_module_progress(self, student_id: int, module_id: int) -> Optional[Dict]:
         """Get progress for a specific module."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM module_progress
-                WHERE student_id = ? AND module_id = ?
-            ''', (student_id, module_id))
-            row = cursor.fetchone()
-            if row:
-                data = dict(row)
-                # Parse test_results JSON if present
-                if data.get('test_results'):
-                    try:
-                        data['test_results'] = json.loads(data['test_results'])
-                    except json.JSONDecodeError:
-                        data['test_results'] = None
-                return data
-            return None
+        def read():
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT * FROM module_progress
+                    WHERE student_id = ? AND module_id = ?
+                ''', (student_id, module_id))
+                row = cursor.fetchone()
+                modules = {}
+                if row:
+                    data = dict(row)
+                    data['test_results'] = decode_test_results(data['test_results'])
+                    modules[module_id] = data
+                return student_id, None, modules
+
+        _, _, modules = self._read_through_buffer(read)
+        data = modules.get(module_id)
+        return {key: data[key] for key in data} if data is not None else None
 
     def get_all_module_progress(self, student_id: int) -> Dict[int, Dict]:
         """Get all module progress for a student."""
+        def read():
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT * FROM module_progress
+                    WHERE student_id = ?
+                    ORDER BY module_id
+                ''', (student_id,))
+
+                progress = {}
+                for row in cursor.fetchall():
+                    data = dict(row)
+                    module_id = data.pop('module_id')
+                    data.pop('student_id')
+                    data.pop('id')
+
+                    data['test_results'] = decode_test_results(data['test_results'])
+                    progress[module_id] = data
+                return student_id, None, progress
+
+        _, _, progress = self._read_through_buffer(read)
+        # Indexing (not dict()) so buffered test results come out decoded
+        return {module_id: {key: data[key] for key in data}
+                for module_id, data in sorted(progress.items())}
+
+    def save_module_progress(self, student_id: int, module_id: int,
+                            progress_data: Dict):
+        """Save or update module progress."""
+        if self.write_buffer is not None:
+            self.write_buffer.add(student_id, {}, {module_id: progress_data})
+            return
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM module_progress
-                WHERE student_id = ?
-                ORDER BY module_id
-            ''', (student_id,))
-
-            progress = {}
-            for row in cursor.fetchall():
-                data = dict(row)
-                module_id = data.pop('module_id')
-                data.pop('student_id')
-                data.pop('id')
+            _upsert_module_progress(cursor, [(student_id, module_id, progress_data)])
+            self._refresh_summaries(cursor, [student_id])
 
-                # Parse test_results JSON
-                if data.get('test_results'):
-                    try:
-                        data['test_results'] = json.loads(data['test_results'])
-                    except json.JSONDecodeError:
-                        data['test_results'] = None
+    def load_student_progress(self, name: str, module_count: int) -> Optional[StudentProgress]:
+        """
+        Load a student and all their module progress with one query.
+        Modules added since the student started get their (empty) rows created.
+        Returns None if the student doesn't exist.
+        """
+        loaded = self._read_through_buffer(lambda: self._query_student_progress(name, module_count))
+        if loaded is None:
+            return None
 
-                progress[module_id] = data
+        student_id, fields, modules = loaded
+        return StudentProgress(student_id, {
+            'current_module': fields['current_module'],
+            'modules': modules,
+            'completed': bool(fields['completed']),
+            'started_at': fields['started_at']
+        })
 
-            return progress
+    def _query_student_progress(self, name: str, module_count: int):
+        """A student's row and module rows as (student_id, fields, modules), or None."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT s.id AS student_id, s.current_module, s.completed, s.started_at,
+                       mp.module_id, mp.quiz_passed, mp.project_passed, mp.quiz_score,
+                       mp.attempts, mp.last_submission, mp.test_results
+                FROM students s
+                LEFT JOIN module_progress mp ON mp.student_id = s.id
+                WHERE s.name = ?
+                ORDER BY mp.module_id
+            ''', (name,))
+            rows = cursor.fetchall()
+            if not rows:
+                return None
+
+            student = rows[0]
+            modules = {}
+            for row in rows:
+                if row['module_id'] is None:
+                    continue
+                modules[row['module_id']] = _module_progress_from_row(row)
+
+            # Handle modules added after the student was created
+            missing = [m for m in range(1, module_count + 1) if m not in modules]
+            if missing:
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO module_progress
+                    (student_id, module_id, quiz_passed, project_passed,
+                     quiz_score, attempts)
+                    VALUES (?, ?, 0, 0, 0, 0)
+                ''', [(student['student_id'], m) for m in missing])
+                for module_id in missing:
+                    modules[module_id] = _new_module_progress()
 
-    def save_module_progress(self, student_id: int, module_id: int,
-                            progress_data: Dict):
-        """Save or update module progress."""
-        # Extract fields
-        quiz_passed = progress_data.get('quiz_passed', False)
-        project_passed = progress_data.get('project_passed', False)
-        quiz_score = progress_data.get('quiz_score', 0)
-        attempts = progress_data.get('attempts', 0)
-        last_submission = progress_data.get('last_submission')
-        test_results = progress_data.get('test_results')
-
-        # Convert test_results to JSON string if it's a dict
-        if test_results and isinstance(test_results, dict):
-            test_results = json.dumps(test_results)
+            fields = {key: student[key] for key in ('current_module', 'completed', 'started_at')}
+            return student['student_id'], fields, modules
 
+    def create_student_progress(self, name: str, module_count: int) -> StudentProgress:
+        """Create a student with empty progress for every module, in one transaction."""
+        started_at = datetime.now().isoformat()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO module_progress
+                INSERT INTO students (name, current_module, completed, started_at)
+                VALUES (?, 1, 0, ?)
+            ''', (name, started_at))
+            student_id = cursor.lastrowid
+            cursor.executemany('''
+                INSERT OR IGNORE INTO module_progress
                 (student_id, module_id, quiz_passed, project_passed,
-                 quiz_score, attempts, last_submission, test_results)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(student_id, module_id) DO UPDATE SET
-                    quiz_passed = excluded.quiz_passed,
-                    project_passed = excluded.project_passed,
-                    quiz_score = excluded.quiz_score,
-                    attempts = excluded.attempts,
-                    last_submission = excluded.last_submission,
-                    test_results = excluded.test_results
-            ''', (student_id, module_id, quiz_passed, project_passed,
-                  quiz_score, attempts, last_submission, test_results))
+                 quiz_score, attempts)
+                VALUES (?, ?, 0, 0, 0, 0)
+            ''', [(student_id, m) for m in range(1, module_count + 1)])
+            self._refresh_summaries(cursor, [student_id])
+
+        return StudentProgress(student_id, {
+            'current_module': 1,
+            'modules': {m: _new_module_progress() for m in range(1, module_count + 1)},
+            'completed': False,
+            'started_at': started_at
+        })
+
+    def save_student_progress(self, name: str, updates: Dict,
+                              student_id: Optional[int] = None):
+        """
+        Save student-level fields and module progress in one transaction.
+        Accepts updates in the same format as get_student_progress() returns.
+        For a StudentProgress, only the student and module fields that
+        changed are written; a plain dict writes everything it contains.
+        """
+        if isinstance(updates, StudentProgress):
+            student_fields = {key: updates[key] for key in ('current_module', 'completed')
+                              if key in updates.changed}
+            modules = updates.dirty_modules()
+            if not student_fields and not modules:
+                return
+        else:
+            student_fields = {key: updates[key] for key in ('current_module', 'completed')
+                              if key in updates}
+            modules = updates.get('modules', {})
+
+        if student_id is None:
+            with self.get_connection() as conn:
+                row = conn.execute('SELECT id FROM students WHERE name = ?', (name,)).fetchone()
+            if not row:
+                return
+            student_id = row['id']
+
+        if self.write_buffer is not None:
+            # Group commit: written by the buffer's next flush
+            self.write_buffer.add(student_id, student_fields, modules)
+        else:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                self._write_student_fields(cursor, student_id, student_fields)
+                _upsert_module_progress(cursor, [
+                    (student_id, module_id, module_data)
+                    for module_id, module_data in modules.items()
+                ])
+                self._refresh_summaries(cursor, [student_id])
+
+        if isinstance(updates, StudentProgress):
+            updates.mark_saved()
 
     def initialize_student_modules(self, student_id: int, module_count: int):
         """Initialize empty progress for all modules."""
@@ -249,10 +1200,437 @@ class DatabaseManager:
                      quiz_score, attempts)
                     VALUES (?, ?, 0, 0, 0, 0)
                 ''', (student_id, module_id))
+            self._refresh_summaries(cursor, [student_id])
+
+    def record_project_result(self, student_id: int, module_id: int, passed: bool,
+                              test_results: Dict, module_count: int) -> bool:
+        """
+        Store a graded project submission. Only the project columns are
+        written, so changes a request makes to the module meanwhile (another
+        upload's attempt) are kept, and the next module is unlocked without
+        moving the student backwards. Returns whether the module is now
+        complete (quiz and project passed).
+        """
+        # A buffered quiz pass has to be in the table for the check below
+        self.flush_writes()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE module_progress
+                SET project_passed = ?, last_submission = ?, test_results = ?
+                WHERE student_id = ? AND module_id = ?
+            ''', (bool(passed), datetime.now().isoformat(), encode_test_results(test_results),
+                  student_id, module_id))
+            row = cursor.execute('''
+                SELECT quiz_passed FROM module_progress
+                WHERE student_id = ? AND module_id = ?
+            ''', (student_id, module_id)).fetchone()
+
+            completed = bool(passed and row and row['quiz_passed'])
+            if completed:
+                if module_id < module_count:
+                    cursor.execute('UPDATE students SET current_module = MAX(current_module, ?) WHERE id = ?',
+                                   (module_id + 1, student_id))
+                else:
+                    cursor.execute('UPDATE students SET completed = 1 WHERE id = ?', (student_id,))
+            self._refresh_summaries(cursor, [student_id])
+            return completed
+
+    def save_regraded_results(self, module_id: int, results: List[Dict],
+                              module_count: int) -> int:
+        """
+        Store re-graded project results for many students in one transaction.
+        Each result is {'student_name', 'passed', 'test_results'}. Students who
+        now have both the quiz and project passed get the next module unlocked;
+        nobody is moved backwards. Returns the number of progress rows updated.
+        """
+        if not results:
+            return 0
+
+        progress_rows = [(bool(r['passed']), encode_test_results(r['test_results']),
+                          r['student_name'], module_id) for r in results]
+        passed_names = [(r['student_name'],) for r in results if r['passed']]
+
+        self.flush_writes()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE module_progress
+                SET project_passed = ?, test_results = ?
+                WHERE student_id = (SELECT id FROM students WHERE name = ?)
+                  AND module_id = ?
+            ''', progress_rows)
+            updated = cursor.rowcount
+
+            if module_id < module_count:
+                unlock_sql = 'UPDATE students SET current_module = MAX(current_module, ?) WHERE name = ?'
+                unlock_args = [(module_id + 1,) + row for row in passed_names]
+            else:
+                unlock_sql = 'UPDATE students SET completed = 1 WHERE name = ?'
+                unlock_args = passed_names
+            cursor.executemany(unlock_sql + '''
+                AND EXISTS (
+                    SELECT 1 FROM module_progress
+                    WHERE module_progress.student_id = students.id
+                      AND module_progress.module_id = ?
+                      AND quiz_passed = 1 AND project_passed = 1
+                )
+            ''', [args + (module_id,) for args in unlock_args])
+            cursor.executemany(STUDENT_SUMMARY_REFRESH.format(where='s.name = ?'),
+                               [(r['student_name'],) for r in results])
+            return updated
+
+    def record_attempt_event(self, student_id: int, module_id: int, kind: str,
+                             score: Optional[float] = None, passed: Optional[bool] = None,
+                             duration: Optional[float] = None,
+                             content_hash: Optional[str] = None, ts: Optional[str] = None):
+        """
+        Append a quiz or project attempt to attempt_events.
+        kind is 'quiz' or 'project'; score is a percentage and duration is
+        seconds spent grading. Written in batches by the event log.
+        """
+        if ts is None:
+            ts = datetime.now().isoformat()
+        self.event_log.record((student_id, module_id, kind, score,
+                               None if passed is None else bool(passed),
+                               duration, content_hash, ts))
+
+    def get_attempt_events(self, student_id: Optional[int] = None,
+                           module_id: Optional[int] = None, kind: Optional[str] = None,
+                           since: Optional[str] = None, until: Optional[str] = None,
+                           limit: Optional[int] = None) -> List[Dict]:
+        """
+        Attempt events in time order, filtered by student and/or module and a
+        [since, until) window of ISO timestamps.
+        """
+        where, args = _attempt_event_filter(student_id, module_id, kind, since, until)
+        query = f"SELECT * FROM attempt_events {where} ORDER BY ts, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(limit)
+
+        self.flush_writes()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, args)
+            events = []
+            for row in cursor.fetchall():
+                event = dict(row)
+                if event['passed'] is not None:
+                    event['passed'] = bool(event['passed'])
+                events.append(event)
+            return events
+
+    def get_module_attempt_stats(self, module_id: Optional[int] = None, kind: str = 'project',
+                                 since: Optional[str] = None,
+                                 until: Optional[str] = None) -> Dict[int, Dict]:
+        """
+        Per-module totals for a time window: attempts, distinct students,
+        passes, pass rate, average score and average grading time.
+        Returns {module_id: stats}; pass module_id for just one module.
+        """
+        where, args = _attempt_event_filter(None, module_id, kind, since, until)
+        self.flush_writes()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT module_id,
+                       COUNT(*) AS attempts,
+                       COUNT(DISTINCT student_id) AS students,
+                       COALESCE(SUM(passed), 0) AS passed,
+                       AVG(score) AS avg_score,
+                       AVG(duration) AS avg_duration,
+                       MIN(ts) AS first_attempt,
+                       MAX(ts) AS last_attempt
+                FROM attempt_events
+                {where}
+                GROUP BY module_id
+                ORDER BY module_id
+            ''', args)
+
+            stats = {}
+            for row in cursor.fetchall():
+                data = dict(row)
+                data['pass_rate'] = data['passed'] / data['attempts']
+                stats[data.pop('module_id')] = data
+            return stats
+
+    def get_attempt_activity(self, since: Optional[str] = None, until: Optional[str] = None,
+                             module_id: Optional[int] = None, kind: Optional[str] = None,
+                             bucket: str = 'day') -> List[Dict]:
+        """
+        Attempt counts per hour or day in a time window:
+        [{'period': '2024-05-01', 'attempts': ..., 'passed': ..., 'students': ...}, ...]
+        """
+        length = {'day': 10, 'hour': 13}[bucket]  # prefix of the ISO timestamp
+        where, args = _attempt_event_filter(None, module_id, kind, since, until)
+        self.flush_writes()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT substr(ts, 1, {length}) AS period,
+                       COUNT(*) AS attempts,
+                       COALESCE(SUM(passed), 0) AS passed,
+                       COUNT(DISTINCT student_id) AS students
+                FROM attempt_events
+                {where}
+                GROUP BY period
+                ORDER BY period
+            ''', args)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def create_grading_job(self, job_id: str, student_name: str,
+                           module_id: int, filepath: str,
+                           status: str = 'queued', worker: str = None) -> str:
+        """
+        Queue a submission for grading. Returns the job ID.
+        A job created as 'running' with a worker is never picked up by the queue.
+        """
+        now = datetime.now().isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO grading_jobs
+                (id, student_name, module_id, filepath, status, worker,
+                 created_at, started_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (job_id, student_name, module_id, filepath, status, worker,
+                  now, now if status == 'running' else None))
+            return job_id
+
+    def claim_grading_job(self, worker: str) -> Optional[Dict]:
+        """
+        Atomically move the oldest queued job to 'running'.
+        Returns the claimed job, or None if the queue is empty.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            while True:
+                cursor.execute('''
+                    SELECT id FROM grading_jobs
+                    WHERE status = 'queued'
+                    ORDER BY created_at
+                    LIMIT 1
+                ''')
+                row = cursor.fetchone()
+                if not row:
+                    return None
+
+                # Another worker may have claimed it in the meantime
+                cursor.execute('''
+                    UPDATE grading_jobs
+                    SET status = 'running', worker = ?, started_at = ?
+                    WHERE id = ? AND status = 'queued'
+                ''', (worker, datetime.now().isoformat(), row['id']))
+                if cursor.rowcount == 1:
+                    cursor.execute('SELECT * FROM grading_jobs WHERE id = ?',
+                                   (row['id'],))
+                    return dict(cursor.fetchone())
+
+    def add_grading_job_test(self, job_id: str, seq: int, check_order: int, test: Dict):
+        """Record one test result of a job that is still running."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO grading_job_tests (job_id, seq, check_order, test)
+                VALUES (?, ?, ?, ?)
+            ''', (job_id, seq, check_order, json.dumps(test)))
+
+    def get_grading_job_tests(self, job_id: str, after_seq: int = 0) -> List[Dict]:
+        """
+        Test results a running job has produced so far, in the order they
+        finished: [{'seq', 'order', 'test'}] with seq > after_seq.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT seq, check_order, test FROM grading_job_tests
+                WHERE job_id = ? AND seq > ?
+                ORDER BY seq
+            ''', (job_id, after_seq))
+            return [{'seq': row['seq'], 'order': row['check_order'], 'test': json.loads(row['test'])}
+                    for row in cursor.fetchall()]
+
+    def finish_grading_job(self, job_id: str, status: str,
+                           result: Optional[Dict], outcome: Optional[Dict] = None):
+        """Store the result of a grading job and mark it done or failed."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # The final result has every test; the partial ones aren't needed any more
+            cursor.execute('DELETE FROM grading_job_tests WHERE job_id = ?', (job_id,))
+            cursor.execute('''
+                UPDATE grading_jobs
+                SET status = ?, finished_at = ?, result = ?, outcome = ?
+                WHERE id = ?
+            ''', (status, datetime.now().isoformat(),
+                  json.dumps(result) if result is not None else None,
+                  json.dumps(outcome) if outcome is not None else None,
+                  job_id))
+
+    def get_grading_job(self, job_id: str) -> Optional[Dict]:
+        """Get a grading job by ID, with result and outcome parsed."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM grading_jobs WHERE id = ?', (job_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            data = dict(row)
+            for key in ('result', 'outcome'):
+                if data.get(key):
+                    try:
+                        data[key] = json.loads(data[key])
+                    except json.JSONDecodeError:
+                        data[key] = None
 
+            # Position in queue (0 = being graded or finished)
+            data['queue_position'] = 0
+            if data['status'] == 'queued':
+                cursor.execute('''
+                    SELECT COUNT(*) FROM grading_jobs
+                    WHERE status = 'queued' AND created_at <= ?
+                ''', (data['created_at'],))
+                data['queue_position'] = cursor.fetchone()[0]
+            return data
+
+    def count_grading_jobs(self, status: str = 'queued') -> int:
+        """Count grading jobs with the given status."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM grading_jobs WHERE status = ?',
+                           (status,))
+            return cursor.fetchone()[0]
 
-# Global database manager instance
-_db_manager = DatabaseManager()
+    def requeue_grading_jobs(self, workers: List[str]) -> int:
+        """Put 'running' jobs owned by the given workers back on the queue."""
+        if not workers:
+            return 0
+
+        placeholders = ', '.join('?' for _ in workers)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # Requeued jobs are graded again from scratch
+            cursor.execute(f'''
+                DELETE FROM grading_job_tests WHERE job_id IN (
+                    SELECT id FROM grading_jobs
+                    WHERE status = 'running' AND worker IN ({placeholders}))
+            ''', workers)
+            cursor.execute(f'''
+                UPDATE grading_jobs
+                SET status = 'queued', worker = NULL, started_at = NULL
+                WHERE status = 'running' AND worker IN ({placeholders})
+            ''', workers)
+            return cursor.rowcount
+
+    def get_running_job_workers(self) -> List[str]:
+        """Get the distinct worker names that currently hold running jobs."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT DISTINCT worker FROM grading_jobs
+                WHERE status = 'running' AND worker IS NOT NULL
+            ''')
+            return [row['worker'] for row in cursor.fetchall()]
+
+    def get_module_submissions(self, module_id: int) -> List[Dict]:
+        """Every submission queued for a module (student_name, filepath, created_at), oldest first."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT student_name, filepath, created_at FROM grading_jobs
+                WHERE module_id = ?
+                ORDER BY created_at
+            ''', (module_id,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_cached_grading_result(self, module_id: int, tester_version: str,
+                                  content_hash: str) -> Optional[Dict]:
+        """Get the stored result for a file already graded by this tester version."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT result FROM grading_cache
+                WHERE module_id = ? AND tester_version = ? AND content_hash = ?
+            ''', (module_id, tester_version, content_hash))
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            try:
+                result = json.loads(row['result'])
+            except json.JSONDecodeError:
+                return None
+
+            cursor.execute('''
+                UPDATE grading_cache
+                SET last_used_at = ?, hits = hits + 1
+                WHERE module_id = ? AND tester_version = ? AND content_hash = ?
+            ''', (datetime.now().isoformat(), module_id, tester_version, content_hash))
+            return result
+
+    def save_cached_grading_result(self, module_id: int, tester_version: str,
+                                   content_hash: str, result: Dict):
+        """Store a grading result for reuse by identical submissions."""
+        now = datetime.now().isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO grading_cache
+                (module_id, tester_version, content_hash, result, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(module_id, tester_version, content_hash) DO UPDATE SET
+                    result = excluded.result,
+                    last_used_at = excluded.last_used_at
+            ''', (module_id, tester_version, content_hash, json.dumps(result), now, now))
+
+    def prune_grading_cache(self, max_entries: int, max_age_days: float) -> int:
+        """
+        Drop cached results not used within max_age_days, then the least
+        recently used ones beyond max_entries. Returns the number removed.
+        """
+        cutoff = datetime.fromtimestamp(
+            datetime.now().timestamp() - max_age_days * 86400).isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM grading_cache WHERE last_used_at < ?', (cutoff,))
+            removed = cursor.rowcount
+            cursor.execute('''
+                DELETE FROM grading_cache WHERE rowid IN (
+                    SELECT rowid FROM grading_cache
+                    ORDER BY last_used_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+            return removed + cursor.rowcount
+
+
+def _attempt_event_filter(student_id, module_id, kind, since, until):
+    """WHERE clause and arguments for attempt_events queries (uses the (id, ts) indexes)."""
+    conditions, args = [], []
+    for column, value in (('student_id', student_id), ('module_id', module_id), ('kind', kind)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            args.append(value)
+    if since is not None:
+        conditions.append("ts >= ?")
+        args.append(since)
+    if until is not None:
+        conditions.append("ts < ?")
+        args.append(until)
+    return ('WHERE ' + ' AND '.join(conditions) if conditions else ''), args
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """Whether an error means another connection holds a lock."""
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+# Global database manager instance (CLASSROOM_DB_PATH points it at another file,
+# CLASSROOM_DB_DURABILITY=group turns on group commit of progress saves)
+_db_manager = DatabaseManager(os.environ.get('CLASSROOM_DB_PATH', 'data/classroom.db'),
+                              durability=os.environ.get('CLASSROOM_DB_DURABILITY', 'strict'))
 
 
 # API functions that mirror the old JSON interface
@@ -264,32 +1642,18 @@ def get_student_progress(student_name: str) -> Dict:
     # Import here to avoid circular dependency
     from module_loader import get_module_count
 
-    student = _db_manager.get_student_by_name(student_name)
+    module_count = get_module_count()
+    progress = _db_manager.load_student_progress(student_name, module_count)
 
-    if not student:
+    if progress is None:
         # Create new student
-        module_count = get_module_count()
-        student_id = _db_manager.create_student(student_name)
-        _db_manager.initialize_student_modules(student_id, module_count)
-        student = _db_manager.get_student_by_id(student_id)
+        try:
+            progress = _db_manager.create_student_progress(student_name, module_count)
+        except sqlite3.IntegrityError:
+            # Created by a concurrent request in the meantime
+            progress = _db_manager.load_student_progress(student_name, module_count)
 
-    # Get all module progress
-    modules = _db_manager.get_all_module_progress(student['id'])
-
-    # Check if we need to initialize any missing modules
-    # (This handles the case where new modules are added after student creation)
-    module_count = get_module_count()
-    if not modules or len(modules) < module_count:
-        _db_manager.initialize_student_modules(student['id'], module_count)
-        modules = _db_manager.get_all_module_progress(student['id'])
-
-    # Return in old format
-    return {
-        'current_module': student['current_module'],
-        'modules': modules,
-        'completed': bool(student['completed']),
-        'started_at': student['started_at']
-    }
+    return progress
 
 
 def update_student_progress(student_name: str, updates: Dict):
@@ -297,26 +1661,23 @@ def update_student_progress(student_name: str, updates: Dict):
     Update and save student progress.
     Accepts updates dict in the same format as the old JSON system.
     """
-    student = _db_manager.get_student_by_name(student_name)
-    if not student:
-        return
+    # Progress loaded by get_student_progress() already knows the student's ID
+    student_id = getattr(updates, 'student_id', None)
+    _db_manager.save_student_progress(student_name, updates, student_id)
 
-    student_id = student['id']
 
-    # Update student-level fields
-    student_updates = {}
-    if 'current_module' in updates:
-        student_updates['current_module'] = updates['current_module']
-    if 'completed' in updates:
-        student_updates['completed'] = updates['completed']
+def record_project_result(student_id: int, module_id: int, passed: bool,
+                          test_results: Dict) -> bool:
+    """Store a graded project submission (see DatabaseManager.record_project_result)."""
+    from module_loader import get_module_count
 
-    if student_updates:
-        _db_manager.update_student(student_name, **student_updates)
+    return _db_manager.record_project_result(student_id, module_id, passed, test_results,
+                                             get_module_count())
 
-    # Update module-level fields
-    if 'modules' in updates:
-        for module_id, module_data in updates['modules'].items():
-            _db_manager.save_module_progress(student_id, module_id, module_data)
+
+def record_attempt_event(student_id: int, module_id: int, kind: str, **details):
+    """Log a quiz or project attempt (see DatabaseManager.record_attempt_event)."""
+    _db_manager.record_attempt_event(student_id, module_id, kind, **details)
 
 
 def get_all_students_progress() -> Dict[str, Dict]:
@@ -324,26 +1685,14 @@ def get_all_students_progress() -> Dict[str, Dict]:
     Get progress for all students.
     Returns dict in same format as old load_progress().
     """
-    all_progress = {}
-    students = _db_manager.get_all_students()
-
-    for student in students:
-        modules = _db_manager.get_all_module_progress(student['id'])
-        all_progress[student['name']] = {
-            'current_module': student['current_module'],
-            'modules': modules,
-            'completed': bool(student['completed']),
-            'started_at': student['started_at']
-        }
-
-    return all_progress
+    return _db_manager.load_all_progress()
 
 
 def export_student_to_json(student_name: str, output_file: str):
     """Export a student's progress to JSON file."""
     progress = get_student_progress(student_name)
     with open(output_file, 'w') as f:
-        json.dump({student_name: progress}, f, indent=2)
+        json.dump({student_name: progress}, f, indent=2, default=progress_json_default)
 
 
 def import_student_from_json(input_file: str, overwrite: bool = False):
@@ -0,0 +1,362 @@
+"""
+Grading Queue
+Runs project submissions through their testers on a pool of background workers.
+Jobs are stored in SQLite, so queued submissions survive a restart.
+
+Results are also cached by (module, tester version, SHA-256 of the file), so
+re-uploading a file that was already graded returns its result straight away.
+Identical files come from different students, so the submission's path is
+taken out of a result before it is cached and the new path put back when
+it is reused.
+
+While a job runs, each test result is published as soon as its check
+finishes: to followers in this process directly, and to the
+grading_job_tests table for followers in other processes. follow() yields
+a job's progress for the results page's event stream.
+"""
+
+import hashlib
+import os
+import socket
+import threading
+import time
+import uuid
+
+from db_manager import get_db_manager
+from tester_registry import grade_submission, iter_grading, tester_version
+
+
+def submission_hash(filepath):
+    """SHA-256 of a submitted file's bytes."""
+    with open(filepath, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# Stand-ins for the submission's path and file name in cached results
+SUBMISSION_PATH = '<submission path>'
+SUBMISSION_NAME = '<submission>'
+
+# Part of the cache key; changed when cached results are stored differently
+CACHE_FORMAT = 'p1'
+
+
+def _replace_in_strings(value, replacements):
+    """Copy of a result with each (old, new) replacement made in every string in it."""
+    if isinstance(value, str):
+        for old, new in replacements:
+            value = value.replace(old, new)
+        return value
+    if isinstance(value, dict):
+        return {key: _replace_in_strings(item, replacements) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_replace_in_strings(item, replacements) for item in value]
+    return value
+
+
+def strip_submission_path(result, filepath):
+    """A result with the submission's path and file name replaced by stand-ins."""
+    paths = {filepath, os.path.abspath(filepath), os.path.realpath(filepath)}
+    replacements = [(path, SUBMISSION_PATH) for path in sorted(paths, key=len, reverse=True)]
+    replacements.append((os.path.basename(filepath), SUBMISSION_NAME))
+    return _replace_in_strings(result, replacements)
+
+
+def restore_submission_path(result, filepath):
+    """A cached result with its stand-ins replaced by this submission's path and file name."""
+    return _replace_in_strings(result, [(SUBMISSION_PATH, os.path.abspath(filepath)),
+                                        (SUBMISSION_NAME, os.path.basename(filepath))])
+
+
+def is_cacheable(result):
+    """
+    A result can be reused unless the tester errored out or a check timed out
+    (timeouts depend on server load, so they get a fresh run next time).
+    """
+    if not result.get('tests'):
+        return False
+    for test in result['tests']:
+        message = str(test.get('message', '')).lower()
+        if 'timed out' in message or 'timeout' in message:
+            return False
+    return True
+
+
+class _LiveJob:
+    """Test results of a job being graded in this process, for follow()."""
+
+    def __init__(self):
+        self.tests = []  # [{'seq', 'order', 'test'}] in the order they finished
+        self.done = False
+        self.changed = threading.Condition()
+
+
+class GradingQueue:
+    """Persistent job queue with a pool of grading worker threads."""
+
+    # Prune the result cache after this many new entries
+    PRUNE_EVERY = 100
+
+    def __init__(self, db_manager, grade_func=grade_submission, on_complete=None,
+                 num_workers=4, poll_interval=1.0, cache_size=5000, cache_max_age_days=30):
+        self.db = db_manager
+        self.grade_func = grade_func
+        self.on_complete = on_complete
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.cache_size = cache_size  # 0 disables the result cache
+        self.cache_max_age_days = cache_max_age_days
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._stopping = False
+        self._cache_writes = 0
+        self._live = {}  # job_id -> _LiveJob, for jobs this process is grading
+
+    @property
+    def worker_prefix(self):
+        """Worker names are '<host>:<pid>:<n>' so stale jobs can be traced to a process."""
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    def start(self):
+        """Recover jobs from dead workers and start the worker threads."""
+        if self._threads:
+            return
+
+        self._stopping = False
+        self.recover_stale_jobs()
+        self.prune_cache()
+
+        for n in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop,
+                                      args=(f'{self.worker_prefix}:{n}',),
+                                      name=f'grading-worker-{n}',
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Ask the workers to exit after their current job."""
+        self._stopping = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, student_name, module_id, filepath):
+        """
+        Queue a submission for grading. Returns the job ID.
+        A file this tester version has already graded is finished immediately.
+        """
+        job_id = uuid.uuid4().hex
+
+        cached = self.cached_result(module_id, filepath)
+        if cached is not None:
+            self.db.create_grading_job(job_id, student_name, module_id, filepath,
+                                       status='running', worker=f'{self.worker_prefix}:cache')
+            self._complete_job(self.db.get_grading_job(job_id), cached)
+            return job_id
+
+        self.db.create_grading_job(job_id, student_name, module_id, filepath)
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get_job(self, job_id):
+        """Get the current state of a job."""
+        return self.db.get_grading_job(job_id)
+
+    def depth(self):
+        """Number of jobs waiting for a worker."""
+        return self.db.count_grading_jobs('queued')
+
+    def recover_stale_jobs(self):
+        """
+        Requeue 'running' jobs whose worker process no longer exists
+        (e.g. the server was restarted mid-grading).
+        """
+        hostname = socket.gethostname()
+        stale = []
+        for worker in self.db.get_running_job_workers():
+            host, _, rest = worker.partition(':')
+            pid = rest.split(':', 1)[0]
+            if host != hostname or not pid.isdigit():
+                continue
+            if int(pid) == os.getpid() or not _pid_alive(int(pid)):
+                stale.append(worker)
+        return self.db.requeue_grading_jobs(stale)
+
+    def _worker_loop(self, worker_name):
+        """Take jobs off the queue until stopped."""
+        while not self._stopping:
+            try:
+                job = self.db.claim_grading_job(worker_name)
+            except Exception as e:
+                print(f"Grading queue error: {e}")
+                job = None
+
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+
+            self._run_job(job)
+
+    def cached_result(self, module_id, filepath):
+        """Stored result for this exact file and tester version, or None."""
+        if not self.cache_size:
+            return None
+        try:
+            cached = self.db.get_cached_grading_result(
+                module_id, f'{tester_version(module_id)}:{CACHE_FORMAT}', submission_hash(filepath))
+        except Exception as e:
+            print(f"Grading cache error: {e}")
+            return None
+        return restore_submission_path(cached, filepath) if cached is not None else None
+
+    def cache_result(self, module_id, filepath, version, result):
+        """Remember a result for identical submissions graded later (without its path)."""
+        if not self.cache_size or not is_cacheable(result):
+            return
+        try:
+            self.db.save_cached_grading_result(module_id, f'{version}:{CACHE_FORMAT}',
+                                               submission_hash(filepath),
+                                               strip_submission_path(result, filepath))
+        except Exception as e:
+            print(f"Grading cache error: {e}")
+            return
+
+        self._cache_writes += 1
+        if self._cache_writes % self.PRUNE_EVERY == 0:
+            self.prune_cache()
+
+    def prune_cache(self):
+        """Evict old and least recently used cached results."""
+        if not self.cache_size:
+            return 0
+        try:
+            return self.db.prune_grading_cache(self.cache_size, self.cache_max_age_days)
+        except Exception as e:
+            print(f"Grading cache error: {e}")
+            return 0
+
+    def _run_job(self, job):
+        """Grade one job, publishing each test as it finishes, and record its result."""
+        # Version is taken before grading so an edit mid-run can't be credited with this result
+        version = tester_version(job['module_id'])
+        live = self._live[job['id']] = _LiveJob()
+        try:
+            result = None
+            for kind, order, payload in iter_grading(job['module_id'], job['filepath'], self.grade_func):
+                if kind == 'test':
+                    self._publish_test(job['id'], live, order, payload)
+                else:
+                    result = payload
+            self.cache_result(job['module_id'], job['filepath'], version, result)
+            self._complete_job(job, result)
+        finally:
+            # Followers re-read the finished job from the database
+            self._live.pop(job['id'], None)
+            with live.changed:
+                live.done = True
+                live.changed.notify_all()
+
+    def _publish_test(self, job_id, live, order, test):
+        """Make one finished test visible to followers of the job."""
+        with live.changed:
+            entry = {'seq': len(live.tests) + 1, 'order': order, 'test': test}
+            live.tests.append(entry)
+            live.changed.notify_all()
+        try:
+            self.db.add_grading_job_test(job_id, entry['seq'], order, test)
+        except Exception as e:
+            print(f"Error saving partial result for job {job_id}: {e}")
+
+    def follow(self, job_id, after_seq=0, poll_interval=0.5, keepalive=15.0, max_duration=None):
+        """
+        Yield a job's progress until it finishes:
+        ('status', job) when its status or queue position changes,
+        ('test', {'seq', 'order', 'test'}) for each test result after after_seq,
+        ('done', job) once at the end, and None every keepalive seconds
+        with nothing to report. Jobs graded by this process are followed in
+        memory; others by polling the database. With max_duration, stops
+        after that many seconds even if the job isn't finished (follow again
+        with the last seq seen to resume).
+        """
+        seen = after_seq
+        last_status = None
+        idle_since = time.monotonic()
+        deadline = idle_since + max_duration if max_duration else None
+        while not self._stopping:
+            wait = keepalive
+            if deadline is not None:
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    return
+                wait = min(wait, keepalive)
+
+            live = self._live.get(job_id)
+            if live is not None:
+                with live.changed:
+                    if not live.done and not (live.tests and live.tests[-1]['seq'] > seen):
+                        live.changed.wait(wait)
+                    new = [entry for entry in live.tests if entry['seq'] > seen]
+                if last_status != ('running', 0):
+                    last_status = ('running', 0)
+                    yield 'status', {'id': job_id, 'status': 'running', 'queue_position': 0}
+            else:
+                job = self.db.get_grading_job(job_id)
+                if job is None:
+                    return
+                if job['status'] in ('done', 'failed'):
+                    yield 'done', job
+                    return
+                if last_status != (job['status'], job['queue_position']):
+                    last_status = (job['status'], job['queue_position'])
+                    yield 'status', job
+                new = self.db.get_grading_job_tests(job_id, seen)
+                if not new:
+                    time.sleep(min(poll_interval, wait))
+
+            for entry in new:
+                seen = entry['seq']
+                yield 'test', entry
+            if new:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= keepalive:
+                idle_since = time.monotonic()
+                yield None
+
+    def _complete_job(self, job, result):
+        """Apply a result to the student's progress and mark the job finished."""
+        outcome = None
+        status = 'done'
+        if self.on_complete:
+            try:
+                outcome = self.on_complete(job, result)
+            except Exception as e:
+                print(f"Error saving result for job {job['id']}: {e}")
+                status = 'failed'
+        self.db.finish_grading_job(job['id'], status, result, outcome)
+
+
+def _pid_alive(pid):
+    """Check whether a process with this PID exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Global grading queue instance (workers are started by the app)
+_queue = None
+
+
+def get_grading_queue(**kwargs):
+    """Get the global grading queue, creating it on first use."""
+    global _queue
+    if _queue is None:
+        _queue = GradingQueue(get_db_manager(), **kwargs)
+    return _queue
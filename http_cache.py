@@ -0,0 +1,156 @@
+"""
+HTTP Cache
+Server-side page fragment cache, ETags and content-hashed asset URLs.
+
+Module and quiz pages are the same HTML for every student apart from a
+small progress block. The module-specific part of those pages is rendered
+once per (template, module, content version) and kept in a PageCache; the
+per-student part is filled in separately. Pages carry a strong ETag built
+from the module's content version, the templates and assets, and the
+student's name, so a browser revalidating a page it already has gets a 304
+without the database being touched.
+
+Files in static/ are linked as /assets/<name>.<hash><ext> (see asset_url()),
+so they can be cached "forever" and a new URL is used as soon as they change.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from werkzeug.security import safe_join
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+# Rendered module/quiz bodies kept in memory per process
+PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 64))
+
+# Hex digits of the content hash put in asset URLs
+ASSET_HASH_LENGTH = 12
+
+# Cache-Control for hashed asset URLs, and for pages (always revalidated)
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+PAGE_CACHE_CONTROL = 'private, no-cache'
+
+_HASHED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[\w]+)$' % ASSET_HASH_LENGTH)
+
+
+class FileDigests:
+    """SHA-256 of files, recomputed only when a file's mtime or size changes."""
+
+    def __init__(self):
+        self._digests = {}  # path -> ((mtime_ns, size), sha256)
+
+    def get(self, path):
+        """Hex SHA-256 of a file, or None if it doesn't exist."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._digests.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._digests[path] = (key, digest)
+        return digest
+
+    def tree(self, directory):
+        """One hash over every file in a directory tree (changes when any of them does)."""
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, directory).encode())
+                digest.update((self.get(path) or '').encode())
+        return digest.hexdigest()
+
+
+class PageCache:
+    """Rendered HTML by key, least recently used dropped first."""
+
+    def __init__(self, max_size=PAGE_CACHE_SIZE):
+        self.max_size = max_size
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """Cached HTML for key, calling render() to produce it on a miss."""
+        with self._lock:
+            html = self._pages.get(key)
+            if html is not None:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        html = render()
+        with self._lock:
+            self._pages[key] = html
+            while len(self._pages) > self.max_size:
+                self._pages.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+
+_digests = FileDigests()
+_page_cache = PageCache()
+
+
+def asset_hash(filename):
+    """Short content hash of a file in static/, or None if it doesn't exist."""
+    path = safe_join(STATIC_DIR, filename)
+    digest = _digests.get(path) if path else None
+    return digest[:ASSET_HASH_LENGTH] if digest else None
+
+
+def hashed_asset_name(filename):
+    """css/style.css -> css/style.<hash>.css (unchanged if the file doesn't exist)."""
+    digest = asset_hash(filename)
+    if digest is None:
+        return filename
+    stem, ext = os.path.splitext(filename)
+    return f'{stem}.{digest}{ext}'
+
+
+def split_asset_name(hashed_name):
+    """css/style.<hash>.css -> ('css/style.css', '<hash>'); hash is None for a plain name."""
+    match = _HASHED_NAME.match(hashed_name)
+    if not match:
+        return hashed_name, None
+    return match.group('stem') + match.group('ext'), match.group('hash')
+
+
+def site_version():
+    """Hash of all templates and static files; part of every page ETag."""
+    return hashlib.sha256((_digests.tree(TEMPLATES_DIR) + _digests.tree(STATIC_DIR)).encode()).hexdigest()
+
+
+def page_etag(*parts):
+    """Strong ETag (without quotes) for a page built from the given parts."""
+    digest = hashlib.sha256(site_version().encode())
+    for part in parts:
+        digest.update(b'\0' + str(part).encode())
+    return digest.hexdigest()[:32]
+
+
+def cached_page(key, render):
+    """Rendered HTML from the global page cache (render() is called on a miss)."""
+    return _page_cache.get(key, render)
+
+
+def get_page_cache():
+    """Get the global page cache."""
+    return _page_cache
@@ -1,62 +1,520 @@
 """
 Module Loader
 Handles loading module data from JSON files in the modules/ directory.
+
+Only a small index of every module (title, category, project name, ...) is
+kept in memory. Full modules, with their long instructional content, are
+loaded when a page needs one and kept in a small LRU (MODULE_LRU_SIZE,
+default 16), so a worker's memory doesn't grow with the curriculum.
+
+Parsed modules are cached in modules/.cache/modules.cache so a worker
+doesn't have to parse every JSON file when it starts. The cache file is a
+pickled manifest (schema version, and per source file its mtime, size,
+SHA-256, index entry and where its module is stored) followed by one
+pickled module per file. A file whose mtime and size still match is taken
+from the cache; a changed file is only re-parsed if its contents really
+changed, and the cache is rewritten with just that entry replaced.
+
+Edits go live without a restart. A ModuleWatcher thread (inotify, or
+polling mtimes where inotify isn't available) calls refresh(), which
+re-parses only the changed files and swaps them in, then bumps the counter
+in modules/.cache/generation. Other processes notice the new generation in
+check_for_updates() (called before each request) and refresh too.
+
+get_module_content() returns a module's study material rendered to HTML by
+content_compiler, cached under modules/.cache/content/ by file hash.
 """
 
+import ctypes
+import ctypes.util
+import hashlib
 import json
 import os
+import pickle
+import select
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 from glob import glob
 
+from content_compiler import CompiledContentCache
+
+# Bump when the cache layout or the stored module format changes
+CACHE_SCHEMA = 2
+
+# How many full modules each process keeps loaded
+DEFAULT_LRU_SIZE = int(os.environ.get('MODULE_LRU_SIZE', 16))
+
+# Seconds between checks of the generation counter / module file mtimes
+CHECK_INTERVAL = 0.25
+
+
+def module_summary(module_data):
+    """The always-loaded part of a module: what lists and the progress page show."""
+    project = module_data.get('project') or {}
+    return {
+        'id': module_data.get('id'),
+        'day': module_data.get('day'),
+        'title': module_data.get('title'),
+        'category': module_data.get('category'),
+        'objective': module_data.get('objective'),
+        'project_name': project.get('name'),
+        'quiz_length': len(module_data.get('quiz') or [])
+    }
+
 
 class ModuleLoader:
     """Loads and manages module data from JSON files."""
 
-    def __init__(self, modules_dir='modules'):
+    def __init__(self, modules_dir='modules', use_cache=True, max_loaded=DEFAULT_LRU_SIZE):
         self.modules_dir = modules_dir
-        self._modules_cache = None
+        self.use_cache = use_cache
+        self.max_loaded = max_loaded
+        self.cache_path = os.path.join(modules_dir, '.cache', 'modules.cache')
+        self.generation_path = os.path.join(modules_dir, '.cache', 'generation')
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # one rebuild at a time
+        self._index = None            # module_id -> summary, in module order
+        self._sources = {}            # module_id -> where to load the full module from
+        self._entries = {}            # file name -> cache entry the index was built from
+        self._loaded = OrderedDict()  # module_id -> full module, least recently used first
+        self._generation = None       # generation counter value last seen
+        self._content = CompiledContentCache(
+            os.path.join(modules_dir, '.cache', 'content') if use_cache else None)
+        self._last_check = 0.0
 
-    def load_all_modules(self):
-        """Load all module JSON files from the modules directory."""
-        if self._modules_cache is not None:
-            return self._modules_cache
+    def load_index(self):
+        """Summaries of all modules ({module_id: summary}), built once per process."""
+        index = self._index
+        if index is not None:
+            return index
+        with self._refresh_lock:
+            if self._index is None:
+                self._generation = self.read_generation()
+                index, sources, entries = self._build_index({})
+                with self._lock:
+                    self._index, self._sources, self._entries = index, sources, entries
+            return self._index
 
-        modules = {}
-        module_files = sorted(glob(os.path.join(self.modules_dir, 'module_*.json')))
+    def refresh(self):
+        """
+        Pick up edited, added and removed module files: only changed files
+        are parsed, and the new index is swapped in at once. Loaded modules
+        that didn't change stay loaded. Returns the IDs of changed modules.
+        """
+        if self._index is None:
+            self.load_index()
+            return []
 
-        for module_file in module_files:
-            try:
-                with open(module_file, 'r', encoding='utf-8') as f:
-                    module_data = json.load(f)
-                    module_id = module_data.get('id')
-                    if module_id:
-                        modules[module_id] = module_data
-            except Exception as e:
-                print(f"Error loading {module_file}: {str(e)}")
+        with self._refresh_lock:
+            old_entries = self._entries
+            index, sources, entries = self._build_index(old_entries)
+
+            changed_names = {name for name in set(old_entries) | set(entries)
+                             if (old_entries.get(name) or {}).get('sha256')
+                             != (entries.get(name) or {}).get('sha256')}
+            changed = set()
+            for name in changed_names:
+                for entry in (old_entries.get(name), entries.get(name)):
+                    if entry and entry['summary']['id']:
+                        changed.add(entry['summary']['id'])
+
+            with self._lock:
+                self._index, self._sources, self._entries = index, sources, entries
+                for module_id in changed:
+                    self._loaded.pop(module_id, None)
+        return sorted(changed)
+
+    def read_generation(self):
+        """Current value of the shared generation counter (0 if it was never bumped)."""
+        try:
+            with open(self.generation_path, 'r') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump_generation(self):
+        """Tell other processes the modules changed."""
+        generation = self.read_generation() + 1
+        try:
+            os.makedirs(os.path.dirname(self.generation_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.generation_path),
+                                            prefix='.generation-')
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(generation))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.generation_path)
+        except OSError as e:
+            print(f"Could not update {self.generation_path}: {e}")
+            return self._generation
+        self._generation = generation
+        return generation
 
-        self._modules_cache = modules
-        return modules
+    def check_for_updates(self):
+        """
+        Refresh if another process bumped the generation counter.
+        Cheap enough to call on every request: it reads the counter at most
+        every CHECK_INTERVAL seconds.
+        """
+        now = time.monotonic()
+        if now - self._last_check < CHECK_INTERVAL:
+            return False
+        self._last_check = now
+
+        generation = self.read_generation()
+        if generation == self._generation:
+            return False
+        self._generation = generation
+        self.refresh()
+        return True
+
+    def file_stamps(self):
+        """(mtime_ns, size) of every module file, to spot changes by polling."""
+        stamps = {}
+        for module_file in glob(os.path.join(self.modules_dir, 'module_*.json')):
+            try:
+                stat = os.stat(module_file)
+            except OSError:
+                continue
+            stamps[os.path.basename(module_file)] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
 
     def get_module(self, module_id):
         """Get a specific module by ID."""
-        modules = self.load_all_modules()
-        return modules.get(module_id)
+        self.load_index()
+        with self._lock:
+            module = self._loaded.get(module_id)
+            if module is not None:
+                self._loaded.move_to_end(module_id)
+                return module
+            source = self._sources.get(module_id)
+        if source is None:
+            return None
+
+        module = self._read_module(source)
+        with self._lock:
+            self._loaded[module_id] = module
+            self._loaded.move_to_end(module_id)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return module
+
+    def get_module_version(self, module_id):
+        """SHA-256 of a module's JSON file (changes whenever it is edited), or None."""
+        self.load_index()
+        with self._lock:
+            return next((entry['sha256'] for entry in self._entries.values()
+                         if entry['summary']['id'] == module_id), None)
+
+    def get_module_content(self, module_id):
+        """A module's study material as HTML (see content_compiler.compile_module)."""
+        module = self.get_module(module_id)
+        if module is None:
+            return None
+        digest = self.get_module_version(module_id)
+        if digest is None:
+            digest = hashlib.sha256(json.dumps(module, sort_keys=True).encode()).hexdigest()
+        return self._content.get(CompiledContentCache.key_for(digest), module)
+
+    def load_all_modules(self):
+        """Load every module in full (prefer load_index() or get_module())."""
+        return {module_id: self.get_module(module_id) for module_id in self.load_index()}
 
     def get_module_count(self):
         """Get the total number of modules."""
-        return len(self.load_all_modules())
+        return len(self.load_index())
 
     def reload_modules(self):
-        """Clear cache and reload all modules."""
-        self._modules_cache = None
-        return self.load_all_modules()
+        """Re-read changed module files from disk (see refresh())."""
+        self.refresh()
+        return self.load_index()
+
+    def _build_index(self, previous):
+        """
+        Scan the module files, refresh the cache file if needed, and return
+        (index, sources, entries). previous is the entries of the index being
+        replaced: a file that fails to parse (e.g. caught mid-save) keeps its
+        previous version rather than disappearing.
+        """
+        cache_file, base, entries = self._open_cache() if self.use_cache else (None, 0, {})
+        if cache_file is None:
+            # No usable cache file: compare against what this process last loaded
+            entries = previous
+
+        scanned = []
+        kept = {}
+        changed = False
+        module_files = sorted(glob(os.path.join(self.modules_dir, 'module_*.json')))
+        for module_file in module_files:
+            name = os.path.basename(module_file)
+            try:
+                entry, body = self._scan_file(module_file, entries.get(name))
+            except Exception as e:
+                print(f"Error loading {module_file}: {str(e)}")
+                if name in previous:
+                    kept[name] = previous[name]
+                continue
+            if entry is not entries.get(name):
+                changed = True
+            scanned.append([module_file, name, entry, body])
+
+        if self.use_cache and (changed or len(scanned) != len(entries)):
+            cache_file, base = self._write_cache(scanned, cache_file, base)
+
+        index = {}
+        sources = {}
+        new_entries = {}
+        for module_file, name, entry, body in scanned:
+            if cache_file is None:
+                # Parsed from JSON on demand; the entry no longer points into a cache file
+                entry = {key: value for key, value in entry.items() if key not in ('offset', 'length')}
+            new_entries[name] = entry
+            module_id = entry['summary']['id']
+            if not module_id:
+                continue
+            index[module_id] = entry['summary']
+            if cache_file is not None:
+                sources[module_id] = (module_file, cache_file, base + entry['offset'], entry['length'])
+            else:
+                sources[module_id] = (module_file, None, 0, 0)
+
+        for name, entry in kept.items():
+            module_id = entry['summary']['id']
+            if module_id and module_id not in index and module_id in self._sources:
+                index[module_id] = entry['summary']
+                sources[module_id] = self._sources[module_id]
+                new_entries[name] = entry
+
+        return dict(sorted(index.items())), sources, new_entries
 
+    def _scan_file(self, module_file, entry):
+        """
+        A module file's cache entry, plus its pickled body if it had to be
+        parsed (None means the body in the cache file is still good).
+        The same entry object is returned if the file is unchanged.
+        """
+        stat = os.stat(module_file)
+        if entry and (entry['mtime_ns'], entry['size']) == (stat.st_mtime_ns, stat.st_size):
+            return entry, None
 
-# Global module loader instance
-_loader = ModuleLoader()
+        with open(module_file, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        if entry and entry['sha256'] == digest:
+            # Touched but not edited (e.g. a git checkout): no need to parse it
+            return dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size), None
+
+        module_data = json.loads(raw.decode('utf-8'))
+        entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest,
+                 'summary': module_summary(module_data)}
+        return entry, pickle.dumps(module_data, pickle.HIGHEST_PROTOCOL)
+
+    def _read_module(self, source):
+        """Load a full module from the cache file, or parse its JSON file."""
+        module_file, cache_file, offset, length = source
+        if cache_file is not None:
+            try:
+                return pickle.loads(os.pread(cache_file.fileno(), length, offset))
+            except Exception as e:
+                print(f"Module cache read failed, parsing {module_file}: {e}")
+        with open(module_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _open_cache(self):
+        """
+        Open the cache file: (file, offset of the first body, per-file entries),
+        or (None, 0, {}) if it is missing or outdated. The file stays open so
+        bodies can be read later even if another process replaces it.
+        """
+        try:
+            f = open(self.cache_path, 'rb')
+        except FileNotFoundError:
+            return None, 0, {}
+        try:
+            manifest = pickle.load(f)
+            base = f.tell()
+        except Exception as e:
+            f.close()
+            print(f"Ignoring unreadable module cache {self.cache_path}: {e}")
+            return None, 0, {}
+
+        if not isinstance(manifest, dict) or manifest.get('schema') != CACHE_SCHEMA:
+            f.close()
+            return None, 0, {}
+        return f, base, manifest['files']
+
+    def _write_cache(self, scanned, old_file, old_base):
+        """
+        Write a new cache file (atomically: other workers may be reading it),
+        copying unchanged bodies from the old one. Fills in each entry's
+        offset. Returns the new (file, base), or (None, 0) if it couldn't be
+        written and modules will be parsed from JSON instead.
+        """
+        bodies = []
+        offset = 0
+        for item in scanned:
+            module_file, name, entry, body = item
+            if body is None and old_file is not None:
+                body = os.pread(old_file.fileno(), entry['length'], old_base + entry['offset'])
+            elif body is None:
+                with open(module_file, 'rb') as f:
+                    body = pickle.dumps(json.loads(f.read().decode('utf-8')), pickle.HIGHEST_PROTOCOL)
+            item[2] = dict(entry, offset=offset, length=len(body))
+            item[3] = None
+            offset += len(body)
+            bodies.append(body)
+
+        manifest = {'schema': CACHE_SCHEMA, 'files': {item[1]: item[2] for item in scanned}}
+        cache_dir = os.path.dirname(self.cache_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.modules-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(manifest, f, pickle.HIGHEST_PROTOCOL)
+                    base = f.tell()
+                    f.write(b''.join(bodies))
+                os.chmod(tmp_path, 0o644)
+                new_file = open(tmp_path, 'rb')
+                os.replace(tmp_path, self.cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Could not write module cache {self.cache_path}: {e}")
+            return None, 0
+        finally:
+            if old_file is not None:
+                old_file.close()
+        return new_file, base
+
+
+class _Inotify:
+    """Minimal inotify(7) binding: tells us when anything in a directory changes."""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = (self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_FROM
+                | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE)
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch failed for {path}')
+
+    def wait(self, timeout):
+        """Wait up to timeout seconds for events; True if there were any (all are consumed)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ModuleWatcher:
+    """
+    Background thread that refreshes a loader when module files change and
+    bumps the generation counter so other processes follow. Uses inotify
+    when available, otherwise polls file mtimes every CHECK_INTERVAL.
+    Either way it also checks the generation counter, so changes seen by
+    another process's watcher are picked up here too.
+    """
+
+    # Wait this long after a change for an editor to finish saving
+    SETTLE_TIME = 0.05
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.mode = None
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """Start watching (once)."""
+        if self._thread is not None:
+            return
+        self.loader.load_index()
+        self._thread = threading.Thread(target=self._run, name='module-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching."""
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            inotify = _Inotify(self.loader.modules_dir)
+            self.mode = 'inotify'
+        except (OSError, AttributeError) as e:
+            print(f"Module watcher: inotify unavailable ({e}), polling instead")
+            inotify = None
+            self.mode = 'polling'
+
+        stamps = self.loader.file_stamps()
+        try:
+            while not self._stopping:
+                if inotify is not None:
+                    changed = inotify.wait(CHECK_INTERVAL)
+                else:
+                    time.sleep(CHECK_INTERVAL)
+                    new_stamps = self.loader.file_stamps()
+                    changed = new_stamps != stamps
+                    stamps = new_stamps
+
+                try:
+                    if changed:
+                        time.sleep(self.SETTLE_TIME)
+                        if inotify is not None:
+                            inotify.wait(0)
+                        else:
+                            stamps = self.loader.file_stamps()
+                        if self.loader.refresh():
+                            self.loader.bump_generation()
+                    else:
+                        self.loader.check_for_updates()
+                except Exception as e:
+                    print(f"Module watcher error: {e}")
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+
+# Global module loader instance (MODULE_CACHE=0 always parses the JSON files)
+_loader = ModuleLoader(use_cache=os.environ.get('MODULE_CACHE', '1') != '0')
+
+# Watcher for the global loader, started per process by start_watching()
+_watcher = None
+_watcher_pid = None
+
+
+def get_module_index():
+    """Summaries of all modules ({module_id: {'title', 'category', ...}})."""
+    return _loader.load_index()
 
 
 def get_all_modules():
-    """Get all modules."""
+    """Get all modules in full."""
     return _loader.load_all_modules()
 
 
@@ -65,6 +523,16 @@ def get_module(module_id):
     return _loader.get_module(module_id)
 
 
+def get_module_content(module_id):
+    """Rendered HTML of a module's study material, or None if there is no such module."""
+    return _loader.get_module_content(module_id)
+
+
+def get_module_version(module_id):
+    """Content version (file hash) of a module, or None if there is no such module."""
+    return _loader.get_module_version(module_id)
+
+
 def get_module_count():
     """Get the total number of modules."""
     return _loader.get_module_count()
@@ -73,3 +541,18 @@ def get_module_count():
 def reload_modules():
     """Reload all modules from disk."""
     return _loader.reload_modules()
+
+
+def start_watching():
+    """Reload module files as they are edited (one watcher thread per process)."""
+    global _watcher, _watcher_pid
+    if _watcher is None or _watcher_pid != os.getpid():
+        _watcher = ModuleWatcher(_loader)
+        _watcher_pid = os.getpid()
+        _watcher.start()
+    return _watcher
+
+
+def check_for_updates():
+    """Refresh if another process reported module changes (throttled; call per request)."""
+    return _loader.check_for_updates()
@@ -91,6 +91,35 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+// Module pages are revalidated with ETags, so the browser may show its cached
+// copy with the progress it had then. Each fresh render has a new token; if
+// we've seen this one before, fetch the student's current progress.
+document.addEventListener('DOMContentLoaded', function() {
+    const badges = document.getElementById('progress-badges');
+    if (!badges) return;
+
+    const url = badges.dataset.progressUrl;
+    const key = 'progress-token:' + url;
+    let seen = null;
+    try {
+        seen = localStorage.getItem(key);
+        localStorage.setItem(key, badges.dataset.rendered);
+    } catch (e) {
+        // Storage disabled: always refresh
+    }
+    if (seen !== null && seen !== badges.dataset.rendered) return;
+
+    fetch(url, { credentials: 'same-origin' })
+        .then(response => response.ok ? response.json() : null)
+        .then(parts => {
+            if (!parts) return;
+            badges.outerHTML = parts.badges;
+            const actions = document.getElementById('progress-actions');
+            if (actions) actions.outerHTML = parts.actions;
+        })
+        .catch(err => console.error('Failed to refresh progress: ', err));
+});
+
 // Progress animation on progress page
 window.addEventListener('load', function() {
     const progressBar = document.querySelector('.progress-fill');
@@ -7,6 +7,7 @@ Manage students and their progress in Python Classroom.
 import sys
 import argparse
 import os
+import re
 from datetime import datetime
 from db_manager import (
     get_db_manager,
@@ -19,22 +20,26 @@ from db_manager import (
 def list_students():
     """List all students with their progress."""
     db = get_db_manager()
-    students = db.get_all_students()
+    students = db.get_student_summaries()
 
     if not students:
         print("No students found.")
         return
 
-    print(f"\n{'Name':<20} {'Current Module':<15} {'Completed':<10} {'Started':<20}")
-    print("=" * 70)
+    print(f"\n{'Name':<20} {'Current Module':<15} {'Done':<6} {'Best Quiz':<10} "
+          f"{'Attempts':<9} {'Completed':<10} {'Started':<20}")
+    print("=" * 95)
 
     for student in students:
         name = student['name']
         current = student['current_module']
+        done = student['modules_completed']
+        best = f"{student['best_quiz_score']}%"
+        attempts = student['total_attempts']
         completed = "Yes" if student['completed'] else "No"
         started = student['started_at'][:19]  # Trim microseconds
 
-        print(f"{name:<20} {current:<15} {completed:<10} {started:<20}")
+        print(f"{name:<20} {current:<15} {done:<6} {best:<10} {attempts:<9} {completed:<10} {started:<20}")
 
     print(f"\nTotal students: {len(students)}\n")
 
@@ -135,8 +140,6 @@ def import_student(input_file, overwrite=False):
 
 def backup_database(backup_dir='data/backups'):
     """Create a timestamped backup of the database."""
-    import shutil
-
     db = get_db_manager()
     os.makedirs(backup_dir, exist_ok=True)
 
@@ -144,7 +147,8 @@ def backup_database(backup_dir='data/backups'):
     backup_file = os.path.join(backup_dir, f'classroom_{timestamp}.db')
 
     try:
-        shutil.copy2(db.db_path, backup_file)
+        # SQLite backup API: a plain file copy would miss changes still in the WAL
+        db.backup_to(backup_file)
         print(f"Database backed up to: {backup_file}")
     except Exception as e:
         print(f"Error creating backup: {e}")
@@ -152,8 +156,6 @@ def backup_database(backup_dir='data/backups'):
 
 def restore_database(backup_file):
     """Restore database from a backup file."""
-    import shutil
-
     if not os.path.exists(backup_file):
         print(f"Backup file not found: {backup_file}")
         return
@@ -169,16 +171,197 @@ def restore_database(backup_file):
         # Create a backup of current database first
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         safety_backup = f"{db.db_path}.before_restore_{timestamp}"
-        shutil.copy2(db.db_path, safety_backup)
+        db.backup_to(safety_backup)
         print(f"Current database backed up to: {safety_backup}")
 
         # Restore from backup
-        shutil.copy2(backup_file, db.db_path)
+        db.restore_from(backup_file)
         print(f"Database restored from: {backup_file}")
     except Exception as e:
         print(f"Error restoring database: {e}")
 
 
+# Submissions are saved as <student>_module<NNN>_<YYYYmmdd_HHMMSS>.py
+SUBMISSION_NAME = re.compile(r'^(?P<student>.+)_module(?P<module>\d{3})_(?P<stamp>\d{8}_\d{6})\.py$')
+
+
+def _quiet_worker():
+    """Process pool initializer: testers print a lot, keep the terminal readable."""
+    sys.stdout = open(os.devnull, 'w')
+
+
+def _grade_file(module_id, filepath):
+    """Grade one stored submission (runs in a worker process)."""
+    from tester_registry import grade_submission
+    return grade_submission(module_id, filepath)
+
+
+def latest_submissions(module_id, upload_dir='data/submissions', since=None):
+    """
+    Find each student's most recent submission for a module.
+    Yields (student_name, filepath) for students with a submission on or after since.
+
+    Students and files come from the grading_jobs rows made at upload.
+    Files uploaded before the grading queue existed have no row and are
+    matched to a student by filename; files that match no student, or
+    more than one, are listed and skipped.
+    """
+    db = get_db_manager()
+    students = {s['name'] for s in db.get_all_students()}
+
+    latest = {}
+    known_files = set()
+    for job in db.get_module_submissions(module_id):
+        known_files.add(os.path.abspath(job['filepath']))
+        if job['student_name'] in students:
+            latest[job['student_name']] = (datetime.fromisoformat(job['created_at']), job['filepath'])
+
+    for student, (submitted_at, filepath) in _legacy_submissions(module_id, upload_dir, students,
+                                                                 known_files).items():
+        if student not in latest:
+            latest[student] = (submitted_at, filepath)
+
+    for student, (submitted_at, filepath) in sorted(latest.items()):
+        if since is not None and submitted_at < since:
+            continue
+        if not os.path.exists(filepath):
+            print(f"Skipping {filepath} ({student}): file not found")
+            continue
+        yield student, filepath
+
+
+def _legacy_submissions(module_id, upload_dir, students, known_files):
+    """
+    {student: (submitted_at, filepath)} for the latest upload per student
+    that has no grading_jobs row, matched by its secure_filename(name) prefix.
+    """
+    from werkzeug.utils import secure_filename
+
+    module_dir = os.path.join(upload_dir, f'module{module_id:03d}')
+    if not os.path.isdir(module_dir):
+        return {}
+
+    by_filename = {}
+    for name in students:
+        by_filename.setdefault(secure_filename(name), []).append(name)
+
+    latest = {}
+    with os.scandir(module_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.py') or os.path.abspath(entry.path) in known_files:
+                continue
+            match = SUBMISSION_NAME.match(entry.name)
+            if not match or int(match.group('module')) != module_id:
+                print(f"Skipping {entry.path}: not a submission filename")
+                continue
+            candidates = by_filename.get(match.group('student'), [])
+            if len(candidates) != 1:
+                reason = (f"matches students {', '.join(sorted(candidates))}" if candidates
+                          else "matches no student")
+                print(f"Skipping {entry.path}: {reason}")
+                continue
+            submitted_at = datetime.strptime(match.group('stamp'), '%Y%m%d_%H%M%S')
+            student = candidates[0]
+            if student not in latest or submitted_at > latest[student][0]:
+                latest[student] = (submitted_at, entry.path)
+    return latest
+
+
+def regrade_module(module_id, since=None, jobs=None, batch_size=50, restart=False):
+    """
+    Re-run a module's tester over every student's latest submission and
+    store the new results. Progress is checkpointed, so an interrupted run
+    picks up where it stopped (unless the tester changed in between).
+    """
+    import time
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+    from tester_registry import tester_version
+    from module_loader import get_module_count
+
+    db = get_db_manager()
+    version = tester_version(module_id)
+    checkpoint_file = os.path.join(os.path.dirname(db.db_path), f'regrade_module{module_id:03d}.checkpoint')
+
+    # Checkpoint: first line is the tester version, then one graded path per line
+    done = set()
+    if os.path.exists(checkpoint_file) and not restart:
+        with open(checkpoint_file) as f:
+            lines = f.read().splitlines()
+        if lines and lines[0] == version:
+            done = set(lines[1:])
+            print(f"Resuming: {len(done)} submissions already re-graded.")
+    if not done:
+        with open(checkpoint_file, 'w') as f:
+            f.write(version + '\n')
+
+    todo = ((student, path) for student, path in latest_submissions(module_id, since=since)
+            if path not in done)
+    jobs = jobs or os.cpu_count() or 1
+    module_count = get_module_count()
+    graded = passed = failed_writes = 0
+    batch = []
+    started = time.monotonic()
+    last_report = started
+
+    def flush():
+        nonlocal failed_writes
+        if not batch:
+            return
+        try:
+            db.save_regraded_results(module_id, batch, module_count)
+        except Exception as e:
+            failed_writes += len(batch)
+            print(f"Error saving results: {e}")
+        else:
+            with open(checkpoint_file, 'a') as f:
+                f.writelines(item['filepath'] + '\n' for item in batch)
+        batch.clear()
+
+    print(f"Re-grading module {module_id} with {jobs} worker(s)...")
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_quiet_worker) as pool:
+        running = {}
+        while True:
+            # Keep a bounded number of submissions in flight
+            for student, path in todo:
+                running[pool.submit(_grade_file, module_id, path)] = (student, path)
+                if len(running) >= jobs * 2:
+                    break
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                student, path = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error grading {path}: {e}")
+                    continue
+                graded += 1
+                passed += bool(result['passed'])
+                batch.append({'student_name': student, 'filepath': path,
+                              'passed': result['passed'], 'test_results': result})
+
+            if len(batch) >= batch_size:
+                flush()
+
+            now = time.monotonic()
+            if now - last_report >= 2:
+                print(f"  {graded} re-graded ({graded / (now - started):.1f}/sec), {passed} passed")
+                last_report = now
+        flush()
+
+    elapsed = time.monotonic() - started
+    rate = graded / elapsed if elapsed > 0 else 0
+    print(f"\nRe-graded {graded} submissions in {elapsed:.1f}s ({rate:.1f}/sec): "
+          f"{passed} passed, {graded - passed} failed.")
+
+    if failed_writes:
+        print(f"{failed_writes} results could not be saved; run the command again to retry them.")
+    else:
+        os.remove(checkpoint_file)
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -193,6 +376,7 @@ Examples:
   %(prog)s import backup.json           # Import student from file
   %(prog)s backup                       # Create database backup
   %(prog)s restore backups/file.db      # Restore from backup
+  %(prog)s regrade --module 6 --jobs 4  # Re-run module 6 tests on latest submissions
         """
     )
 
@@ -230,6 +414,15 @@ Examples:
     restore_parser = subparsers.add_parser('restore', help='Restore database from backup')
     restore_parser.add_argument('backup_file', help='Backup file to restore from')
 
+    # Regrade command
+    regrade_parser = subparsers.add_parser('regrade', help="Re-grade students' latest submissions")
+    regrade_parser.add_argument('--module', type=int, required=True, help='Module number')
+    regrade_parser.add_argument('--since', type=datetime.fromisoformat,
+                               help='Only submissions made on or after this date (YYYY-MM-DD)')
+    regrade_parser.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    regrade_parser.add_argument('--restart', action='store_true',
+                               help='Ignore the checkpoint of an interrupted run')
+
     args = parser.parse_args()
 
     if not args.command:
@@ -251,6 +444,8 @@ Examples:
         backup_database(args.dir)
     elif args.command == 'restore':
         restore_database(args.backup_file)
+    elif args.command == 'regrade':
+        regrade_module(args.module, since=args.since, jobs=args.jobs, restart=args.restart)
 
 
 if __name__ == '__main__':
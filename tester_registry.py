@@ -0,0 +1,228 @@
+"""
+Tester Registry
+Finds the tester for each module and keeps it loaded.
+
+Testers are discovered in testers/ (moduleNNN_tester.py), loaded straight
+from their file the first time a module is graded, and checked for a
+test_submission() function. A tester is loaded again when its file changes,
+so fixing a tester doesn't need a restart. A module without a tester is
+graded by the test case engine, if its JSON has structured
+project.test_cases (module 1 so far); plain-string test cases are only
+descriptions, so such a module can't be graded.
+
+iter_grading() is the streaming form of grade_submission(): it yields each
+test result as its check finishes, then the final result.
+
+Changes to the shared helpers (check_runner, code_analysis, ...) are picked
+up by tester_version() for the result cache, but need a restart to load.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import queue
+import re
+import sys
+import threading
+
+from module_loader import get_module
+
+TESTERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testers')
+
+# Testers import their helpers (check_runner, execution_engine, ...) by name
+if TESTERS_DIR not in sys.path:
+    sys.path.append(TESTERS_DIR)
+
+import test_case_engine  # found in testers/
+from check_runner import result_listener
+
+TESTER_FILE = re.compile(r'^module(\d{3})_tester\.py$')
+
+# Shared tester code; editing any of these also invalidates cached results
+TESTER_HELPERS = ['check_runner.py', 'code_analysis.py', 'execution_engine.py']
+
+
+class TesterError(Exception):
+    """A tester file that can't be used (import error or no test_submission)."""
+
+
+class TesterRegistry:
+    """Module ID -> loaded test_submission(), reloaded when the tester file changes."""
+
+    def __init__(self, testers_dir=TESTERS_DIR):
+        self.testers_dir = testers_dir
+        self._lock = threading.Lock()
+        self._files = {}          # module_id -> tester path
+        self._files_stamp = None  # directory mtime the file list was built from
+        self._loaded = {}         # module_id -> ((mtime_ns, size), test_submission)
+        self._digests = {}        # path -> ((mtime_ns, size), sha256)
+
+    def discover(self):
+        """Module IDs that have a hand-written tester (rescanned when the directory changes)."""
+        try:
+            stamp = os.stat(self.testers_dir).st_mtime_ns
+        except OSError:
+            return {}
+        if stamp == self._files_stamp:
+            return self._files
+
+        files = {}
+        with os.scandir(self.testers_dir) as entries:
+            for entry in entries:
+                match = TESTER_FILE.match(entry.name)
+                if match:
+                    files[int(match.group(1))] = entry.path
+        self._files = files
+        self._files_stamp = stamp
+        return files
+
+    def get(self, module_id):
+        """The test_submission() function for a module, or None if it has no tester."""
+        path = self.discover().get(module_id)
+        if path is None:
+            return None
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        loaded = self._loaded.get(module_id)
+        if loaded and loaded[0] == key:
+            return loaded[1]
+
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            loaded = self._loaded.get(module_id)
+            if loaded and loaded[0] == key:
+                return loaded[1]
+            func = self._load(module_id, path)
+            self._loaded[module_id] = (key, func)
+            return func
+
+    def _load(self, module_id, path):
+        """Import a tester file and return its test_submission()."""
+        name = f'module{module_id:03d}_tester'
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except Exception as e:
+            raise TesterError(f'Could not load {os.path.basename(path)}: {e}') from e
+
+        func = getattr(module, 'test_submission', None)
+        if not callable(func):
+            raise TesterError(f'{os.path.basename(path)} has no test_submission() function')
+
+        sys.modules[name] = module
+        return func
+
+    def grade(self, module_id, filepath):
+        """
+        Run the tester for a module against a submitted file.
+        A hand-written tester takes precedence; otherwise the module's
+        structured project.test_cases are run by the test case engine.
+        """
+        try:
+            test_submission = self.get(module_id)
+            if test_submission is not None:
+                return test_submission(filepath)
+
+            project = (get_module(module_id) or {}).get('project')
+            if test_case_engine.has_test_cases(project):
+                return test_case_engine.test_submission(filepath, project)
+
+            return {
+                'passed': False,
+                'score': '0/0 (0%)',
+                'tests': [],
+                'message': f'Tester for module {module_id} not found. Please contact administrator.'
+            }
+        except Exception as e:
+            return {
+                'passed': False,
+                'score': '0/0 (0%)',
+                'tests': [],
+                'message': f'Error running tests: {str(e)}'
+            }
+
+    def version(self, module_id):
+        """Hash of a module's tester and the helpers it uses (changes whenever they are edited)."""
+        version = hashlib.sha256()
+        path = self.discover().get(module_id)
+        files = [f'module{module_id:03d}_tester.py'] + TESTER_HELPERS
+        if path is None:
+            # Graded by the test case engine from the module's JSON
+            files.append('test_case_engine.py')
+            module = get_module(module_id) or {}
+            version.update(json.dumps(module.get('project', {}).get('test_cases', []),
+                                      sort_keys=True).encode())
+
+        for name in files:
+            version.update(name.encode())
+            version.update((self._file_digest(os.path.join(self.testers_dir, name)) or 'missing').encode())
+        return version.hexdigest()
+
+    def _file_digest(self, path):
+        """SHA-256 of a file's contents, or None if it doesn't exist."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._digests.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._digests[path] = (key, digest)
+        return digest
+
+
+# Global tester registry instance
+_registry = TesterRegistry()
+
+
+def get_tester_registry():
+    """Get the global tester registry."""
+    return _registry
+
+
+def grade_submission(module_id, filepath):
+    """Run the tester for a module against a submitted file."""
+    return _registry.grade(module_id, filepath)
+
+
+def iter_grading(module_id, filepath, grade=grade_submission):
+    """
+    Grade a submission, yielding ('test', order, test) for each test as soon
+    as its check finishes (order is the check's position), then
+    ('result', None, result) with the tester's final result.
+    """
+    events = queue.Queue()
+
+    def run():
+        try:
+            with result_listener(lambda order, test: events.put(('test', order, test))):
+                result = grade(module_id, filepath)
+        except Exception as e:
+            result = {'passed': False, 'score': '0/0 (0%)', 'tests': [],
+                      'message': f'Error running tests: {str(e)}'}
+        events.put(('result', None, result))
+
+    thread = threading.Thread(target=run, name=f'grading-module-{module_id}', daemon=True)
+    thread.start()
+    while True:
+        event = events.get()
+        yield event
+        if event[0] == 'result':
+            break
+    thread.join()
+
+
+def tester_version(module_id):
+    """Version hash of a module's tester, for the result cache."""
+    return _registry.version(module_id)
@@ -0,0 +1,284 @@
+"""
+Check Runner
+Runs a tester's checks concurrently while keeping results in their original order.
+
+Static checks and black-box runs are independent, so running them one
+after another makes a submission wait for the sum of every timeout.
+run_checks() runs them on a shared, bounded thread pool instead:
+
+    results = run_checks([
+        Check(self.test_file_exists, critical=True),
+        Check(self.test_uses_input),
+        Check(self.test_code_runs_path1),
+        Check(self.test_code_runs_path2),
+        Check(self.test_different_outputs,
+              depends_on=[self.test_code_runs_path1, self.test_code_runs_path2]),
+    ])
+
+- depends_on: checks that must finish first (e.g. ones that fill self.test_outputs).
+- critical: checks listed after it wait for it, and are dropped if it fails
+  (the old "if a critical test fails, stop testing" loop).
+
+Testers whose checks append to a list (self.tests.append(...)) instead of
+returning a dict pass owner/attr, and the appended entries are put back in
+check order. Set TESTER_PARALLEL=0 to run checks sequentially.
+
+A check that tries the program on several inputs would run them one after
+another; ScenarioRuns gives each run a check of its own, and the check
+that judges them depends on those runs.
+
+To see results as they come in (e.g. to stream them to the browser), wrap
+the tester call in result_listener(callback): callback(order, test) is
+called with each test dict as soon as its check finishes, where order is
+the check's position. Checks finish in any order; the tester's return value
+has the final order.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Upper bound on checks running at once across every grading in this process.
+# Checks mostly wait on student programs, so this is not tied to the CPU count;
+# 16 lets the largest tester (module 9: 16 checks, 12 of them runs) go in one wave.
+DEFAULT_MAX_WORKERS = int(os.environ.get('TESTER_MAX_WORKERS', max(16, (os.cpu_count() or 1) * 2)))
+
+
+class Check:
+    """A tester check and what it needs to run after."""
+
+    def __init__(self, func, depends_on=(), critical=False):
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.critical = critical
+
+
+class ScenarioRuns:
+    """
+    One run per input, each as its own check, for a check that judges
+    several scenarios (so a hanging program costs one timeout, not one per
+    scenario):
+
+        edge_runs = ScenarioRuns(lambda stdin: run_python(path, input=stdin, timeout=5),
+                                 [stdin for stdin, expected in EDGE_CASES])
+        run_checks([*edge_runs.runs,
+                    Check(self.test_edge_cases, depends_on=edge_runs.runs)], owner=self)
+
+    The runs return nothing, so use them in testers that append to self.tests.
+    result(stdin) returns a run's result or raises the exception it raised.
+    """
+
+    def __init__(self, run, inputs):
+        self._run = run
+        self._results = {}
+        self.runs = [self._runner(value) for value in dict.fromkeys(inputs)]
+
+    def _runner(self, value):
+        def run_scenario():
+            try:
+                self._results[value] = (self._run(value), None)
+            except Exception as e:
+                self._results[value] = (None, e)
+        return run_scenario
+
+    def result(self, value):
+        """The result of the run for an input (raises what the run raised)."""
+        result, error = self._results[value]
+        if error is not None:
+            raise error
+        return result
+
+
+# Listener for the run_checks() calls made on this thread (see result_listener)
+_listeners = threading.local()
+
+
+class result_listener:
+    """Context manager: report each test result of run_checks() on this thread to callback(order, test)."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_listeners, 'callback', None)
+        _listeners.callback = self.callback
+        return self
+
+    def __exit__(self, *exc_info):
+        _listeners.callback = self._previous
+        return False
+
+
+def parallel_enabled():
+    """Parallel mode is on unless TESTER_PARALLEL=0."""
+    return os.environ.get('TESTER_PARALLEL', '1') != '0'
+
+
+def run_checks(checks, owner=None, attr='tests', parallel=None):
+    """
+    Run checks and return their return values in the order given.
+
+    Checks after a failed critical check are not run and not returned.
+    If owner is given, owner.<attr> is a list the checks append to; it is
+    rebuilt so entries appear in check order rather than completion order.
+    """
+    checks = [c if isinstance(c, Check) else Check(c) for c in checks]
+    if parallel is None:
+        parallel = parallel_enabled()
+
+    # Taken from the calling thread; checks run on pool threads. Clearing it
+    # means run_checks() called from inside a check doesn't report twice.
+    listener = getattr(_listeners, 'callback', None)
+    _listeners.callback = None
+
+    collector = None
+    if owner is not None:
+        collector = _OrderedAppendList(getattr(owner, attr), len(checks))
+        setattr(owner, attr, collector)
+
+    ran = []
+    try:
+        if parallel and len(checks) > 1:
+            results, ran = _run_parallel(checks, collector, listener)
+        else:
+            results, ran = _run_sequential(checks, collector, listener)
+    finally:
+        _listeners.callback = listener
+        if collector is not None:
+            setattr(owner, attr, collector.flatten(ran))
+
+    return [results[i] for i in ran]
+
+
+def check_passed(result):
+    """A check passes if it returned a truthy bool or a dict with passed=True."""
+    if isinstance(result, dict):
+        return bool(result.get('passed'))
+    return bool(result)
+
+
+def _run_sequential(checks, collector, listener=None):
+    """Run checks one at a time, stopping after a failed critical check."""
+    results = [None] * len(checks)
+    ran = []
+    for i, check in enumerate(checks):
+        results[i] = _call(check, i, collector, listener)
+        ran.append(i)
+        if check.critical and not check_passed(results[i]):
+            break
+    return results, ran
+
+
+def _run_parallel(checks, collector, listener=None):
+    """Run every check as soon as its dependencies and earlier critical checks finish."""
+    index_of = {}
+    for i, check in enumerate(checks):
+        index_of.setdefault(check.func, i)
+
+    waits_for = []
+    for i, check in enumerate(checks):
+        deps = {index_of[d] for d in check.depends_on if d in index_of}
+        deps.update(j for j in range(i) if checks[j].critical)
+        waits_for.append(deps)
+
+    pool = _get_pool()
+    results = [None] * len(checks)
+    finished = set()
+    skipped = set()
+    pending = set(range(len(checks)))
+    running = {}
+
+    while pending or running:
+        for i in sorted(pending):
+            if not waits_for[i] <= finished | skipped:
+                continue
+            pending.discard(i)
+            blocked = any(j in skipped or (checks[j].critical and not check_passed(results[j]))
+                          for j in waits_for[i])
+            if blocked:
+                skipped.add(i)
+            else:
+                running[pool.submit(_call, checks[i], i, collector, listener)] = i
+
+        if not running:
+            if pending:
+                raise ValueError('Check dependencies form a cycle')
+            continue
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = running.pop(future)
+            results[i] = future.result()
+            finished.add(i)
+
+    # Same cut-off as the sequential loop: nothing after the first failed critical check
+    ran = []
+    for i, check in enumerate(checks):
+        if i in skipped:
+            break
+        ran.append(i)
+        if check.critical and not check_passed(results[i]):
+            break
+    return results, ran
+
+
+def _call(check, index, collector, listener=None):
+    """Run one check, routing its appends to its own slot, and report its results."""
+    if collector is not None:
+        collector.slot.index = index
+    try:
+        result = check.func()
+    finally:
+        if collector is not None:
+            collector.slot.index = None
+
+    if listener is not None:
+        tests = collector.buckets[index] if collector is not None else [result]
+        for test in tests:
+            if isinstance(test, dict):
+                try:
+                    listener(index, test)
+                except Exception as e:
+                    print(f"Result listener error: {e}")
+    return result
+
+
+class _OrderedAppendList(list):
+    """List that files append() calls under the check running in the current thread."""
+
+    def __init__(self, initial, num_checks):
+        super().__init__(initial)
+        self.slot = threading.local()
+        self.buckets = [[] for _ in range(num_checks)]
+
+    def append(self, item):
+        index = getattr(self.slot, 'index', None)
+        if index is None:
+            super().append(item)
+        else:
+            self.buckets[index].append(item)
+
+    def flatten(self, ran):
+        """Plain list: entries from before the run, then each check's entries in order."""
+        items = list(self)
+        for i in ran:
+            items.extend(self.buckets[i])
+        return items
+
+
+# Shared pool, created lazily per process (forked workers need their own)
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Get the process-wide check pool."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS,
+                                       thread_name_prefix='tester-check')
+            _pool_pid = os.getpid()
+        return _pool
@@ -0,0 +1,159 @@
+"""
+Code Analysis
+Parses a submission once and indexes its syntax tree for the static checks.
+
+Each static check used to call ast.parse() and ast.walk() on its own, so a
+tester with six static checks parsed and walked the file six times.
+analyze() parses the source once, walks it once, and indexes the nodes;
+checks then query the index:
+
+    code = analyze(self.code_content).require()
+    input_count = len(code.calls('input'))
+    nested = code.has_nested_if()
+    and_count = len(code.ops(ast.BoolOp, ast.And))
+
+Results are cached by source text, so every check of the same submission
+(even on different threads) shares one analysis.
+"""
+
+import ast
+import io
+import threading
+import tokenize
+from collections import OrderedDict, deque
+
+# How many analysed sources to keep (one per submission being graded)
+CACHE_SIZE = 32
+
+# Node types whose 'op' field is indexed for ops()
+_OP_NODES = (ast.BinOp, ast.BoolOp, ast.UnaryOp, ast.AugAssign)
+
+
+class CodeAnalysis:
+    """Syntax tree of one source file, indexed by node type."""
+
+    def __init__(self, source):
+        self.source = source
+        self.tree = None
+        self.error = None
+        self._nodes = {}         # node type -> nodes, in ast.walk() order
+        self._calls = {}         # name -> calls like name(...)
+        self._method_calls = {}  # name -> calls like obj.name(...)
+        self._ops = {}           # (node type, op type) -> nodes
+        self.if_depths = []      # how many If nodes enclose each If node
+
+        try:
+            self.tree = ast.parse(source)
+        except SyntaxError as e:
+            self.error = e
+            return
+
+        self._index()
+
+    def _index(self):
+        """Walk the tree once (same order as ast.walk) and fill the indexes."""
+        queue = deque([(self.tree, 0)])
+        while queue:
+            node, if_depth = queue.popleft()
+            node_type = type(node)
+            self._nodes.setdefault(node_type, []).append(node)
+
+            if node_type is ast.If:
+                self.if_depths.append(if_depth)
+                if_depth += 1
+            elif node_type is ast.Call:
+                func = node.func
+                if isinstance(func, ast.Name):
+                    self._calls.setdefault(func.id, []).append(node)
+                elif isinstance(func, ast.Attribute):
+                    self._method_calls.setdefault(func.attr, []).append(node)
+            elif node_type in _OP_NODES:
+                self._ops.setdefault((node_type, type(node.op)), []).append(node)
+
+            queue.extend((child, if_depth) for child in ast.iter_child_nodes(node))
+
+    def require(self):
+        """Return self, or raise the SyntaxError if the source didn't parse."""
+        if self.error is not None:
+            # A fresh exception per caller: checks on other threads may raise it too
+            raise SyntaxError(*self.error.args)
+        return self
+
+    def nodes(self, *node_types):
+        """All nodes of the given types (exact types, e.g. ast.If, ast.Compare)."""
+        if len(node_types) == 1:
+            return list(self._nodes.get(node_types[0], ()))
+        found = []
+        for node_type in node_types:
+            found.extend(self._nodes.get(node_type, ()))
+        return found
+
+    def count(self, *node_types):
+        """Number of nodes of the given types."""
+        return sum(len(self._nodes.get(node_type, ())) for node_type in node_types)
+
+    def calls(self, name):
+        """Calls to a plain name, e.g. calls('input') finds input(...)."""
+        return list(self._calls.get(name, ()))
+
+    def method_calls(self, name):
+        """Calls through an attribute, e.g. method_calls('format') finds '...'.format(...)."""
+        return list(self._method_calls.get(name, ()))
+
+    def called_names(self):
+        """Set of plain names that are called anywhere."""
+        return set(self._calls)
+
+    def ops(self, node_type, op_type):
+        """Operator nodes of one kind, e.g. ops(ast.BinOp, ast.Mod) finds a % b."""
+        return list(self._ops.get((node_type, op_type), ()))
+
+    def op_types(self, node_type):
+        """Set of operator type names used by a node type, e.g. {'Add', 'Mult'} for ast.BinOp."""
+        return {op_type.__name__ for (kind, op_type) in self._ops if kind is node_type}
+
+    def has_nested_if(self):
+        """True if any if/elif sits inside another if (an elif counts, as it is an If in orelse)."""
+        return any(depth > 0 for depth in self.if_depths)
+
+    def max_if_depth(self):
+        """Deepest if nesting (1 = ifs but none nested, 0 = no ifs)."""
+        return max(self.if_depths) + 1 if self.if_depths else 0
+
+    def comment_count(self):
+        """
+        Number of # comments (a # inside a string doesn't count). Works on
+        source that doesn't parse: comments up to the error are counted.
+        """
+        count = 0
+        try:
+            for token in tokenize.generate_tokens(io.StringIO(self.source).readline):
+                if token.type == tokenize.COMMENT:
+                    count += 1
+        except (tokenize.TokenError, SyntaxError):
+            pass
+        return count
+
+
+# Recently analysed sources, most recent last
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def analyze(source):
+    """Get the (cached) analysis of a source string."""
+    with _cache_lock:
+        analysis = _cache.get(source)
+        if analysis is not None:
+            _cache.move_to_end(source)
+            return analysis
+
+    # Parse outside the lock; two threads racing on a new source both get a valid result
+    analysis = CodeAnalysis(source)
+
+    with _cache_lock:
+        analysis = _cache.setdefault(source, analysis)
+        _cache.move_to_end(source)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return analysis
@@ -0,0 +1,660 @@
+"""
+Execution Engine
+Shared runner for student programs used by all testers.
+
+Starting a fresh interpreter for every test case costs 20-40ms of CPython
+startup, and testers run a submission up to 7 times. Instead, one warm
+"fork server" interpreter is started per grading process with the common
+standard library modules already imported. Each run is a fork of that
+parent, so it starts in about a millisecond.
+
+Usage mirrors subprocess.run:
+
+    result = run_python(path, input="5\\n3\\n", timeout=5)
+    result.stdout, result.stderr, result.returncode, result.duration
+
+On timeout the program is killed and subprocess.TimeoutExpired is raised,
+exactly like subprocess.run, so existing error handling keeps working.
+Set CLASSROOM_FORKSERVER=0 to fall back to a plain subprocess per run.
+
+Every run is sandboxed so one bad submission can't slow down everyone
+else's grading: it gets rlimits on address space, CPU time, processes and
+file size (SANDBOX_MEMORY_MB, SANDBOX_CPU_SECONDS, SANDBOX_MAX_PROCESSES,
+SANDBOX_MAX_FILE_MB; 0 = no limit; the process limit counts all of the
+user's processes and doesn't apply to root), its stdout/stderr are read from pipes
+and cut off after SANDBOX_MAX_OUTPUT_KB each (result.truncated), and it
+runs in a fresh temporary directory unless a cwd is given. The result also
+has the run's peak memory (result.max_rss, bytes) and CPU time
+(result.cpu_time, seconds); a TimeoutExpired carries the same two
+attributes. get_run_stats() keeps totals over all runs in the process.
+"""
+
+import json
+import math
+import os
+import select
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows; runs are then unlimited
+    resource = None
+
+# Modules imported once in the warm parent so forked runs don't pay for them
+PRELOAD_MODULES = [
+    'random', 'math', 'datetime', 'time', 'json', 're', 'os', 'csv',
+    'string', 'collections', 'decimal', 'traceback', 'types', 'io'
+]
+
+
+# Resource caps for each run (0 = no limit)
+MEMORY_LIMIT_MB = int(os.environ.get('SANDBOX_MEMORY_MB', 512))
+CPU_LIMIT_SECONDS = int(os.environ.get('SANDBOX_CPU_SECONDS', 30))  # lowered to timeout + 1
+PROCESS_LIMIT = int(os.environ.get('SANDBOX_MAX_PROCESSES', 256))   # per user, as the kernel counts it
+FILE_SIZE_LIMIT_MB = int(os.environ.get('SANDBOX_MAX_FILE_MB', 16))
+OUTPUT_LIMIT_KB = int(os.environ.get('SANDBOX_MAX_OUTPUT_KB', 1024))
+
+# After a program exits, how long to wait for the rest of its output
+DRAIN_TIMEOUT = 1.0
+
+
+class RunResult(subprocess.CompletedProcess):
+    """Result of running a student program (a CompletedProcess plus timing and resource use)."""
+
+    def __init__(self, args, returncode, stdout=None, stderr=None, duration=0.0,
+                 max_rss=None, cpu_time=None, truncated=False):
+        super().__init__(args, returncode, stdout, stderr)
+        self.duration = duration
+        self.max_rss = max_rss      # peak resident memory in bytes (None if unknown)
+        self.cpu_time = cpu_time    # user + system CPU seconds (None if unknown)
+        self.truncated = truncated  # stdout or stderr hit the output cap
+
+
+class RunStats:
+    """Totals over every run_python() call in this process (for benchmarks)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.runs = 0
+            self.timeouts = 0
+            self.cpu_time = 0.0
+            self.max_rss = 0
+
+    def record(self, max_rss, cpu_time, timed_out=False):
+        with self._lock:
+            self.runs += 1
+            self.timeouts += timed_out
+            self.cpu_time += cpu_time or 0.0
+            self.max_rss = max(self.max_rss, max_rss or 0)
+
+    def snapshot(self):
+        """{'runs', 'timeouts', 'cpu_time', 'max_rss'} so far."""
+        with self._lock:
+            return {'runs': self.runs, 'timeouts': self.timeouts,
+                    'cpu_time': self.cpu_time, 'max_rss': self.max_rss}
+
+
+def _timeout_error(args, timeout, stdout, stderr, max_rss, cpu_time):
+    """TimeoutExpired for a killed run, carrying its max_rss and cpu_time like a RunResult."""
+    error = subprocess.TimeoutExpired(args, timeout, output=stdout, stderr=stderr)
+    error.max_rss = max_rss
+    error.cpu_time = cpu_time
+    return error
+
+
+def resource_limits(timeout=None):
+    """The rlimits for one run, as {'RLIMIT_AS': bytes, ...} (JSON-friendly)."""
+    cpu = CPU_LIMIT_SECONDS
+    if timeout is not None:
+        cpu = min(cpu, math.ceil(timeout) + 1) if cpu else math.ceil(timeout) + 1
+
+    limits = {
+        'RLIMIT_AS': MEMORY_LIMIT_MB * 1024 * 1024,
+        'RLIMIT_CPU': cpu,
+        'RLIMIT_NPROC': PROCESS_LIMIT,
+        'RLIMIT_FSIZE': FILE_SIZE_LIMIT_MB * 1024 * 1024
+    }
+    return {name: value for name, value in limits.items() if value}
+
+
+def apply_resource_limits(limits, pid=0):
+    """Set rlimits on a process (0 = this one). Limits the platform lacks are skipped."""
+    if resource is None:
+        return
+    for name, value in limits.items():
+        which = getattr(resource, name, None)
+        if which is None:
+            continue
+        # CPU: SIGXCPU at the soft limit, SIGKILL a second later
+        hard = value + 1 if name == 'RLIMIT_CPU' else value
+        try:
+            if pid:
+                resource.prlimit(pid, which, (value, hard))
+            else:
+                resource.setrlimit(which, (value, hard))
+        except (ValueError, OSError):
+            pass
+
+
+class _OutputCapture:
+    """Reads a run's stdout/stderr pipes, keeping at most max_bytes of each."""
+
+    def __init__(self, fds, max_bytes):
+        self.max_bytes = max_bytes
+        self.open = list(fds)
+        self.data = {fd: bytearray() for fd in fds}
+        self.truncated = False
+
+    def read(self, fd):
+        """Read what's available on a pipe (closing it at EOF)."""
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            self.open.remove(fd)
+            os.close(fd)
+            return
+        kept = self.data[fd]
+        room = self.max_bytes - len(kept) if self.max_bytes else len(chunk)
+        if room < len(chunk):
+            # Keep reading (and dropping) so the program never blocks on a full pipe
+            self.truncated = True
+        kept.extend(chunk[:max(room, 0)])
+
+    def drain(self, timeout):
+        """Read until every pipe is closed, or give up after timeout."""
+        deadline = time.monotonic() + timeout
+        while self.open:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select(self.open, [], [], remaining)
+            for fd in ready:
+                self.read(fd)
+        self.close()
+
+    def close(self):
+        for fd in self.open:
+            os.close(fd)
+        self.open = []
+
+    def output(self, fd, text):
+        data = bytes(self.data[fd])
+        return data.decode(errors='replace') if text else data
+
+
+def _rusage_stats(rusage):
+    """(max_rss in bytes, CPU seconds) from a child's rusage."""
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return rusage.ru_maxrss * scale, rusage.ru_utime + rusage.ru_stime
+
+
+class ForkServer:
+    """Client for a warm interpreter that forks a child per program run."""
+
+    def __init__(self):
+        self.process = None
+        self.socket_dir = None
+        self.socket_path = None
+        self.owner_pid = None
+        self._lock = threading.Lock()
+
+    def is_running(self):
+        """Check whether this process's server is alive (a forked worker needs its own)."""
+        return (self.process is not None and self.owner_pid == os.getpid()
+                and self.process.poll() is None)
+
+    def start(self):
+        """Start the server (once) and wait until it is accepting runs."""
+        with self._lock:
+            if self.is_running():
+                return
+
+            socket_dir = tempfile.mkdtemp(prefix='classroom-forkserver-')
+            socket_path = os.path.join(socket_dir, 'server.sock')
+            process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--serve',
+                 socket_path, str(os.getpid())],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE
+            )
+
+            # The server prints one line once its socket is listening;
+            # only then is it published to other threads
+            ready = process.stdout.readline()
+            if ready.strip() != b'ready':
+                process.kill()
+                raise RuntimeError('Fork server failed to start')
+
+            self.socket_dir = socket_dir
+            self.socket_path = socket_path
+            self.owner_pid = os.getpid()
+            self.process = process
+
+    def stop(self):
+        """Stop the server process."""
+        with self._lock:
+            if self.process is not None:
+                self.process.kill()
+                self.process.wait()
+                self.process = None
+
+    def run(self, script_path, input=None, timeout=None, cwd=None, text=True, limits=None):
+        """Run a script in a forked child. See run_python()."""
+        if not self.is_running():
+            self.start()
+
+        script_path = os.path.abspath(script_path)
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+
+        with tempfile.TemporaryFile() as stdin_file:
+            if input is not None:
+                stdin_file.write(input.encode() if isinstance(input, str) else input)
+                stdin_file.seek(0)
+
+            stdout_r, stdout_w = os.pipe()
+            stderr_r, stderr_w = os.pipe()
+            capture = _OutputCapture([stdout_r, stderr_r], OUTPUT_LIMIT_KB * 1024)
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                try:
+                    conn.connect(self.socket_path)
+                    request = json.dumps({
+                        'path': script_path,
+                        'cwd': os.path.abspath(cwd),
+                        'limits': limits
+                    }).encode()
+                    socket.send_fds(conn, [request],
+                                    [stdin_file.fileno(), stdout_w, stderr_w])
+                finally:
+                    # Only the child holds the write ends, so EOF means it's gone
+                    os.close(stdout_w)
+                    os.close(stderr_w)
+
+                messages = _MessageReader(conn)
+                reply = messages.next(capture, None)
+                if 'error' in reply:
+                    raise RuntimeError(f"Fork server error: {reply['error']}")
+
+                # Read output until the exit status arrives, killing the run if it overstays
+                status = messages.next(capture, deadline)
+                timed_out = status is None
+                if timed_out:
+                    conn.sendall(b'kill\n')
+                    status = messages.next(capture, None)
+                capture.drain(DRAIN_TIMEOUT)
+            finally:
+                capture.close()
+                conn.close()
+
+        stdout = capture.output(stdout_r, text)
+        stderr = capture.output(stderr_r, text)
+        args = [sys.executable, script_path]
+        if timed_out:
+            raise _timeout_error(args, timeout, stdout, stderr,
+                                 status.get('max_rss'), status.get('cpu_time'))
+        return RunResult(args, status['returncode'], stdout, stderr,
+                         duration=time.monotonic() - started,
+                         max_rss=status.get('max_rss'), cpu_time=status.get('cpu_time'),
+                         truncated=capture.truncated)
+
+
+class _MessageReader:
+    """JSON lines from the fork server, read while also draining a run's output pipes."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.buffer = b''
+
+    def next(self, capture, deadline):
+        """The next message, or None if deadline (a monotonic time) passes first."""
+        while b'\n' not in self.buffer:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if remaining == 0:
+                return None
+            ready, _, _ = select.select([self.conn] + capture.open, [], [], remaining)
+            for fd in ready:
+                if fd is self.conn:
+                    data = self.conn.recv(4096)
+                    if not data:
+                        raise RuntimeError('Fork server closed the connection')
+                    self.buffer += data
+                else:
+                    capture.read(fd)
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        return json.loads(line)
+
+
+def _fork_server_available():
+    """Fork server needs POSIX fork and fd passing over Unix sockets."""
+    if os.environ.get('CLASSROOM_FORKSERVER', '1') == '0':
+        return False
+    return hasattr(os, 'fork') and hasattr(socket, 'send_fds')
+
+
+# Global fork server (started on first use in each grading process)
+_server = ForkServer()
+
+# Global run statistics
+_run_stats = RunStats()
+
+
+def get_run_stats():
+    """Get this process's run statistics."""
+    return _run_stats
+
+
+def start_fork_server():
+    """Start this process's fork server now instead of on the first run."""
+    if _fork_server_available():
+        _server.start()
+
+
+def run_python(script_path, input=None, timeout=None, cwd=None, text=True, env=None):
+    """
+    Run a Python script with the given stdin and capture its output.
+
+    Equivalent to subprocess.run([sys.executable, script_path], input=input,
+    capture_output=True, text=True, timeout=timeout, cwd=cwd), but served from
+    the warm fork server when available, and sandboxed (see the module
+    docstring). Without a cwd the program runs in a temporary directory that
+    is removed afterwards. A custom env requires a fresh interpreter (e.g.
+    PYTHONHASHSEED), so it always uses a plain subprocess.
+    """
+    limits = resource_limits(timeout)
+    run_dir = None
+    if cwd is None:
+        cwd = run_dir = tempfile.mkdtemp(prefix='classroom-run-')
+
+    try:
+        try:
+            result = _run(script_path, input, timeout, cwd, text, env, limits)
+        except subprocess.TimeoutExpired as e:
+            _run_stats.record(getattr(e, 'max_rss', None), getattr(e, 'cpu_time', None),
+                              timed_out=True)
+            raise
+        _run_stats.record(result.max_rss, result.cpu_time)
+        return result
+    finally:
+        if run_dir is not None:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def _run(script_path, input, timeout, cwd, text, env, limits):
+    """One run, from the fork server when possible."""
+    if env is None and _fork_server_available():
+        try:
+            return _server.run(script_path, input=input, timeout=timeout, cwd=cwd,
+                               text=text, limits=limits)
+        except (OSError, RuntimeError) as e:
+            print(f"Fork server unavailable, using subprocess: {e}", file=sys.stderr)
+
+    return _run_subprocess(script_path, input, timeout, cwd, text, env, limits)
+
+
+def _run_subprocess(script_path, input, timeout, cwd, text, env, limits):
+    """run_python() with a fresh interpreter per run."""
+    started = time.monotonic()
+    deadline = None if timeout is None else started + timeout
+    args = [sys.executable, script_path]
+
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+    capture = _OutputCapture([stdout_r, stderr_r], OUTPUT_LIMIT_KB * 1024)
+    try:
+        with tempfile.TemporaryFile() as stdin_file:
+            if input is not None:
+                stdin_file.write(input.encode() if isinstance(input, str) else input)
+                stdin_file.seek(0)
+            try:
+                process = subprocess.Popen(args, stdin=stdin_file, stdout=stdout_w, stderr=stderr_w,
+                                           cwd=cwd, env=env, start_new_session=True)
+            finally:
+                os.close(stdout_w)
+                os.close(stderr_w)
+
+        # Set from outside (preexec_fn isn't safe in a threaded server); the
+        # interpreter is still starting up, so the script itself always runs limited
+        apply_resource_limits(limits, process.pid)
+
+        pid = 0
+        timed_out = False
+        try:
+            # Read output until the program exits or overstays its timeout
+            while True:
+                pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+                if pid:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    timed_out = True
+                    break
+                wait = 0.005 if remaining is None else min(0.005, remaining)
+                if capture.open:
+                    ready, _, _ = select.select(capture.open, [], [], wait)
+                    for fd in ready:
+                        capture.read(fd)
+                else:
+                    time.sleep(wait)
+        finally:
+            # Kill the run (or whatever it left running in the background)
+            _kill_group(process.pid)
+            if not pid:
+                _, status, rusage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+        capture.drain(DRAIN_TIMEOUT)
+    finally:
+        capture.close()
+
+    stdout = capture.output(stdout_r, text)
+    stderr = capture.output(stderr_r, text)
+    max_rss, cpu_time = _rusage_stats(rusage)
+    if timed_out:
+        raise _timeout_error(args, timeout, stdout, stderr, max_rss, cpu_time)
+    return RunResult(args, process.returncode, stdout, stderr,
+                     duration=time.monotonic() - started,
+                     max_rss=max_rss, cpu_time=cpu_time, truncated=capture.truncated)
+
+
+# ---------------------------------------------------------------------------
+# Server side (runs in the warm interpreter started by ForkServer.start)
+# ---------------------------------------------------------------------------
+
+def _serve(socket_path, parent_pid):
+    """Accept run requests and fork a child for each one."""
+    import importlib
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+    # Ctrl+C in the terminal is for the app, not for us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(128)
+
+    # SIGCHLD wakes up select() through a self-pipe
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    sys.stdout.write('ready\n')
+    sys.stdout.flush()
+
+    children = {}     # pid -> connection waiting for its exit status
+    connections = {}  # connection -> pid
+
+    while True:
+        readable, _, _ = select.select([listener, wakeup_r] + list(connections), [], [], 1.0)
+
+        # Exit when the grading process that owns us goes away
+        if os.getppid() != parent_pid:
+            for pid in children:
+                _kill_group(pid)
+            break
+
+        if wakeup_r in readable:
+            try:
+                while os.read(wakeup_r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+
+        # Reap finished children and report their status and resource use
+        while children:
+            try:
+                pid, status, rusage = os.wait4(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            # Kill anything the program left running in the background
+            _kill_group(pid)
+            conn = children.pop(pid, None)
+            if conn is None:
+                continue
+            connections.pop(conn, None)
+            max_rss, cpu_time = _rusage_stats(rusage)
+            _send(conn, {'returncode': os.waitstatus_to_exitcode(status),
+                         'max_rss': max_rss, 'cpu_time': cpu_time})
+            conn.close()
+
+        if listener in readable:
+            conn, _ = listener.accept()
+            try:
+                message, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+                request = json.loads(message)
+            except Exception as e:
+                _send(conn, {'error': str(e)})
+                conn.close()
+                continue
+
+            pid = os.fork()
+            if pid == 0:
+                listener.close()
+                _run_child(request, fds)  # never returns
+
+            for fd in fds:
+                os.close(fd)
+            children[pid] = conn
+            connections[conn] = pid
+            _send(conn, {'pid': pid})
+
+        # A client asking to kill its run (timeout) or disconnecting
+        for conn in readable:
+            if conn in connections:
+                pid = connections[conn]
+                data = conn.recv(64)
+                if not data or data.startswith(b'kill'):
+                    _kill_group(pid)
+                if not data:
+                    connections.pop(conn, None)
+
+    listener.close()
+
+
+def _send(conn, message):
+    """Send one JSON line, ignoring clients that have gone away."""
+    try:
+        conn.sendall(json.dumps(message).encode() + b'\n')
+    except OSError:
+        pass
+
+
+def _kill_group(pid):
+    """Kill a run and anything it started."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _run_child(request, fds):
+    """Become the student's program: wire up stdio and run the script as __main__."""
+    import builtins
+    import io
+    import traceback
+    import types
+
+    code = 1
+    try:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        os.setsid()
+        apply_resource_limits(request.get('limits') or {})
+
+        os.dup2(fds[0], 0)
+        os.dup2(fds[1], 1)
+        os.dup2(fds[2], 2)
+        os.closerange(3, 65536)
+
+        sys.stdin = io.TextIOWrapper(io.FileIO(0, 'r', closefd=False))
+        sys.stdout = io.TextIOWrapper(io.FileIO(1, 'w', closefd=False))
+        sys.stderr = io.TextIOWrapper(io.FileIO(2, 'w', closefd=False),
+                                      errors='backslashreplace', line_buffering=True)
+
+        path = request['path']
+        os.chdir(request['cwd'])
+        sys.argv = [path]
+        sys.path[0] = os.path.dirname(path)
+
+        # Same as running 'python path': a fresh __main__ module
+        main = types.ModuleType('__main__')
+        main.__file__ = path
+        main.__builtins__ = builtins
+        sys.modules['__main__'] = main
+
+        try:
+            with io.open_code(path) as f:
+                source = f.read()
+            exec(compile(source, path, 'exec', dont_inherit=True), main.__dict__)
+            code = 0
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            # Hide the engine's own frame so the traceback looks like a normal run
+            etype, value, tb = sys.exc_info()
+            while tb is not None and tb.tb_frame.f_code.co_filename != path:
+                tb = tb.tb_next
+            traceback.print_exception(etype, value, tb)
+            code = 1
+
+        # Normal interpreter shutdown: wait for threads, run atexit hooks
+        if 'threading' in sys.modules:
+            sys.modules['threading']._shutdown()
+        import atexit
+        atexit._run_exitfuncs()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        os._exit(code & 0xFF)
+
+
+if __name__ == '__main__' and len(sys.argv) == 4 and sys.argv[1] == '--serve':
+    _serve(sys.argv[2], int(sys.argv[3]))
@@ -0,0 +1,141 @@
+"""
+Fixture Server
+Local HTTP server for testers that need web pages to run a submission against.
+
+One ThreadingHTTPServer per grading process is started on first use, bound
+to port 0 (the OS picks a free port) on 127.0.0.1, and reused by every
+grading after that. The socket is listening before serve_forever() starts,
+so it can be used straight away without sleeping.
+
+Each run registers its own pages under a random token, so concurrent
+gradings never see each other's content:
+
+    with serve_pages({'/': '<title>Hello</title>'}) as site:
+        result = run_python(path, input=site.url('/') + '\n', timeout=10)
+
+A page is an HTML string, a (status, content_type, body) tuple, or DROP to
+close the connection without answering (a network error for the client).
+
+Only the legacy web scraper tester (module3_tester.py) uses it so far, so
+it is not one of the registry's TESTER_HELPERS: editing it doesn't
+invalidate cached results.
+"""
+
+import os
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Page value that makes the server hang up instead of responding
+DROP = object()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the pages registered for the token in the request path."""
+
+    def do_GET(self):
+        token, _, path = urlsplit(self.path).path.lstrip('/').partition('/')
+        page = self.server.lookup(token, '/' + path)
+        if page is None:
+            self.send_error(404)
+            return
+        if page is DROP:
+            self.close_connection = True
+            return
+
+        if isinstance(page, tuple):
+            status, content_type, body = page
+        else:
+            status, content_type, body = 200, 'text/html; charset=utf-8', page
+        body = body.encode() if isinstance(body, str) else body
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Suppress log messages."""
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """HTTP server holding the pages of every active run, by token."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FixtureHandler)
+        self._sites = {}
+        self._lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, name='fixture-server',
+                                       daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def register(self, pages):
+        """Add a run's pages; returns its token."""
+        token = secrets.token_hex(8)
+        with self._lock:
+            self._sites[token] = dict(pages)
+        return token
+
+    def unregister(self, token):
+        with self._lock:
+            self._sites.pop(token, None)
+
+    def lookup(self, token, path):
+        """The page registered for a token and path, or None."""
+        with self._lock:
+            pages = self._sites.get(token)
+        if pages is None:
+            return None
+        return pages.get(path)
+
+
+class FixtureSite:
+    """One run's pages on the shared server (a context manager that removes them)."""
+
+    def __init__(self, server, pages):
+        self.server = server
+        self.token = server.register(pages)
+
+    def url(self, path='/'):
+        """Full URL of one of this run's pages."""
+        return f'http://127.0.0.1:{self.server.port}/{self.token}{path}'
+
+    def close(self):
+        self.server.unregister(self.token)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+# Shared server, created lazily per process (forked workers need their own)
+_server = None
+_server_pid = None
+_server_lock = threading.Lock()
+
+
+def get_fixture_server():
+    """Get the process-wide fixture server, starting it on first use."""
+    global _server, _server_pid
+    with _server_lock:
+        if _server is None or _server_pid != os.getpid():
+            _server = FixtureServer()
+            _server_pid = os.getpid()
+        return _server
+
+
+def serve_pages(pages):
+    """Serve pages ({path: page}) for one run; use as a context manager."""
+    return FixtureSite(get_fixture_server(), pages)
@@ -8,6 +8,10 @@ import subprocess
 import sys
 import os
 
+from check_runner import Check, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
 
 class Module002Tester:
     def __init__(self, filepath):
@@ -59,11 +63,8 @@ class Module002Tester:
     def test_uses_input(self):
         """Test that the code uses input() to get user input."""
         try:
-            tree = ast.parse(self.code_content)
-            input_count = sum(1 for node in ast.walk(tree)
-                            if isinstance(node, ast.Call)
-                            and isinstance(node.func, ast.Name)
-                            and node.func.id == 'input')
+            code = analyze(self.code_content).require()
+            input_count = len(code.calls('input'))
 
             if input_count >= 2:
                 return {
@@ -93,11 +94,8 @@ class Module002Tester:
     def test_uses_len_function(self):
         """Test that the code uses the len() function."""
         try:
-            tree = ast.parse(self.code_content)
-            len_count = sum(1 for node in ast.walk(tree)
-                          if isinstance(node, ast.Call)
-                          and isinstance(node.func, ast.Name)
-                          and node.func.id == 'len')
+            code = analyze(self.code_content).require()
+            len_count = len(code.calls('len'))
 
             if len_count >= 1:
                 return {
@@ -127,11 +125,9 @@ class Module002Tester:
     def test_uses_concatenation(self):
         """Test that the code uses string concatenation with + operator."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
             # Look for BinOp with Add operator (the + operator)
-            concat_count = sum(1 for node in ast.walk(tree)
-                             if isinstance(node, ast.BinOp)
-                             and isinstance(node.op, ast.Add))
+            concat_count = len(code.ops(ast.BinOp, ast.Add))
 
             if concat_count >= 1:
                 return {
@@ -161,18 +157,17 @@ class Module002Tester:
     def test_uses_indexing(self):
         """Test that the code uses string indexing to access characters."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
             # Look for Subscript nodes (string[index])
             # We need to filter out slices, so check that the slice is just an Index or Constant
             indexing_count = 0
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Subscript):
-                    # In Python 3.9+, simple indexing uses node.slice directly
-                    # In older versions, it's wrapped in ast.Index
-                    if isinstance(node.slice, (ast.Constant, ast.Name, ast.UnaryOp)):
-                        indexing_count += 1
-                    elif isinstance(node.slice, ast.Index):  # Python 3.8 and earlier
-                        indexing_count += 1
+            for node in code.nodes(ast.Subscript):
+                # In Python 3.9+, simple indexing uses node.slice directly
+                # In older versions, it's wrapped in ast.Index
+                if isinstance(node.slice, (ast.Constant, ast.Name, ast.UnaryOp)):
+                    indexing_count += 1
+                elif isinstance(node.slice, ast.Index):  # Python 3.8 and earlier
+                    indexing_count += 1
 
             if indexing_count >= 1:
                 return {
@@ -202,11 +197,10 @@ class Module002Tester:
     def test_uses_slicing(self):
         """Test that the code uses string slicing."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
             # Look for Subscript nodes with Slice
-            slicing_count = sum(1 for node in ast.walk(tree)
-                              if isinstance(node, ast.Subscript)
-                              and isinstance(node.slice, ast.Slice))
+            slicing_count = sum(1 for node in code.nodes(ast.Subscript)
+                              if isinstance(node.slice, ast.Slice))
 
             if slicing_count >= 1:
                 return {
@@ -239,13 +233,7 @@ class Module002Tester:
             # Provide test input (2 strings as required)
             test_input = "Alice\nBoston\n"
 
-            result = subprocess.run(
-                [sys.executable, self.filepath],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.filepath, input=test_input, timeout=5)
 
             if result.returncode == 0:
                 self.output = result.stdout
@@ -306,24 +294,19 @@ class Module002Tester:
 
     def run_all_tests(self):
         """Run all tests and return results."""
-        test_methods = [
-            self.test_file_exists,
-            self.test_has_comments,
-            self.test_uses_input,
-            self.test_uses_len_function,
-            self.test_uses_concatenation,
-            self.test_uses_indexing,
-            self.test_uses_slicing,
-            self.test_code_runs_without_errors,
-            self.test_produces_output
-        ]
-
-        for test_method in test_methods:
-            result = test_method()
-            self.tests.append(result)
-            # If a critical test fails, stop testing
-            if not result['passed'] and test_method in [self.test_file_exists, self.test_code_runs_without_errors]:
-                break
+        # Checks run concurrently; a failed critical check stops the ones after it
+        results = run_checks([
+            Check(self.test_file_exists, critical=True),
+            Check(self.test_has_comments),
+            Check(self.test_uses_input),
+            Check(self.test_uses_len_function),
+            Check(self.test_uses_concatenation),
+            Check(self.test_uses_indexing),
+            Check(self.test_uses_slicing),
+            Check(self.test_code_runs_without_errors, critical=True),
+            Check(self.test_produces_output)
+        ])
+        self.tests.extend(results)
 
         passed_count = sum(1 for test in self.tests if test['passed'])
         total_count = len(self.tests)
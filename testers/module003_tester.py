@@ -8,6 +8,10 @@ import subprocess
 import sys
 import os
 
+from check_runner import Check, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
 
 class Module003Tester:
     def __init__(self, filepath):
@@ -59,11 +63,8 @@ class Module003Tester:
     def test_uses_input(self):
         """Test that the code uses input() to get user input."""
         try:
-            tree = ast.parse(self.code_content)
-            input_count = sum(1 for node in ast.walk(tree)
-                            if isinstance(node, ast.Call)
-                            and isinstance(node.func, ast.Name)
-                            and node.func.id == 'input')
+            code = analyze(self.code_content).require()
+            input_count = len(code.calls('input'))
 
             if input_count >= 3:
                 return {
@@ -93,14 +94,11 @@ class Module003Tester:
     def test_uses_type_conversion(self):
         """Test that the code uses type conversion functions (int, float, str)."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
             conversion_functions = {'int', 'float', 'str'}
             found_conversions = set()
 
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                    if node.func.id in conversion_functions:
-                        found_conversions.add(node.func.id)
+            found_conversions = conversion_functions & code.called_names()
 
             if len(found_conversions) >= 2:
                 return {
@@ -130,11 +128,8 @@ class Module003Tester:
     def test_uses_type_function(self):
         """Test that the code uses the type() function."""
         try:
-            tree = ast.parse(self.code_content)
-            type_count = sum(1 for node in ast.walk(tree)
-                           if isinstance(node, ast.Call)
-                           and isinstance(node.func, ast.Name)
-                           and node.func.id == 'type')
+            code = analyze(self.code_content).require()
+            type_count = len(code.calls('type'))
 
             if type_count >= 2:
                 return {
@@ -164,14 +159,13 @@ class Module003Tester:
     def test_has_proper_variable_names(self):
         """Test that the code uses descriptive variable names with snake_case."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
             variable_names = []
 
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(target, ast.Name):
-                            variable_names.append(target.id)
+            for node in code.nodes(ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        variable_names.append(target.id)
 
             # Filter out single-letter variables and check for snake_case patterns
             descriptive_vars = [v for v in variable_names if len(v) > 2 and '_' in v]
@@ -204,10 +198,9 @@ class Module003Tester:
     def test_performs_calculations(self):
         """Test that the code performs calculations (addition, subtraction, etc.)."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
             # Look for BinOp operations (arithmetic operations)
-            calc_count = sum(1 for node in ast.walk(tree)
-                           if isinstance(node, ast.BinOp))
+            calc_count = code.count(ast.BinOp)
 
             if calc_count >= 2:
                 return {
@@ -240,13 +233,7 @@ class Module003Tester:
             # Provide test input (name, age, height, student status)
             test_input = "Alice\n25\n1.65\nyes\n"
 
-            result = subprocess.run(
-                [sys.executable, self.filepath],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.filepath, input=test_input, timeout=5)
 
             if result.returncode == 0:
                 self.output = result.stdout
@@ -315,24 +302,19 @@ class Module003Tester:
 
     def run_all_tests(self):
         """Run all tests and return results."""
-        test_methods = [
-            self.test_file_exists,
-            self.test_has_comments,
-            self.test_uses_input,
-            self.test_uses_type_conversion,
-            self.test_uses_type_function,
-            self.test_has_proper_variable_names,
-            self.test_performs_calculations,
-            self.test_code_runs_without_errors,
-            self.test_produces_output
-        ]
-
-        for test_method in test_methods:
-            result = test_method()
-            self.tests.append(result)
-            # If a critical test fails, stop testing
-            if not result['passed'] and test_method in [self.test_file_exists, self.test_code_runs_without_errors]:
-                break
+        # Checks run concurrently; a failed critical check stops the ones after it
+        results = run_checks([
+            Check(self.test_file_exists, critical=True),
+            Check(self.test_has_comments),
+            Check(self.test_uses_input),
+            Check(self.test_uses_type_conversion),
+            Check(self.test_uses_type_function),
+            Check(self.test_has_proper_variable_names),
+            Check(self.test_performs_calculations),
+            Check(self.test_code_runs_without_errors, critical=True),
+            Check(self.test_produces_output)
+        ])
+        self.tests.extend(results)
 
         passed_count = sum(1 for test in self.tests if test['passed'])
         total_count = len(self.tests)
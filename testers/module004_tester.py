@@ -8,6 +8,10 @@ import subprocess
 import sys
 import os
 
+from check_runner import Check, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
 
 class Module004Tester:
     def __init__(self, filepath):
@@ -59,11 +63,8 @@ class Module004Tester:
     def test_uses_input(self):
         """Test that the code uses input() to get user input."""
         try:
-            tree = ast.parse(self.code_content)
-            input_count = sum(1 for node in ast.walk(tree)
-                            if isinstance(node, ast.Call)
-                            and isinstance(node.func, ast.Name)
-                            and node.func.id == 'input')
+            code = analyze(self.code_content).require()
+            input_count = len(code.calls('input'))
 
             if input_count >= 2:
                 return {
@@ -93,14 +94,9 @@ class Module004Tester:
     def test_uses_arithmetic_operators(self):
         """Test that the code uses multiple arithmetic operators."""
         try:
-            tree = ast.parse(self.code_content)
-            operators_found = set()
-
+            code = analyze(self.code_content).require()
             # Look for binary operations
-            for node in ast.walk(tree):
-                if isinstance(node, ast.BinOp):
-                    op_type = type(node.op).__name__
-                    operators_found.add(op_type)
+            operators_found = code.op_types(ast.BinOp)
 
             # Check for various operators: Add, Sub, Mult, Div, FloorDiv, Mod, Pow
             required_operators = {'Add', 'Sub', 'Mult', 'Div'}
@@ -134,12 +130,8 @@ class Module004Tester:
     def test_uses_comparison_operators(self):
         """Test that the code uses comparison operators."""
         try:
-            tree = ast.parse(self.code_content)
-            comparison_count = 0
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Compare):
-                    comparison_count += 1
+            code = analyze(self.code_content).require()
+            comparison_count = code.count(ast.Compare)
 
             if comparison_count >= 2:
                 return {
@@ -169,10 +161,8 @@ class Module004Tester:
     def test_uses_modulus_operator(self):
         """Test that the code uses the modulus (%) operator."""
         try:
-            tree = ast.parse(self.code_content)
-            mod_count = sum(1 for node in ast.walk(tree)
-                          if isinstance(node, ast.BinOp)
-                          and isinstance(node.op, ast.Mod))
+            code = analyze(self.code_content).require()
+            mod_count = len(code.ops(ast.BinOp, ast.Mod))
 
             if mod_count >= 1:
                 return {
@@ -202,10 +192,8 @@ class Module004Tester:
     def test_uses_floor_division(self):
         """Test that the code uses floor division (//) operator."""
         try:
-            tree = ast.parse(self.code_content)
-            floordiv_count = sum(1 for node in ast.walk(tree)
-                                if isinstance(node, ast.BinOp)
-                                and isinstance(node.op, ast.FloorDiv))
+            code = analyze(self.code_content).require()
+            floordiv_count = len(code.ops(ast.BinOp, ast.FloorDiv))
 
             if floordiv_count >= 1:
                 return {
@@ -235,9 +223,8 @@ class Module004Tester:
     def test_uses_compound_assignment(self):
         """Test that the code uses compound assignment operators (+=, -=, etc.)."""
         try:
-            tree = ast.parse(self.code_content)
-            aug_assign_count = sum(1 for node in ast.walk(tree)
-                                 if isinstance(node, ast.AugAssign))
+            code = analyze(self.code_content).require()
+            aug_assign_count = code.count(ast.AugAssign)
 
             if aug_assign_count >= 2:
                 return {
@@ -270,13 +257,7 @@ class Module004Tester:
             # Provide test input (two numbers)
             test_input = "10\n5\n"
 
-            result = subprocess.run(
-                [sys.executable, self.filepath],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.filepath, input=test_input, timeout=5)
 
             if result.returncode == 0:
                 self.output = result.stdout
@@ -347,25 +328,20 @@ class Module004Tester:
 
     def run_all_tests(self):
         """Run all tests and return results."""
-        test_methods = [
-            self.test_file_exists,
-            self.test_has_comments,
-            self.test_uses_input,
-            self.test_uses_arithmetic_operators,
-            self.test_uses_comparison_operators,
-            self.test_uses_modulus_operator,
-            self.test_uses_floor_division,
-            self.test_uses_compound_assignment,
-            self.test_code_runs_without_errors,
-            self.test_produces_comprehensive_output
-        ]
-
-        for test_method in test_methods:
-            result = test_method()
-            self.tests.append(result)
-            # If a critical test fails, stop testing
-            if not result['passed'] and test_method in [self.test_file_exists, self.test_code_runs_without_errors]:
-                break
+        # Checks run concurrently; a failed critical check stops the ones after it
+        results = run_checks([
+            Check(self.test_file_exists, critical=True),
+            Check(self.test_has_comments),
+            Check(self.test_uses_input),
+            Check(self.test_uses_arithmetic_operators),
+            Check(self.test_uses_comparison_operators),
+            Check(self.test_uses_modulus_operator),
+            Check(self.test_uses_floor_division),
+            Check(self.test_uses_compound_assignment),
+            Check(self.test_code_runs_without_errors, critical=True),
+            Check(self.test_produces_comprehensive_output)
+        ])
+        self.tests.extend(results)
 
         passed_count = sum(1 for test in self.tests if test['passed'])
         total_count = len(self.tests)
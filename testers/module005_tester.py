@@ -9,6 +9,10 @@ import sys
 import os
 import re
 
+from check_runner import Check, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
 
 class Module005Tester:
     def __init__(self, filepath):
@@ -61,11 +65,8 @@ class Module005Tester:
     def test_uses_input(self):
         """Test that the code uses input() at least 3 times."""
         try:
-            tree = ast.parse(self.code_content)
-            input_count = sum(1 for node in ast.walk(tree)
-                            if isinstance(node, ast.Call)
-                            and isinstance(node.func, ast.Name)
-                            and node.func.id == 'input')
+            code = analyze(self.code_content).require()
+            input_count = len(code.calls('input'))
 
             if input_count >= 3:
                 return {
@@ -95,13 +96,8 @@ class Module005Tester:
     def test_uses_type_conversion(self):
         """Test that the code uses type conversion functions."""
         try:
-            tree = ast.parse(self.code_content)
-            conversions = {'int': 0, 'float': 0, 'str': 0}
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                    if node.func.id in conversions:
-                        conversions[node.func.id] += 1
+            code = analyze(self.code_content).require()
+            conversions = {name: len(code.calls(name)) for name in ('int', 'float', 'str')}
 
             # Need at least int() and float()
             has_int = conversions['int'] > 0
@@ -136,9 +132,8 @@ class Module005Tester:
     def test_uses_fstrings(self):
         """Test that the code uses f-strings for formatting."""
         try:
-            tree = ast.parse(self.code_content)
-            fstring_count = sum(1 for node in ast.walk(tree)
-                              if isinstance(node, ast.JoinedStr))
+            code = analyze(self.code_content).require()
+            fstring_count = code.count(ast.JoinedStr)
 
             if fstring_count >= 3:
                 return {
@@ -171,13 +166,7 @@ class Module005Tester:
             # Provide test input: bill=100, tip=15%, people=4
             test_input = "100\n15\n4\n"
 
-            result = subprocess.run(
-                [sys.executable, self.filepath],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.filepath, input=test_input, timeout=5)
 
             if result.returncode == 0:
                 self.output = result.stdout
@@ -342,13 +331,7 @@ class Module005Tester:
             # Test with different values: bill=50.75, tip=20%, people=2
             test_input = "50.75\n20\n2\n"
 
-            result = subprocess.run(
-                [sys.executable, self.filepath],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.filepath, input=test_input, timeout=5)
 
             if result.returncode == 0:
                 output = result.stdout
@@ -394,25 +377,20 @@ class Module005Tester:
 
     def run_all_tests(self):
         """Run all tests and return results."""
-        test_methods = [
-            self.test_file_exists,
-            self.test_has_comments,
-            self.test_uses_input,
-            self.test_uses_type_conversion,
-            self.test_uses_fstrings,
-            self.test_code_runs_without_errors,
-            self.test_calculates_tip_correctly,
-            self.test_formats_money_properly,
-            self.test_displays_comprehensive_output,
-            self.test_handles_different_inputs
-        ]
-
-        for test_method in test_methods:
-            result = test_method()
-            self.tests.append(result)
-            # If a critical test fails, stop testing
-            if not result['passed'] and test_method in [self.test_file_exists, self.test_code_runs_without_errors]:
-                break
+        # Checks run concurrently; a failed critical check stops the ones after it
+        results = run_checks([
+            Check(self.test_file_exists, critical=True),
+            Check(self.test_has_comments),
+            Check(self.test_uses_input),
+            Check(self.test_uses_type_conversion),
+            Check(self.test_uses_fstrings),
+            Check(self.test_code_runs_without_errors, critical=True),
+            Check(self.test_calculates_tip_correctly),
+            Check(self.test_formats_money_properly),
+            Check(self.test_displays_comprehensive_output),
+            Check(self.test_handles_different_inputs)
+        ])
+        self.tests.extend(results)
 
         passed_count = sum(1 for test in self.tests if test['passed'])
         total_count = len(self.tests)
@@ -9,6 +9,10 @@ import sys
 import os
 import re
 
+from check_runner import Check, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
 
 class Module006Tester:
     def __init__(self, filepath):
@@ -61,11 +65,8 @@ class Module006Tester:
     def test_uses_input(self):
         """Test that the code uses input() for user choices."""
         try:
-            tree = ast.parse(self.code_content)
-            input_count = sum(1 for node in ast.walk(tree)
-                            if isinstance(node, ast.Call)
-                            and isinstance(node.func, ast.Name)
-                            and node.func.id == 'input')
+            code = analyze(self.code_content).require()
+            input_count = len(code.calls('input'))
 
             if input_count >= 3:
                 return {
@@ -95,8 +96,8 @@ class Module006Tester:
     def test_has_if_statements(self):
         """Test that the code uses if statements."""
         try:
-            tree = ast.parse(self.code_content)
-            if_count = sum(1 for node in ast.walk(tree) if isinstance(node, ast.If))
+            code = analyze(self.code_content).require()
+            if_count = code.count(ast.If)
 
             if if_count >= 6:
                 return {
@@ -126,19 +127,10 @@ class Module006Tester:
     def test_has_nested_conditionals(self):
         """Test that the code uses nested if statements."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
 
             # Find if statements that contain other if statements
-            nested_found = False
-            for node in ast.walk(tree):
-                if isinstance(node, ast.If):
-                    # Check if this if statement contains another if in its body
-                    for child in ast.walk(node):
-                        if child != node and isinstance(child, ast.If):
-                            nested_found = True
-                            break
-                if nested_found:
-                    break
+            nested_found = code.has_nested_if()
 
             if nested_found:
                 return {
@@ -168,18 +160,11 @@ class Module006Tester:
     def test_uses_logical_operators(self):
         """Test that the code uses logical operators (and/or)."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
 
             # Look for BoolOp nodes (and, or)
-            has_and = False
-            has_or = False
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.BoolOp):
-                    if isinstance(node.op, ast.And):
-                        has_and = True
-                    elif isinstance(node.op, ast.Or):
-                        has_or = True
+            has_and = bool(code.ops(ast.BoolOp, ast.And))
+            has_or = bool(code.ops(ast.BoolOp, ast.Or))
 
             if has_and or has_or:
                 ops_used = []
@@ -214,19 +199,13 @@ class Module006Tester:
     def test_uses_fstrings_or_format(self):
         """Test that the code uses f-strings or format for output."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
 
             # Count f-strings (JoinedStr nodes)
-            fstring_count = sum(1 for node in ast.walk(tree)
-                              if isinstance(node, ast.JoinedStr))
+            fstring_count = code.count(ast.JoinedStr)
 
             # Also check for .format() calls
-            format_count = 0
-            for node in ast.walk(tree):
-                if (isinstance(node, ast.Call) and
-                    isinstance(node.func, ast.Attribute) and
-                    node.func.attr == 'format'):
-                    format_count += 1
+            format_count = len(code.method_calls('format'))
 
             total_formatting = fstring_count + format_count
 
@@ -268,13 +247,7 @@ class Module006Tester:
             # Provide generic inputs that should work for most adventure games
             test_input = "TestPlayer\nleft\nopen\n"
 
-            result = subprocess.run(
-                [sys.executable, self.filepath],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.filepath, input=test_input, timeout=5)
 
             if result.returncode == 0:
                 self.test_outputs.append(('path1', result.stdout))
@@ -307,13 +280,7 @@ class Module006Tester:
         try:
             test_input = "TestPlayer\nright\nyes\n"
 
-            result = subprocess.run(
-                [sys.executable, self.filepath],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.filepath, input=test_input, timeout=5)
 
             if result.returncode == 0:
                 self.test_outputs.append(('path2', result.stdout))
@@ -351,8 +318,10 @@ class Module006Tester:
                     'message': 'Cannot test - not enough successful runs.'
                 }
 
-            path1_output = self.test_outputs[0][1]
-            path2_output = self.test_outputs[1][1]
+            # Paths may finish in either order when checks run concurrently
+            outputs = sorted(self.test_outputs)
+            path1_output = outputs[0][1]
+            path2_output = outputs[1][1]
 
             # Remove the character name from comparison (since it's the same)
             path1_clean = path1_output.replace('TestPlayer', '').lower()
@@ -390,7 +359,7 @@ class Module006Tester:
                     'message': 'Cannot test - program did not run successfully.'
                 }
 
-            output = self.test_outputs[0][1]
+            output = sorted(self.test_outputs)[0][1]
 
             if 'TestPlayer' in output:
                 return {
@@ -414,21 +383,20 @@ class Module006Tester:
     def test_has_numeric_comparison(self):
         """Test that code includes at least one numeric comparison."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
 
             # Look for comparisons involving numbers or numeric operations
             has_numeric_comparison = False
 
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Compare):
-                    # Check if left side or any comparator involves a number or numeric variable
-                    if isinstance(node.left, (ast.Num, ast.Constant)):
+            for node in code.nodes(ast.Compare):
+                # Check if left side or any comparator involves a number or numeric variable
+                if isinstance(node.left, (ast.Num, ast.Constant)):
+                    has_numeric_comparison = True
+                    break
+                for comp in node.comparators:
+                    if isinstance(comp, (ast.Num, ast.Constant)):
                         has_numeric_comparison = True
                         break
-                    for comp in node.comparators:
-                        if isinstance(comp, (ast.Num, ast.Constant)):
-                            has_numeric_comparison = True
-                            break
                 if has_numeric_comparison:
                     break
 
@@ -459,27 +427,24 @@ class Module006Tester:
 
     def run_all_tests(self):
         """Run all tests and return results."""
-        test_methods = [
-            self.test_file_exists,
-            self.test_has_comments,
-            self.test_uses_input,
-            self.test_has_if_statements,
-            self.test_has_nested_conditionals,
-            self.test_uses_logical_operators,
-            self.test_uses_fstrings_or_format,
-            self.test_code_runs_path1,
-            self.test_code_runs_path2,
-            self.test_different_outputs,
-            self.test_uses_character_name,
-            self.test_has_numeric_comparison
-        ]
-
-        for test_method in test_methods:
-            result = test_method()
-            self.tests.append(result)
-            # If file doesn't exist, stop testing
-            if not result['passed'] and test_method == self.test_file_exists:
-                break
+        # Checks run concurrently; a failed critical check stops the ones after it
+        results = run_checks([
+            Check(self.test_file_exists, critical=True),
+            Check(self.test_has_comments),
+            Check(self.test_uses_input),
+            Check(self.test_has_if_statements),
+            Check(self.test_has_nested_conditionals),
+            Check(self.test_uses_logical_operators),
+            Check(self.test_uses_fstrings_or_format),
+            Check(self.test_code_runs_path1),
+            Check(self.test_code_runs_path2),
+            Check(self.test_different_outputs,
+                  depends_on=[self.test_code_runs_path1, self.test_code_runs_path2]),
+            Check(self.test_uses_character_name,
+                  depends_on=[self.test_code_runs_path1, self.test_code_runs_path2]),
+            Check(self.test_has_numeric_comparison)
+        ])
+        self.tests.extend(results)
 
         passed_count = sum(1 for test in self.tests if test['passed'])
         total_count = len(self.tests)
@@ -9,6 +9,10 @@ import sys
 import os
 import re
 
+from check_runner import Check, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
 
 class Module007Tester:
     def __init__(self, filepath):
@@ -61,8 +65,8 @@ class Module007Tester:
     def test_has_while_loop(self):
         """Test that the code uses a while loop."""
         try:
-            tree = ast.parse(self.code_content)
-            while_count = sum(1 for node in ast.walk(tree) if isinstance(node, ast.While))
+            code = analyze(self.code_content).require()
+            while_count = code.count(ast.While)
 
             if while_count >= 1:
                 return {
@@ -92,16 +96,13 @@ class Module007Tester:
     def test_has_for_loop_or_range(self):
         """Test that the code uses a for loop or range()."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
 
             # Check for for loops
-            for_count = sum(1 for node in ast.walk(tree) if isinstance(node, ast.For))
+            for_count = code.count(ast.For)
 
             # Check for range() calls
-            range_count = sum(1 for node in ast.walk(tree)
-                            if isinstance(node, ast.Call)
-                            and isinstance(node.func, ast.Name)
-                            and node.func.id == 'range')
+            range_count = len(code.calls('range'))
 
             if for_count >= 1 or range_count >= 1:
                 return {
@@ -131,8 +132,8 @@ class Module007Tester:
     def test_has_break_statement(self):
         """Test that the code uses break statement."""
         try:
-            tree = ast.parse(self.code_content)
-            break_count = sum(1 for node in ast.walk(tree) if isinstance(node, ast.Break))
+            code = analyze(self.code_content).require()
+            break_count = code.count(ast.Break)
 
             if break_count >= 1:
                 return {
@@ -162,16 +163,15 @@ class Module007Tester:
     def test_has_score_tracking(self):
         """Test that the code tracks scores with variables."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
 
             # Look for variable assignments that might be score tracking
             score_related_vars = []
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Name):
-                    var_name = node.id.lower()
-                    if any(keyword in var_name for keyword in ['score', 'round', 'won', 'win', 'count', 'played']):
-                        if var_name not in score_related_vars:
-                            score_related_vars.append(var_name)
+            for node in code.nodes(ast.Name):
+                var_name = node.id.lower()
+                if any(keyword in var_name for keyword in ['score', 'round', 'won', 'win', 'count', 'played']):
+                    if var_name not in score_related_vars:
+                        score_related_vars.append(var_name)
 
             if len(score_related_vars) >= 2:
                 return {
@@ -228,10 +228,10 @@ class Module007Tester:
     def test_has_comparison_operators(self):
         """Test that the code uses comparison operators for guessing logic."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
 
             # Count comparison operators
-            comparison_count = sum(1 for node in ast.walk(tree) if isinstance(node, ast.Compare))
+            comparison_count = code.count(ast.Compare)
 
             if comparison_count >= 5:
                 return {
@@ -265,13 +265,7 @@ class Module007Tester:
             # This avoids needing to guess correctly
             test_input = "50\nno\n"
 
-            result = subprocess.run(
-                [sys.executable, self.filepath],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.filepath, input=test_input, timeout=5)
 
             if result.returncode == 0:
                 self.test_outputs.append(('basic', result.stdout))
@@ -379,15 +373,13 @@ class Module007Tester:
     def test_has_proper_structure(self):
         """Test that code has proper structure with variables and loops."""
         try:
-            tree = ast.parse(self.code_content)
+            code = analyze(self.code_content).require()
 
             # Count assignments (for variables)
-            assignment_count = sum(1 for node in ast.walk(tree)
-                                 if isinstance(node, (ast.Assign, ast.AugAssign)))
+            assignment_count = code.count(ast.Assign, ast.AugAssign)
 
             # Count loops
-            loop_count = sum(1 for node in ast.walk(tree)
-                           if isinstance(node, (ast.While, ast.For)))
+            loop_count = code.count(ast.While, ast.For)
 
             if assignment_count >= 5 and loop_count >= 2:
                 return {
@@ -416,27 +408,22 @@ class Module007Tester:
 
     def run_all_tests(self):
         """Run all tests and return results."""
-        test_methods = [
-            self.test_file_exists,
-            self.test_has_comments,
-            self.test_has_while_loop,
-            self.test_has_for_loop_or_range,
-            self.test_has_break_statement,
-            self.test_has_score_tracking,
-            self.test_uses_input_validation,
-            self.test_has_comparison_operators,
-            self.test_has_proper_structure,
-            self.test_code_runs_basic,
-            self.test_provides_feedback,
-            self.test_shows_final_stats
-        ]
-
-        for test_method in test_methods:
-            result = test_method()
-            self.tests.append(result)
-            # If file doesn't exist, stop testing
-            if not result['passed'] and test_method == self.test_file_exists:
-                break
+        # Checks run concurrently; a failed critical check stops the ones after it
+        results = run_checks([
+            Check(self.test_file_exists, critical=True),
+            Check(self.test_has_comments),
+            Check(self.test_has_while_loop),
+            Check(self.test_has_for_loop_or_range),
+            Check(self.test_has_break_statement),
+            Check(self.test_has_score_tracking),
+            Check(self.test_uses_input_validation),
+            Check(self.test_has_comparison_operators),
+            Check(self.test_has_proper_structure),
+            Check(self.test_code_runs_basic),
+            Check(self.test_provides_feedback, depends_on=[self.test_code_runs_basic]),
+            Check(self.test_shows_final_stats, depends_on=[self.test_code_runs_basic])
+        ])
+        self.tests.extend(results)
 
         passed_count = sum(1 for test in self.tests if test['passed'])
         total_count = len(self.tests)
@@ -11,6 +11,18 @@ import ast
 import tempfile
 import shutil
 
+from check_runner import Check, ScenarioRuns, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
+
+# (input, description) for the robustness check
+BAD_INPUT_CASES = [
+    ("xyz\n*\n5\n", "invalid first number"),
+    ("10\n-\nabc\n", "invalid second number"),
+    ("5.5\n+\n2.3\n", "float inputs"),
+]
+
 
 class Module8Tester:
     def __init__(self, submission_path):
@@ -42,10 +54,10 @@ class Module8Tester:
             with open(self.submission_path, 'r') as f:
                 code = f.read()
 
-            tree = ast.parse(code)
+            analysis = analyze(code).require()
 
             # Look for Try nodes in the AST
-            try_blocks = [node for node in ast.walk(tree) if isinstance(node, ast.Try)]
+            try_blocks = analysis.nodes(ast.Try)
 
             if len(try_blocks) >= 1:
                 self.tests.append({
@@ -73,13 +85,7 @@ class Module8Tester:
         """Test 3: Test valid addition calculation"""
         test_input = "5\n+\n3\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -117,13 +123,7 @@ class Module8Tester:
         """Test 4: Test valid division calculation"""
         test_input = "10\n/\n2\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -161,13 +161,7 @@ class Module8Tester:
         """Test 5: Test handling of invalid number input (ValueError)"""
         test_input = "abc\n+\n5\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             # Program should not crash (returncode should be 0 for graceful handling)
             # Or it might exit with error but shouldn't raise unhandled exception
@@ -204,13 +198,7 @@ class Module8Tester:
         """Test 6: Test handling of division by zero (ZeroDivisionError)"""
         test_input = "10\n/\n0\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
             error_output = result.stderr.lower()
@@ -265,14 +253,7 @@ class Module8Tester:
 
             # Run the program from temp directory
             test_input = "5\n+\n3\n"
-            result = subprocess.run(
-                [sys.executable, temp_submission],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                cwd=temp_dir
-            )
+            result = run_python(temp_submission, input=test_input, timeout=5, cwd=temp_dir)
 
             # Check if log file was created
             log_file = os.path.join(temp_dir, 'calculator_log.txt')
@@ -325,10 +306,10 @@ class Module8Tester:
             with open(self.submission_path, 'r') as f:
                 code = f.read()
 
-            tree = ast.parse(code)
+            analysis = analyze(code).require()
 
             # Look for Try nodes
-            try_blocks = [node for node in ast.walk(tree) if isinstance(node, ast.Try)]
+            try_blocks = analysis.nodes(ast.Try)
 
             has_specific_handler = False
             has_bare_except = False
@@ -373,24 +354,12 @@ class Module8Tester:
 
     def test_no_crash_multiple_errors(self):
         """Test 9: Ensure program doesn't crash with various bad inputs"""
-        test_cases = [
-            ("xyz\n*\n5\n", "invalid first number"),
-            ("10\n-\nabc\n", "invalid second number"),
-            ("5.5\n+\n2.3\n", "float inputs"),
-        ]
-
         all_passed = True
         messages = []
 
-        for test_input, description in test_cases:
+        for test_input, description in BAD_INPUT_CASES:
             try:
-                result = subprocess.run(
-                    [sys.executable, self.submission_path],
-                    input=test_input,
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
+                result = self.bad_input_runs.result(test_input)
 
                 if 'traceback' in result.stderr.lower() and result.returncode != 0:
                     all_passed = False
@@ -423,16 +392,24 @@ class Module8Tester:
         print(f"Testing Module 8: Safe Calculator with Logging")
         print(f"{'='*60}\n")
 
-        # Run all tests
-        self.test_file_exists()
-        self.test_try_except_exists()
-        self.test_valid_addition()
-        self.test_valid_division()
-        self.test_invalid_number_input()
-        self.test_division_by_zero()
-        self.test_log_file_creation()
-        self.test_specific_exception_handling()
-        self.test_no_crash_multiple_errors()
+        # Each bad input is a run of its own, so they run concurrently too
+        self.bad_input_runs = ScenarioRuns(
+            lambda test_input: run_python(self.submission_path, input=test_input, timeout=5),
+            [test_input for test_input, description in BAD_INPUT_CASES])
+
+        # Run all tests (concurrently; results keep this order)
+        run_checks([
+            self.test_file_exists,
+            self.test_try_except_exists,
+            self.test_valid_addition,
+            self.test_valid_division,
+            self.test_invalid_number_input,
+            self.test_division_by_zero,
+            self.test_log_file_creation,
+            self.test_specific_exception_handling,
+            *self.bad_input_runs.runs,
+            Check(self.test_no_crash_multiple_errors, depends_on=self.bad_input_runs.runs)
+        ], owner=self)
 
         # Calculate score
         total_tests = len(self.tests)
@@ -7,7 +7,24 @@ Tests student submissions for nested if/elif/else statements.
 import subprocess
 import sys
 import os
-import ast
+
+from check_runner import Check, ScenarioRuns, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
+
+# (input, expected price, description) for the multi-scenario checks
+CASE_INSENSITIVE_CASES = [
+    ("VIP\n12\nWEEKEND\n", "80", "VIP adult weekend uppercase"),
+    ("Vip\n50\nWeekday\n", "60", "VIP adult weekday mixed case"),
+]
+
+EDGE_CASES = [
+    ("vip\n11\nweekday\n", "30", "VIP child age 11 (< 12)"),
+    ("vip\n12\nweekday\n", "60", "VIP adult age 12 (>= 12)"),
+    ("regular\n64\nweekend\n", "40", "Regular adult age 64 (< 65)"),
+    ("regular\n65\nweekend\n", "20", "Regular senior age 65 (>= 65)"),
+]
 
 
 class Module9Tester:
@@ -40,27 +57,8 @@ class Module9Tester:
             with open(self.submission_path, 'r') as f:
                 code = f.read()
 
-            tree = ast.parse(code)
-
-            # Look for nested If nodes in the AST
-            def has_nested_if_in_node(node, depth=0):
-                if isinstance(node, ast.If):
-                    # Check if this If has another If in its body or orelse
-                    for child in ast.iter_child_nodes(node):
-                        if isinstance(child, ast.If):
-                            return True
-                        for grandchild in ast.walk(child):
-                            if isinstance(grandchild, ast.If) and grandchild != node:
-                                return True
-                return False
-
-            # Walk through all nodes to find nested ifs
-            nested_found = False
-            for node in ast.walk(tree):
-                if isinstance(node, ast.If):
-                    if has_nested_if_in_node(node):
-                        nested_found = True
-                        break
+            # Look for an If node inside another If's body or orelse
+            nested_found = analyze(code).require().has_nested_if()
 
             if nested_found:
                 self.tests.append({
@@ -88,13 +86,7 @@ class Module9Tester:
         """Test 3: VIP child on weekend should be $40"""
         test_input = "vip\n8\nweekend\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -132,13 +124,7 @@ class Module9Tester:
         """Test 4: VIP adult on weekday should be $60"""
         test_input = "VIP\n30\nweekday\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -175,13 +161,7 @@ class Module9Tester:
         """Test 5: VIP senior on weekend should be $40"""
         test_input = "vip\n70\nweekend\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -218,13 +198,7 @@ class Module9Tester:
         """Test 6: Regular child on weekday should be $15"""
         test_input = "regular\n10\nweekday\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -261,13 +235,7 @@ class Module9Tester:
         """Test 7: Regular adult on weekend should be $40"""
         test_input = "REGULAR\n25\nWEEKEND\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -304,13 +272,7 @@ class Module9Tester:
         """Test 8: Regular senior on weekday should be $15"""
         test_input = "regular\n65\nweekday\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -345,23 +307,12 @@ class Module9Tester:
 
     def test_case_insensitive(self):
         """Test 9: Check that inputs are case-insensitive"""
-        test_cases = [
-            ("VIP\n12\nWEEKEND\n", "80", "VIP adult weekend uppercase"),
-            ("Vip\n50\nWeekday\n", "60", "VIP adult weekday mixed case"),
-        ]
-
         all_passed = True
         messages = []
 
-        for test_input, expected, description in test_cases:
+        for test_input, expected, description in CASE_INSENSITIVE_CASES:
             try:
-                result = subprocess.run(
-                    [sys.executable, self.submission_path],
-                    input=test_input,
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
+                result = self.case_runs.result(test_input)
 
                 if expected not in result.stdout:
                     all_passed = False
@@ -387,25 +338,12 @@ class Module9Tester:
 
     def test_edge_cases(self):
         """Test 10: Test edge cases (age boundaries)"""
-        test_cases = [
-            ("vip\n11\nweekday\n", "30", "VIP child age 11 (< 12)"),
-            ("vip\n12\nweekday\n", "60", "VIP adult age 12 (>= 12)"),
-            ("regular\n64\nweekend\n", "40", "Regular adult age 64 (< 65)"),
-            ("regular\n65\nweekend\n", "20", "Regular senior age 65 (>= 65)"),
-        ]
-
         all_passed = True
         messages = []
 
-        for test_input, expected, description in test_cases:
+        for test_input, expected, description in EDGE_CASES:
             try:
-                result = subprocess.run(
-                    [sys.executable, self.submission_path],
-                    input=test_input,
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
+                result = self.edge_runs.result(test_input)
 
                 if expected not in result.stdout:
                     all_passed = False
@@ -429,23 +367,36 @@ class Module9Tester:
             })
             return False
 
+    def _scenario_runs(self, cases):
+        """A run of the submission for each case's input."""
+        return ScenarioRuns(lambda test_input: run_python(self.submission_path, input=test_input, timeout=5),
+                            [test_input for test_input, expected, description in cases])
+
     def run_all_tests(self):
         """Run all tests and calculate score"""
         print(f"\n{'='*60}")
         print(f"Testing Module 9: Amusement Park Ticket System")
         print(f"{'='*60}\n")
 
-        # Run all tests
-        self.test_file_exists()
-        self.test_has_nested_if()
-        self.test_vip_child_weekend()
-        self.test_vip_adult_weekday()
-        self.test_vip_senior_weekend()
-        self.test_regular_child_weekday()
-        self.test_regular_adult_weekend()
-        self.test_regular_senior_weekday()
-        self.test_case_insensitive()
-        self.test_edge_cases()
+        # Each scenario of the multi-scenario checks is a run of its own
+        self.case_runs = self._scenario_runs(CASE_INSENSITIVE_CASES)
+        self.edge_runs = self._scenario_runs(EDGE_CASES)
+
+        # Run all tests (concurrently; results keep this order)
+        run_checks([
+            self.test_file_exists,
+            self.test_has_nested_if,
+            self.test_vip_child_weekend,
+            self.test_vip_adult_weekday,
+            self.test_vip_senior_weekend,
+            self.test_regular_child_weekday,
+            self.test_regular_adult_weekend,
+            self.test_regular_senior_weekday,
+            *self.case_runs.runs,
+            Check(self.test_case_insensitive, depends_on=self.case_runs.runs),
+            *self.edge_runs.runs,
+            Check(self.test_edge_cases, depends_on=self.edge_runs.runs)
+        ], owner=self)
 
         # Calculate score
         total_tests = len(self.tests)
@@ -9,6 +9,17 @@ import sys
 import os
 import ast
 
+from check_runner import Check, ScenarioRuns, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
+
+# (input, expected decision, description) for the case insensitivity check
+CASE_INSENSITIVE_CASES = [
+    ("30\n45000\n700\nEMPLOYED\nNO\n", "approved", "uppercase input"),
+    ("30\n45000\n700\nEmployed\nNo\n", "approved", "mixed case input"),
+]
+
 
 class Module10Tester:
     def __init__(self, submission_path):
@@ -40,14 +51,8 @@ class Module10Tester:
             with open(self.submission_path, 'r') as f:
                 code = f.read()
 
-            tree = ast.parse(code)
-
             # Look for BoolOp nodes with And operator
-            and_found = False
-            for node in ast.walk(tree):
-                if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
-                    and_found = True
-                    break
+            and_found = bool(analyze(code).require().ops(ast.BoolOp, ast.And))
 
             if and_found:
                 self.tests.append({
@@ -77,14 +82,8 @@ class Module10Tester:
             with open(self.submission_path, 'r') as f:
                 code = f.read()
 
-            tree = ast.parse(code)
-
             # Look for BoolOp nodes with Or operator
-            or_found = False
-            for node in ast.walk(tree):
-                if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.Or):
-                    or_found = True
-                    break
+            or_found = bool(analyze(code).require().ops(ast.BoolOp, ast.Or))
 
             if or_found:
                 self.tests.append({
@@ -114,14 +113,8 @@ class Module10Tester:
             with open(self.submission_path, 'r') as f:
                 code = f.read()
 
-            tree = ast.parse(code)
-
             # Look for UnaryOp nodes with Not operator
-            not_found = False
-            for node in ast.walk(tree):
-                if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
-                    not_found = True
-                    break
+            not_found = bool(analyze(code).require().ops(ast.UnaryOp, ast.Not))
 
             if not_found:
                 self.tests.append({
@@ -149,13 +142,7 @@ class Module10Tester:
         """Test 5: Standard path - should approve (age=30, income=45000, credit=700, employed, no cosigner)"""
         test_input = "30\n45000\n700\nemployed\nno\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -193,13 +180,7 @@ class Module10Tester:
         """Test 6: Alternative path with cosigner - should approve (age=25, income=25000, credit=620, employed, yes cosigner)"""
         test_input = "25\n25000\n620\nemployed\nyes\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -236,13 +217,7 @@ class Module10Tester:
         """Test 7: Should deny for age < 21 (age=20, income=50000, credit=750, employed, no cosigner)"""
         test_input = "20\n50000\n750\nemployed\nno\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -279,13 +254,7 @@ class Module10Tester:
         """Test 8: Should deny for unemployed without cosigner (age=30, income=25000, credit=680, unemployed, no cosigner)"""
         test_input = "30\n25000\n680\nunemployed\nno\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -322,13 +291,7 @@ class Module10Tester:
         """Test 9: Should deny for income too low (age=30, income=29000, credit=700, employed, no cosigner)"""
         test_input = "30\n29000\n700\nemployed\nno\n"
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_python(self.submission_path, input=test_input, timeout=5)
 
             output = result.stdout.lower()
 
@@ -363,23 +326,12 @@ class Module10Tester:
 
     def test_case_insensitive(self):
         """Test 10: Check that inputs are case-insensitive"""
-        test_cases = [
-            ("30\n45000\n700\nEMPLOYED\nNO\n", "approved", "uppercase input"),
-            ("30\n45000\n700\nEmployed\nNo\n", "approved", "mixed case input"),
-        ]
-
         all_passed = True
         messages = []
 
-        for test_input, expected, description in test_cases:
+        for test_input, expected, description in CASE_INSENSITIVE_CASES:
             try:
-                result = subprocess.run(
-                    [sys.executable, self.submission_path],
-                    input=test_input,
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
+                result = self.case_runs.result(test_input)
 
                 if expected not in result.stdout.lower():
                     all_passed = False
@@ -409,17 +361,25 @@ class Module10Tester:
         print(f"Testing Module 10: Loan Eligibility System")
         print(f"{'='*60}\n")
 
-        # Run all tests
-        self.test_file_exists()
-        self.test_has_and_operator()
-        self.test_has_or_operator()
-        self.test_has_not_operator()
-        self.test_standard_approval()
-        self.test_cosigner_approval()
-        self.test_age_denial()
-        self.test_unemployment_denial()
-        self.test_low_income_denial()
-        self.test_case_insensitive()
+        # Each scenario of the case insensitivity check is a run of its own
+        self.case_runs = ScenarioRuns(
+            lambda test_input: run_python(self.submission_path, input=test_input, timeout=5),
+            [test_input for test_input, expected, description in CASE_INSENSITIVE_CASES])
+
+        # Run all tests (concurrently; results keep this order)
+        run_checks([
+            self.test_file_exists,
+            self.test_has_and_operator,
+            self.test_has_or_operator,
+            self.test_has_not_operator,
+            self.test_standard_approval,
+            self.test_cosigner_approval,
+            self.test_age_denial,
+            self.test_unemployment_denial,
+            self.test_low_income_denial,
+            *self.case_runs.runs,
+            Check(self.test_case_insensitive, depends_on=self.case_runs.runs)
+        ], owner=self)
 
         # Calculate score
         total_tests = len(self.tests)
@@ -9,6 +9,10 @@ import sys
 import os
 import ast
 
+from check_runner import run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
 
 class Module11Tester:
     def __init__(self, submission_path):
@@ -69,22 +73,13 @@ class Module11Tester:
             with open(self.submission_path, 'r') as f:
                 code = f.read()
 
-            tree = ast.parse(code)
+            analysis = analyze(code).require()
 
             # Check for 'and' or 'or' operators
-            has_and_or = False
-            for node in ast.walk(tree):
-                if isinstance(node, ast.BoolOp):
-                    if isinstance(node.op, (ast.And, ast.Or)):
-                        has_and_or = True
-                        break
+            has_and_or = bool(analysis.ops(ast.BoolOp, ast.And) or analysis.ops(ast.BoolOp, ast.Or))
 
             # Check for chained comparisons (e.g., 45 <= age <= 55)
-            has_chained_comparison = False
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Compare) and len(node.ops) > 1:
-                    has_chained_comparison = True
-                    break
+            has_chained_comparison = any(len(node.ops) > 1 for node in analysis.nodes(ast.Compare))
 
             if has_and_or or has_chained_comparison:
                 self.tests.append({
@@ -111,11 +106,9 @@ class Module11Tester:
     def test_height_rejection(self):
         """Test 4: Test that short height (< 120) is rejected"""
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
+            result = run_python(
+                self.submission_path,
                 input="100\n",  # Height too short
-                capture_output=True,
-                text=True,
                 timeout=5
             )
 
@@ -164,11 +157,9 @@ class Module11Tester:
     def test_child_ticket(self):
         """Test 5: Test child ticket (age < 12, price $5)"""
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
+            result = run_python(
+                self.submission_path,
                 input="130\n10\nno\n",  # Height 130, age 10, no photo
-                capture_output=True,
-                text=True,
                 timeout=5
             )
 
@@ -208,11 +199,9 @@ class Module11Tester:
     def test_youth_ticket(self):
         """Test 6: Test youth ticket (age 12-17, price $7)"""
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
+            result = run_python(
+                self.submission_path,
                 input="150\n15\nno\n",  # Height 150, age 15, no photo
-                capture_output=True,
-                text=True,
                 timeout=5
             )
 
@@ -252,11 +241,9 @@ class Module11Tester:
     def test_midlife_discount(self):
         """Test 7: Test midlife crisis discount (age 45-55, FREE)"""
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
+            result = run_python(
+                self.submission_path,
                 input="170\n50\nno\n",  # Height 170, age 50, no photo
-                capture_output=True,
-                text=True,
                 timeout=5
             )
 
@@ -296,11 +283,9 @@ class Module11Tester:
     def test_adult_ticket(self):
         """Test 8: Test adult ticket (age 18+, not 45-55, price $12)"""
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
+            result = run_python(
+                self.submission_path,
                 input="175\n30\nno\n",  # Height 175, age 30, no photo
-                capture_output=True,
-                text=True,
                 timeout=5
             )
 
@@ -340,11 +325,9 @@ class Module11Tester:
     def test_photo_addon(self):
         """Test 9: Test photo add-on (+$3)"""
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
+            result = run_python(
+                self.submission_path,
                 input="140\n10\nyes\n",  # Height 140, age 10 (child $5), photo yes
-                capture_output=True,
-                text=True,
                 timeout=5
             )
 
@@ -384,11 +367,9 @@ class Module11Tester:
     def test_case_insensitive_photo(self):
         """Test 10: Test photo input is case-insensitive"""
         try:
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
+            result = run_python(
+                self.submission_path,
                 input="140\n10\nYES\n",  # Height 140, age 10, photo "YES" in caps
-                capture_output=True,
-                text=True,
                 timeout=5
             )
 
@@ -427,17 +408,19 @@ class Module11Tester:
 
     def run_all_tests(self):
         """Run all tests and calculate score."""
-        # Run all test methods
-        self.test_file_exists()
-        self.test_has_elif()
-        self.test_has_logical_operator()
-        self.test_height_rejection()
-        self.test_child_ticket()
-        self.test_youth_ticket()
-        self.test_midlife_discount()
-        self.test_adult_ticket()
-        self.test_photo_addon()
-        self.test_case_insensitive_photo()
+        # Run all tests (concurrently; results keep this order)
+        run_checks([
+            self.test_file_exists,
+            self.test_has_elif,
+            self.test_has_logical_operator,
+            self.test_height_rejection,
+            self.test_child_ticket,
+            self.test_youth_ticket,
+            self.test_midlife_discount,
+            self.test_adult_ticket,
+            self.test_photo_addon,
+            self.test_case_insensitive_photo
+        ], owner=self)
 
         # Calculate score
         passed_count = sum(1 for test in self.tests if test['passed'])
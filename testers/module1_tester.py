@@ -10,6 +10,9 @@ import random
 import tempfile
 from io import StringIO
 
+from check_runner import run_checks
+from execution_engine import run_python
+
 
 class Module1Tester:
     def __init__(self, submission_path):
@@ -82,11 +85,9 @@ class Module1Tester:
             test_input = "50\n75\n"
             expected_patterns = ['Too low', '75']
 
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
+            result = run_python(
+                self.submission_path,
                 input=test_input,
-                capture_output=True,
-                text=True,
                 timeout=5,
                 env={**os.environ, 'PYTHONHASHSEED': '0'}
             )
@@ -160,9 +161,11 @@ class Module1Tester:
 
     def run_all_tests(self):
         """Run all tests and return results."""
-        imports_ok = self.test_imports()
-        structure_ok = self.test_code_structure()
-        logic_ok = self.test_game_logic()
+        run_checks([
+            self.test_imports,
+            self.test_code_structure,
+            self.test_game_logic
+        ], owner=self, attr='test_results')
 
         # Calculate overall pass/fail
         passed_count = sum(1 for result in self.test_results if result['passed'])
@@ -10,6 +10,9 @@ import tempfile
 import shutil
 import time
 
+from check_runner import Check, run_checks
+from execution_engine import run_python
+
 
 class Module2Tester:
     def __init__(self, submission_path):
@@ -104,14 +107,7 @@ class Module2Tester:
             # Test adding a contact and exiting
             test_input = "1\nAlice\n555-1234\n4\n"
 
-            result = subprocess.run(
-                [sys.executable, temp_script],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                cwd=self.temp_dir
-            )
+            result = run_python(temp_script, input=test_input, timeout=5, cwd=self.temp_dir)
 
             # Check if a contacts file was created
             possible_files = ['contacts.txt', 'contacts.csv', 'contact_book.txt']
@@ -171,25 +167,11 @@ class Module2Tester:
 
             # Run 1: Add Alice
             test_input1 = "1\nAlice\n555-1234\n4\n"
-            subprocess.run(
-                [sys.executable, temp_script],
-                input=test_input1,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                cwd=self.temp_dir
-            )
+            run_python(temp_script, input=test_input1, timeout=5, cwd=self.temp_dir)
 
             # Run 2: Add Bob and list contacts
             test_input2 = "1\nBob\n555-5678\n3\n4\n"
-            result2 = subprocess.run(
-                [sys.executable, temp_script],
-                input=test_input2,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                cwd=self.temp_dir
-            )
+            result2 = run_python(temp_script, input=test_input2, timeout=5, cwd=self.temp_dir)
 
             output = result2.stdout
 
@@ -225,14 +207,7 @@ class Module2Tester:
             # Add a contact, then search for it
             test_input = "1\nCharlie\n555-9999\n2\nCharlie\n4\n"
 
-            result = subprocess.run(
-                [sys.executable, temp_script],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                cwd=self.temp_dir
-            )
+            result = run_python(temp_script, input=test_input, timeout=5, cwd=self.temp_dir)
 
             output = result.stdout.lower()
 
@@ -268,14 +243,7 @@ class Module2Tester:
             # Just run the program and exit
             test_input = "4\n"
 
-            result = subprocess.run(
-                [sys.executable, temp_script],
-                input=test_input,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                cwd=self.temp_dir
-            )
+            result = run_python(temp_script, input=test_input, timeout=5, cwd=self.temp_dir)
 
             output = result.stdout.lower()
 
@@ -309,12 +277,15 @@ class Module2Tester:
     def run_all_tests(self):
         """Run all tests and return results."""
         try:
-            structure_ok = self.test_code_structure()
-            functions_ok = self.test_function_definitions()
-            menu_ok = self.test_menu_system()
-            add_ok = self.test_add_contact()
-            persistence_ok = self.test_persistence()
-            search_ok = self.test_search_functionality()
+            # The program runs share one contacts file, so they run in sequence
+            run_checks([
+                Check(self.test_code_structure),
+                Check(self.test_function_definitions),
+                Check(self.test_menu_system),
+                Check(self.test_add_contact, depends_on=[self.test_menu_system]),
+                Check(self.test_persistence, depends_on=[self.test_add_contact]),
+                Check(self.test_search_functionality, depends_on=[self.test_persistence])
+            ], owner=self, attr='test_results')
 
             # Calculate overall pass/fail
             passed_count = sum(1 for result in self.test_results if result['passed'])
@@ -1,44 +1,33 @@
 """
 Module 3 Tester: Web Scraper
 Tests student submissions for the Module 3 capstone project.
+
+Legacy tester from the old three-project course: the tester registry only
+loads moduleNNN_tester.py files (module 3 is now graded by
+module003_tester.py), so this one is only run by hand.
 """
 
 import subprocess
 import sys
 import os
-import tempfile
-import shutil
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import threading
-import time
-
-
-class TestHTTPHandler(BaseHTTPRequestHandler):
-    """Simple HTTP handler for testing."""
-
-    def do_GET(self):
-        """Handle GET requests."""
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.end_headers()
-
-        html_content = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Test Page for Web Scraper</title>
-        </head>
-        <body>
-            <h1>Welcome to the Test Page</h1>
-            <p>This is a test page for the Python Classroom web scraper project.</p>
-        </body>
-        </html>
-        """
-        self.wfile.write(html_content.encode())
-
-    def log_message(self, format, *args):
-        """Suppress log messages."""
-        pass
+import secrets
+
+from check_runner import run_checks
+from execution_engine import run_python
+from fixture_server import DROP, serve_pages
+
+TEST_PAGE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>{title}</title>
+</head>
+<body>
+    <h1>Welcome to the Test Page</h1>
+    <p>This is a test page for the Python Classroom web scraper project.</p>
+</body>
+</html>
+"""
 
 
 class Module3Tester:
@@ -46,25 +35,8 @@ class Module3Tester:
         self.submission_path = submission_path
         self.test_results = []
         self.passed = False
-        self.test_server = None
-        self.test_port = 8765
-
-    def start_test_server(self):
-        """Start a test HTTP server."""
-        try:
-            self.test_server = HTTPServer(('localhost', self.test_port), TestHTTPHandler)
-            server_thread = threading.Thread(target=self.test_server.serve_forever)
-            server_thread.daemon = True
-            server_thread.start()
-            time.sleep(0.5)  # Give server time to start
-            return True
-        except Exception as e:
-            return False
-
-    def stop_test_server(self):
-        """Stop the test HTTP server."""
-        if self.test_server:
-            self.test_server.shutdown()
+        # Different title every run, so only a working scraper can print it
+        self.page_title = f'Test Page for Web Scraper {secrets.token_hex(3)}'
 
     def test_imports(self):
         """Test if the code imports required libraries."""
@@ -180,30 +152,14 @@ class Module3Tester:
     def test_scraping_functionality(self):
         """Test the actual scraping functionality."""
         try:
-            # Start test server
-            if not self.start_test_server():
-                self.test_results.append({
-                    'test': 'Web scraping functionality',
-                    'passed': False,
-                    'message': 'Could not start test server'
-                })
-                return False
-
-            test_url = f"http://localhost:{self.test_port}/"
-
-            # Run the scraper with the test URL
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=test_url + "\n",
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            # Run the scraper against this run's page on the local fixture server
+            with serve_pages({'/': TEST_PAGE.format(title=self.page_title)}) as site:
+                result = run_python(self.submission_path, input=site.url('/') + "\n", timeout=10)
 
             output = result.stdout
 
             # Check if the title was extracted
-            if 'Test Page for Web Scraper' in output:
+            if self.page_title in output:
                 self.test_results.append({
                     'test': 'Title extraction',
                     'passed': True,
@@ -249,22 +205,13 @@ class Module3Tester:
                 'message': f'Error: {str(e)}'
             })
             return False
-        finally:
-            self.stop_test_server()
 
     def test_error_handling(self):
         """Test error handling with invalid URL."""
         try:
-            # Test with invalid URL
-            invalid_url = "http://this-domain-definitely-does-not-exist-12345.com"
-
-            result = subprocess.run(
-                [sys.executable, self.submission_path],
-                input=invalid_url + "\n",
-                capture_output=True,
-                text=True,
-                timeout=15
-            )
+            # A URL where the server hangs up: a network error without waiting on DNS
+            with serve_pages({'/': DROP}) as site:
+                result = run_python(self.submission_path, input=site.url('/') + "\n", timeout=15)
 
             # Program should handle the error gracefully (not crash)
             if result.returncode == 0:
@@ -308,30 +255,28 @@ class Module3Tester:
 
     def run_all_tests(self):
         """Run all tests and return results."""
-        try:
-            imports_ok = self.test_imports()
-            structure_ok = self.test_code_structure()
-            functions_ok = self.test_function_definitions()
-            scraping_ok = self.test_scraping_functionality()
-            error_ok = self.test_error_handling()
-
-            # Calculate overall pass/fail
-            passed_count = sum(1 for result in self.test_results if result['passed'])
-            total_count = len(self.test_results)
-
-            self.passed = passed_count >= total_count * 0.70  # 70% pass rate
-
-            return {
-                'passed': self.passed,
-                'score': f'{passed_count}/{total_count}',
-                'percentage': int((passed_count / total_count) * 100),
-                'tests': self.test_results,
-                'message': 'All tests passed! Your web scraper works correctly.' if self.passed
-                          else 'Some tests failed. Please review the feedback and try again.'
-            }
+        run_checks([
+            self.test_imports,
+            self.test_code_structure,
+            self.test_function_definitions,
+            self.test_scraping_functionality,
+            self.test_error_handling
+        ], owner=self, attr='test_results')
 
-        finally:
-            self.stop_test_server()
+        # Calculate overall pass/fail
+        passed_count = sum(1 for result in self.test_results if result['passed'])
+        total_count = len(self.test_results)
+
+        self.passed = passed_count >= total_count * 0.70  # 70% pass rate
+
+        return {
+            'passed': self.passed,
+            'score': f'{passed_count}/{total_count}',
+            'percentage': int((passed_count / total_count) * 100),
+            'tests': self.test_results,
+            'message': 'All tests passed! Your web scraper works correctly.' if self.passed
+                      else 'Some tests failed. Please review the feedback and try again.'
+        }
 
 
 def test_submission(submission_path):
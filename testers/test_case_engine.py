@@ -0,0 +1,295 @@
+"""
+Test Case Engine
+Grades a submission from the structured test cases in its module JSON.
+
+Modules without a hand-written testers/moduleNNN_tester.py are graded from
+project.test_cases (see module_001.json). Plain strings in that list are descriptions for humans
+and are ignored; dict entries are test cases:
+
+    {"name": "Adds two numbers",
+     "stdin": ["5", "+", "3"],           # string or list of input lines
+     "expect": ["result", "8"],          # regexes that must all match stdout
+     "reject": ["error"],                # regexes that must not match
+     "numbers": [{"value": 8, "tolerance": 0.01}],
+     "creates": ["calculator_log.txt"],  # files the program must write
+     "min_lines": 3,                     # lines of output, at least
+     "allow_errors": false,              # a traceback / non-zero exit fails
+     "ignore_case": true, "timeout": 5}
+
+    {"name": "Uses nested ifs",
+     "requires": {"calls": {"input": 2}, "nodes": {"If": 2},
+                  "method_calls": ["format"], "nested_if": true, "comments": 2}}
+
+Cases with "requires" are static checks (see code_analysis), any other
+case runs the program. Feedback gives the counts found and required.
+"comments" counts comment tokens, so a # inside a string doesn't count,
+and works on code that doesn't parse; the other requirements need it to. A case may set "critical": true to stop grading
+when it fails. project.pass_threshold is the fraction of cases that must
+pass (default 1.0). Cases with the same stdin share one run, and all runs
+go through the execution engine concurrently.
+"""
+
+import ast
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from check_runner import Check, run_checks
+from code_analysis import analyze
+from execution_engine import run_python
+
+DEFAULT_TIMEOUT = 5
+
+_NUMBER = re.compile(r'-?\d[\d,]*(?:\.\d+)?|-?\.\d+')
+
+
+def get_test_cases(project):
+    """The structured (dict) test cases of a module's project."""
+    return [case for case in (project or {}).get('test_cases', []) if isinstance(case, dict)]
+
+
+def has_test_cases(project):
+    """Whether a project can be graded by this engine."""
+    return bool(get_test_cases(project))
+
+
+class TestCaseTester:
+    """Runs a module's declarative test cases against one submission."""
+
+    def __init__(self, filepath, project):
+        self.filepath = filepath
+        self.project = project
+        self.cases = get_test_cases(project)
+        self.tests = []
+        self.passed = False
+        self.code_content = None
+        self._runs = {}
+        self._runs_lock = threading.Lock()
+        self._run_dirs = []
+
+    def test_file_exists(self):
+        """Test that the submission file exists and can be read."""
+        try:
+            with open(self.filepath, 'r', encoding='utf-8') as f:
+                self.code_content = f.read()
+            return {
+                'name': 'File exists and is readable',
+                'passed': True,
+                'message': 'Submission file found and loaded successfully.'
+            }
+        except Exception as e:
+            return {
+                'name': 'File exists and is readable',
+                'passed': False,
+                'message': f'Could not read file: {str(e)}'
+            }
+
+    def check_static(self, case):
+        """Check the code contains the constructs a case requires."""
+        name = case['name']
+        try:
+            counts = _construct_counts(analyze(self.code_content), case['requires'])
+            missing = '; '.join(f'Found {found} {label}, need at least {minimum}'
+                                for label, found, minimum in counts if found < minimum)
+            if missing:
+                message = case.get('message')
+                return {
+                    'name': name,
+                    'passed': False,
+                    'message': f'{message} {missing}.' if message else f'{missing}.'
+                }
+            found = ', '.join(f'{found} {label}' for label, found, minimum in counts)
+            return {'name': name, 'passed': True, 'message': f'Found {found}.'}
+        except SyntaxError as e:
+            return {'name': name, 'passed': False, 'message': f'Syntax error in code: {str(e)}'}
+        except Exception as e:
+            return {'name': name, 'passed': False, 'message': f'Error analyzing code: {str(e)}'}
+
+    def check_run(self, case):
+        """Run the program with a case's input and check its output."""
+        name = case['name']
+        try:
+            result, run_dir = self._run(_stdin_text(case.get('stdin')),
+                                        case.get('timeout', DEFAULT_TIMEOUT))
+            if result is None:
+                return {'name': name, 'passed': False,
+                        'message': 'Program timed out - check for infinite loops or missing input handling.'}
+
+            problems = _output_problems(case, result, run_dir)
+            if problems:
+                message = case.get('message') or 'Output did not match.'
+                return {'name': name, 'passed': False,
+                        'message': f'{message} {"; ".join(problems)}'}
+            return {'name': name, 'passed': True, 'message': _run_passed_message(case, result)}
+        except Exception as e:
+            return {'name': name, 'passed': False, 'message': f'Error running code: {str(e)}'}
+
+    def _run(self, stdin, timeout):
+        """Run the program once per distinct input; cases with the same input share it."""
+        key = (stdin, timeout)
+        with self._runs_lock:
+            entry = self._runs.setdefault(key, {'lock': threading.Lock()})
+
+        with entry['lock']:
+            if 'result' not in entry:
+                # Each run gets its own directory for any files it writes
+                run_dir = tempfile.mkdtemp(prefix='classroom-run-')
+                self._run_dirs.append(run_dir)
+                try:
+                    entry['result'] = run_python(self.filepath, input=stdin,
+                                                 timeout=timeout, cwd=run_dir)
+                except subprocess.TimeoutExpired:
+                    entry['result'] = None
+                entry['dir'] = run_dir
+        return entry['result'], entry['dir']
+
+    def run_all_tests(self):
+        """Run all test cases and return results."""
+        checks = [Check(self.test_file_exists, critical=True)]
+        for case in self.cases:
+            if 'requires' in case:
+                check = lambda case=case: self.check_static(case)
+            else:
+                check = lambda case=case: self.check_run(case)
+            checks.append(Check(check, critical=case.get('critical', False)))
+
+        try:
+            results = run_checks(checks)
+        finally:
+            for run_dir in self._run_dirs:
+                shutil.rmtree(run_dir, ignore_errors=True)
+        self.tests.extend(results)
+
+        passed_count = sum(1 for test in self.tests if test['passed'])
+        total_count = len(self.tests)
+        threshold = self.project.get('pass_threshold', 1.0)
+        critical_failed = any(check.critical and not result['passed']
+                              for check, result in zip(checks, results))
+
+        self.passed = not critical_failed and passed_count >= total_count * threshold
+
+        return {
+            'passed': self.passed,
+            'score': f'{passed_count}/{total_count} ({int(passed_count/total_count*100)}%)',
+            'tests': self.tests,
+            'message': 'All tests passed! Great job!' if passed_count == total_count
+                       else 'Passed! Review the failed tests to improve further.' if self.passed
+                       else 'Some tests failed. Review the feedback and try again.'
+        }
+
+
+def test_submission(filepath, project):
+    """Grade a submission against a project's structured test cases."""
+    tester = TestCaseTester(filepath, project)
+    return tester.run_all_tests()
+
+
+def _stdin_text(stdin):
+    """Test case input as one string (a list is one entry per line)."""
+    if stdin is None:
+        return ''
+    if isinstance(stdin, list):
+        return ''.join(f'{line}\n' for line in stdin)
+    return stdin
+
+
+def _output_problems(case, result, run_dir):
+    """Everything about a run that doesn't match its case."""
+    problems = []
+    output = result.stdout
+    flags = re.IGNORECASE if case.get('ignore_case', True) else 0
+
+    if not case.get('allow_errors', False):
+        if result.returncode != 0 or 'Traceback' in result.stderr:
+            error_lines = result.stderr.strip().splitlines()
+            problems.append(f'Program crashed: {error_lines[-1] if error_lines else "non-zero exit"}')
+
+    for pattern in case.get('expect', []):
+        if not re.search(pattern, output, flags):
+            problems.append(f'expected "{pattern}"')
+
+    for pattern in case.get('reject', []):
+        if re.search(pattern, output, flags):
+            problems.append(f'did not expect "{pattern}"')
+
+    if case.get('numbers'):
+        found = _numbers_in(output)
+        for expected in case['numbers']:
+            if not isinstance(expected, dict):
+                expected = {'value': expected}
+            value = expected['value']
+            tolerance = expected.get('tolerance', 0)
+            if not any(abs(number - value) <= tolerance for number in found):
+                problems.append(f'expected the number {value}')
+
+    if case.get('min_lines'):
+        line_count = len(output.strip().splitlines())
+        if line_count < case['min_lines']:
+            problems.append(f'expected at least {case["min_lines"]} lines of output, got {line_count}')
+
+    for filename in case.get('creates', []):
+        if not os.path.exists(os.path.join(run_dir, filename)):
+            problems.append(f'{filename} was not created')
+
+    return problems
+
+
+def _run_passed_message(case, result):
+    """What a run that passed its case did right."""
+    parts = []
+    if any(case.get(key) for key in ('expect', 'reject', 'numbers', 'creates')):
+        parts.append('Output matches the expected result.')
+    if case.get('min_lines'):
+        parts.append(f'Program output has {len(result.stdout.strip().splitlines())} lines.')
+    return ' '.join(parts) or 'Program ran without errors.'
+
+
+def _numbers_in(text):
+    """All numbers in a program's output (1,234.50 -> 1234.5)."""
+    numbers = []
+    for match in _NUMBER.findall(text):
+        try:
+            numbers.append(float(match.replace(',', '')))
+        except ValueError:
+            pass
+    return numbers
+
+
+def _construct_counts(code, requires):
+    """
+    (label, found, minimum) for each construct a case requires. Comments are
+    counted even if the code doesn't parse; the other constructs need the
+    syntax tree (raises SyntaxError).
+    """
+    counts = []
+    if requires.get('comments'):
+        counts.append(('comment(s)', code.comment_count(), requires['comments']))
+    if set(requires) - {'comments'}:
+        code.require()
+
+    calls = requires.get('calls', {})
+    if isinstance(calls, list):
+        calls = {name: 1 for name in calls}
+    for name, minimum in calls.items():
+        counts.append((f'{name}() call(s)', len(code.calls(name)), minimum))
+
+    method_calls = requires.get('method_calls', {})
+    if isinstance(method_calls, list):
+        method_calls = {name: 1 for name in method_calls}
+    for name, minimum in method_calls.items():
+        counts.append((f'.{name}() call(s)', len(code.method_calls(name)), minimum))
+
+    nodes = requires.get('nodes', {})
+    if isinstance(nodes, list):
+        nodes = {name: 1 for name in nodes}
+    for type_name, minimum in nodes.items():
+        node_type = getattr(ast, type_name, None)
+        counts.append((f'{type_name} node(s)', code.count(node_type) if node_type else 0, minimum))
+
+    if requires.get('nested_if'):
+        counts.append(('nested if statement(s)', int(code.has_nested_if()), 1))
+
+    return counts